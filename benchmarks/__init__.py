@@ -0,0 +1,3 @@
+"""
+Benchmarks et serveurs de test locaux du bot Vinted
+"""
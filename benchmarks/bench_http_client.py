@@ -0,0 +1,90 @@
+# benchmarks/bench_http_client.py
+"""
+Compare la latence par requête : requests.post (nouvelle connexion à
+chaque appel) contre la session persistante de modules.http_client
+
+Usage :
+    python -m benchmarks.bench_http_client --requests 200 --tls
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def make_self_signed_cert(directory):
+    """Génère un certificat auto-signé pour 127.0.0.1 (nécessite openssl)"""
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+        "-keyout", keyfile, "-out", certfile, "-days", "1",
+        "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1"
+    ], check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def measure(call, n):
+    """Exécute `call` n fois et retourne les latences en millisecondes"""
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = call()
+        response.content
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"   {label:<28} moyenne {statistics.mean(timings):7.2f} ms"
+          f"   p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence du stub (s)")
+    parser.add_argument("--tls", action="store_true", help="Stub en HTTPS (coût TLS inclus)")
+    args = parser.parse_args()
+
+    from benchmarks.stub_claude import StubClaudeServer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        certfile = keyfile = None
+        if args.tls:
+            certfile, keyfile = make_self_signed_cert(tmp)
+            os.environ["REQUESTS_CA_BUNDLE"] = certfile
+
+        server = StubClaudeServer(latency=args.latency, certfile=certfile, keyfile=keyfile)
+        url = server.start()
+        os.environ["ANTHROPIC_API_URL"] = url
+
+        import requests
+        from modules import http_client
+
+        payload = {"model": "claude-sonnet-4-20250514", "max_tokens": 16,
+                   "messages": [{"role": "user", "content": "ping"}]}
+
+        print(f"\n⏱️  {args.requests} requêtes vers {url}\n")
+        fresh = report("requests.post (sans pool)", measure(
+            lambda: requests.post(f"{url}/v1/messages", json=payload, timeout=(5, 45)),
+            args.requests
+        ))
+        pooled = report("session persistante", measure(
+            lambda: http_client.post_messages(payload), args.requests
+        ))
+        print(f"\n   Gain par requête : {fresh - pooled:.2f} ms ({(1 - pooled / fresh) * 100:.0f} %)\n")
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
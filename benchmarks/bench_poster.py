@@ -0,0 +1,69 @@
+# benchmarks/bench_poster.py
+"""
+Débit de publication (annonces/minute) contre la marketplace simulée,
+avec pannes injectées : vérifie aussi qu'aucune annonce n'est dupliquée
+
+Usage :
+    python -m benchmarks.bench_poster --listings 60 --rate 20 --error-rate 0.1
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_listings(directory, count, photos_per_listing):
+    """Annonces au format de `python main.py batch`, avec de vraies photos"""
+    from PIL import Image
+
+    listings = []
+    for i in range(count):
+        photos = []
+        for j in range(photos_per_listing):
+            path = os.path.join(directory, f"item{i}_{j}.jpg")
+            Image.new('RGB', (800, 600), (i % 256, j * 40, 128)).save(path, quality=85)
+            photos.append(path)
+        listings.append({
+            "produit": {"type": "t-shirt", "marque": None, "couleur": "bleu", "etat": "bon"},
+            "annonce": {"titre": f"T-shirt bleu #{i}", "description": "Bon état.", "prix": 10},
+            "image_path": photos[0],
+            "photos": photos
+        })
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de publication")
+    parser.add_argument("--listings", type=int, default=60)
+    parser.add_argument("--photos", type=int, default=3, help="Photos par annonce")
+    parser.add_argument("--rate", type=float, default=20.0, help="Quota de la marketplace (req/s)")
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.mock_marketplace import MockMarketplaceServer
+    from modules.vinted_poster import VintedPoster
+
+    server = MockMarketplaceServer(rate=args.rate, error_rate=args.error_rate, latency=args.latency)
+    url = server.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        listings = make_listings(tmp, args.listings, args.photos)
+        with VintedPoster(url, rate=args.rate, burst=args.rate, backoff=0.1, max_retries=6) as poster:
+            stats = poster.publish_many(listings, concurrency=args.concurrency)
+
+    server.shutdown()
+    print(f"\n📤 {stats['published']} publiées, {stats['failed']} échecs en {stats['elapsed']:.1f} s"
+          f" → {stats['listings_per_minute']:.0f} annonces/minute")
+    print(f"   Annonces créées côté marketplace : {server.creations['item']}"
+          f" (doublons : {server.creations['item'] - stats['published']})")
+    print(f"   Requêtes refusées (429) : {server.rate_limited}\n")
+
+
+if __name__ == "__main__":
+    main()
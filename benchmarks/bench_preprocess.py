@@ -0,0 +1,190 @@
+# benchmarks/bench_preprocess.py
+"""
+Benchmark du prétraitement des photos (décodage, redimensionnement, JPEG)
+
+Compare l'ancien chemin (décodage complet puis LANCZOS) au chemin actuel
+(modules.image_preprocessing). Chaque mode tourne dans un processus séparé
+pour mesurer son pic de mémoire (RSS). Mesure aussi le temps total d'une
+requête de 5 photos, séquentielle puis parallèle (CPU_THREADS threads).
+
+Usage :
+    python -m benchmarks.bench_preprocess --corpus chemin/vers/photos_telephone
+    python -m benchmarks.bench_preprocess             # corpus synthétique
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def legacy_preprocess(data):
+    """Prétraitement d'origine de app.analyze(), gardé comme référence"""
+    from PIL import Image
+
+    img = Image.open(BytesIO(data))
+    if img.mode == 'RGBA':
+        img = img.convert('RGB')
+    img.thumbnail((1200, 1200), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def make_synthetic_corpus(directory, count=8):
+    """Photos de 12 Mpx (4000x3000) proches d'une photo de téléphone"""
+    from PIL import Image
+
+    for i in range(count):
+        noise = Image.effect_noise((4000, 3000), 40 + i * 5)
+        gradient = Image.linear_gradient('L').resize((4000, 3000))
+        img = Image.merge('RGB', (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        exif = img.getexif()
+        exif[0x0112] = 6 if i % 2 else 1  # Moitié des photos prises en portrait
+        img.save(os.path.join(directory, f"photo_{i}.jpg"), quality=92, exif=exif)
+
+
+def list_corpus(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(PHOTO_EXTENSIONS)
+    )
+
+
+def run_mode(mode, corpus, repeat):
+    """Exécuté dans le processus enfant : mesure un seul mode"""
+    sys.path.insert(0, ROOT)
+    if mode == 'legacy':
+        preprocess = legacy_preprocess
+    else:
+        from modules.image_preprocessing import preprocess_image as preprocess
+
+    # Une photo en mémoire à la fois : le pic RSS reflète le décodage
+    paths = list_corpus(corpus)
+    timings = []
+    for _ in range(repeat):
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            start = time.perf_counter()
+            preprocess(data)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        'ms_per_image': statistics.mean(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+        'peak_rss_mb': peak_rss_kb() / 1024,
+        'images': len(paths)
+    }))
+
+
+def run_requests(corpus, repeat, photos_per_request=5):
+    """Compare, par requête de 5 photos, le traitement séquentiel au pool"""
+    sys.path.insert(0, ROOT)
+    from modules.image_preprocessing import preprocess_image, preprocess_images
+
+    paths = list_corpus(corpus)
+    groups = []
+    for start in range(0, len(paths) - photos_per_request + 1, photos_per_request):
+        group = []
+        for path in paths[start:start + photos_per_request]:
+            with open(path, 'rb') as f:
+                group.append(f.read())
+        groups.append(group)
+    if not groups:
+        raise SystemExit(f"Il faut au moins {photos_per_request} photos dans le corpus")
+
+    preprocess_images(groups[0])  # Démarrage du pool de threads
+    sequential, parallel = [], []
+    for _ in range(repeat):
+        for group in groups:
+            start = time.perf_counter()
+            [preprocess_image(data) for data in group]
+            sequential.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            preprocess_images(group)
+            parallel.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        'sequential_ms': statistics.mean(sequential),
+        'parallel_ms': statistics.mean(parallel)
+    }))
+
+
+def peak_rss_kb():
+    """
+    Pic de mémoire résidente du processus
+
+    VmHWM (Linux) est propre au processus ; ru_maxrss peut hériter du pic
+    du processus parent à travers fork/exec.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du prétraitement des photos")
+    parser.add_argument("--corpus", help="Dossier de photos (défaut : corpus synthétique)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mode", choices=['legacy', 'current', 'requests'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == 'requests':
+        run_requests(args.corpus, args.repeat)
+        return
+    if args.mode:
+        run_mode(args.mode, args.corpus, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if not corpus:
+            sys.path.insert(0, ROOT)
+            make_synthetic_corpus(tmp)
+            corpus = tmp
+
+        print(f"\n🖼️  Prétraitement de {corpus} ({args.repeat} passes)\n")
+        results = {}
+        for mode in ('legacy', 'current'):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_preprocess",
+                 "--corpus", corpus, "--repeat", str(args.repeat), "--mode", mode],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+            results[mode] = stats = json.loads(output)
+            print(f"   {mode:<8} {stats['ms_per_image']:7.1f} ms/image   "
+                  f"p95 {stats['p95_ms']:7.1f} ms   pic RSS {stats['peak_rss_mb']:6.1f} Mo")
+
+        speedup = results['legacy']['ms_per_image'] / results['current']['ms_per_image']
+        print(f"\n   Accélération : x{speedup:.1f}\n")
+
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_preprocess",
+             "--corpus", corpus, "--repeat", str(args.repeat), "--mode", "requests"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        stats = json.loads(output)
+        print(f"   Requête de 5 photos : séquentiel {stats['sequential_ms']:.0f} ms, "
+              f"parallèle {stats['parallel_ms']:.0f} ms "
+              f"({(stats['parallel_ms'] / stats['sequential_ms'] - 1) * 100:+.0f} %, "
+              f"{os.cpu_count()} cœurs)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# benchmarks/bench_pricing.py
+"""
+Benchmark du calcul de prix d'un inventaire entier
+
+Compare la boucle scalaire (get_price_estimate article par article) au
+chemin vectorisé (get_price_estimates_batch) et vérifie que les résultats
+sont identiques.
+
+Avec --check, vérifie seulement la chaîne de la base de prix sur les pages
+HTML de test : annonces extraites de chaque page, quartiles calculés,
+lookup() et repli sur les prix par règles sous MIN_REFERENCES annonces.
+
+Usage :
+    python -m benchmarks.bench_pricing --items 100000
+    python -m benchmarks.bench_pricing --items 100000 --market   # avec la base de prix
+    python -m benchmarks.bench_pricing --check
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "market")
+
+# Annonces attendues de chaque page : (type, marque, état) -> prix triés
+EXPECTED_LISTINGS = {
+    "leboncoin_search.html": {
+        ('pull', 'The North Face', 'bon'): [35, 35, 35, 40, 45, 50, 50],
+    },
+    "vestiaire_item.html": {
+        ('sac', 'Louis Vuitton', 'très bon'): [1250],
+    },
+    "vinted_catalog.html": {
+        ('t-shirt', 'Nike', 'bon'): [8, 8, 8, 9, 10, 12, 14, 15, 18],
+        ('t-shirt', 'Nike', 'neuf'): [8, 10, 14],
+        ('jean', "Levi's", 'bon'): [18, 18, 20, 25, 25, 28],
+    },
+}
+
+# Quartiles attendus après rebuild_stats : (p25, p50, p75, nombre)
+EXPECTED_STATS = {
+    ('pull', 'the north face', 'bon'): (35.0, 40.0, 47.5, 7),
+    ('sac', 'louis vuitton', 'très bon'): (1250.0, 1250.0, 1250.0, 1),
+    ('t-shirt', 'nike', 'bon'): (8.0, 10.0, 14.0, 9),
+    ('t-shirt', 'nike', 'neuf'): (9.0, 10.0, 12.0, 3),
+    ('jean', "levi's", 'bon'): (18.5, 22.5, 25.0, 6),
+}
+
+# Seuil de références des vérifications (valeur par défaut de MARKET_MIN_REFERENCES)
+CHECK_MIN_REFERENCES = 5
+
+
+def make_inventory(count, seed=42):
+    """Inventaire aléatoire mêlant types, marques connues/inconnues et états"""
+    from modules.price_analyzer import BASE_PRICES, BRAND_MULTIPLIERS, CONDITION_MULTIPLIERS
+
+    rng = random.Random(seed)
+    types = list(BASE_PRICES) + ['inconnu']
+    brands = list(BRAND_MULTIPLIERS) + [None, None, None, "Levi's", 'The North Face', 'Marque locale']
+    conditions = list(CONDITION_MULTIPLIERS)
+    return (
+        [rng.choice(types) for _ in range(count)],
+        [rng.choice(brands) for _ in range(count)],
+        [rng.choice(conditions) for _ in range(count)]
+    )
+
+
+def build_market_store(directory):
+    """Base de prix construite à partir des pages HTML de test"""
+    from modules.market_prices import MarketPriceStore, ingest_files
+
+    path = os.path.join(directory, "prices.sqlite3")
+    store = MarketPriceStore(path)
+    ingest_files(store, sorted(glob.glob(os.path.join(FIXTURES, "*.html"))), "fixtures")
+    store.rebuild_stats()
+    return path
+
+
+def check_fixtures():
+    """
+    Vérifie la base de prix construite à partir des pages de test
+
+    Returns:
+        list: Descriptions des écarts (vide si tout est conforme)
+    """
+    os.environ['MARKET_MIN_REFERENCES'] = str(CHECK_MIN_REFERENCES)
+    from modules.market_prices import MarketPriceStore, parse_listing_page
+    from modules.price_analyzer import estimate_price_range, get_price_estimate, market_estimate
+
+    errors = []
+
+    def expect(condition, message):
+        print(f"   {'✅' if condition else '❌'} {message}")
+        if not condition:
+            errors.append(message)
+
+    for name, expected in EXPECTED_LISTINGS.items():
+        with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+            listings = parse_listing_page(f.read(), url=f"file://{name}")
+        parsed = {}
+        for listing in listings:
+            key = (listing['type'], listing['brand'], listing['condition'])
+            parsed.setdefault(key, []).append(listing['price'])
+        parsed = {key: sorted(prices) for key, prices in parsed.items()}
+        count = sum(len(prices) for prices in expected.values())
+        expect(len(listings) == count, f"{name} : {len(listings)} annonce(s), {count} attendue(s)")
+        expect(parsed == expected, f"{name} : types, marques, états et prix extraits")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_market_store(tmp)
+        store = MarketPriceStore(path, min_references=CHECK_MIN_REFERENCES)
+        stats = {key: (value['p25'], value['p50'], value['p75'], value['count'])
+                 for key, value in store._load().items()}
+        for key, expected in EXPECTED_STATS.items():
+            expect(stats.get(key) == expected, f"quartiles {key} : {stats.get(key)}, attendu {expected}")
+        expect(len(stats) == len(EXPECTED_STATS), f"{len(stats)} groupe(s), {len(EXPECTED_STATS)} attendu(s)")
+
+        # Assez de références : quartiles du groupe (marque insensible à la casse)
+        found = store.lookup('t-shirt', 'NIKE', 'bon')
+        expect(found == {'p25': 8.0, 'p50': 10.0, 'p75': 14.0, 'count': 9}, f"lookup t-shirt Nike bon : {found}")
+        for item_type, brand, condition in [('t-shirt', 'Nike', 'neuf'), ('sac', 'Louis Vuitton', 'très bon'),
+                                            ('robe', 'Zara', 'bon')]:
+            found = store.lookup(item_type, brand, condition)
+            expect(found is None, f"lookup {item_type} {brand} {condition} sous le seuil : {found}")
+
+        # Estimation : médiane du marché, ou règles quand le groupe est trop petit
+        os.environ['MARKET_PRICES_PATH'] = path
+        estimate = get_price_estimate('t-shirt', 'Nike', 'bon')
+        expected = market_estimate({'p25': 8.0, 'p50': 10.0, 'p75': 14.0, 'count': 9})
+        expect(estimate == expected, f"estimation t-shirt Nike bon (marché) : {estimate}")
+        estimate = get_price_estimate('t-shirt', 'Nike', 'neuf')
+        expected_range = estimate_price_range('t-shirt', 'Nike', 'neuf')
+        expect(estimate['nb_references'] == 0 and (estimate['prix_min'], estimate['prix_max']) == expected_range,
+               f"estimation t-shirt Nike neuf (règles, 3 références) : {estimate}")
+
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du calcul de prix")
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--market", action="store_true", help="Utiliser la base de prix des fixtures")
+    parser.add_argument("--check", action="store_true", help="Vérifier la base de prix des fixtures, sans mesure")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+
+    if args.check:
+        print("\n🔎 Base de prix des pages de test")
+        errors = check_fixtures()
+        print(f"\n{'❌ ' + str(len(errors)) + ' écart(s)' if errors else '✅ Conforme'}\n")
+        sys.exit(1 if errors else 0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['MARKET_PRICES_PATH'] = build_market_store(tmp) if args.market else os.path.join(tmp, "absent")
+
+        from modules.price_analyzer import get_price_estimate, get_price_estimates_batch
+
+        types, brands, conditions = make_inventory(args.items)
+
+        start = time.perf_counter()
+        scalar = [get_price_estimate(t, b, c) for t, b, c in zip(types, brands, conditions)]
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = get_price_estimates_batch(types, brands, conditions)
+        batch_time = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for i, expected in enumerate(scalar)
+        if any(int(batch[key][i]) != value for key, value in expected.items())
+    )
+    with_references = int((batch['nb_references'] > 0).sum())
+
+    print(f"\n💶 {args.items} articles ({with_references} couverts par la base de prix)")
+    print(f"   Boucle scalaire : {scalar_time * 1000:8.1f} ms")
+    print(f"   Batch vectorisé : {batch_time * 1000:8.1f} ms  (x{scalar_time / batch_time:.1f})")
+    print(f"   Différences     : {mismatches}\n")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
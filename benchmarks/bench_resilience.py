@@ -0,0 +1,112 @@
+# benchmarks/bench_resilience.py
+"""
+Comportement de l'appel Claude face à une API dégradée (stub à pannes)
+
+Trois phases : API saine, panne (réponses lentes ou 529), rétablissement.
+On mesure la durée de chaque analyse, les analyses de secours et l'état
+du disjoncteur ; puis le gain des requêtes doublées sur la latence de
+queue quand une partie des réponses est lente.
+
+Usage :
+    python -m benchmarks.bench_resilience --requests 30 --slow-latency 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_phase(name, count, analyze, is_fallback, breaker):
+    durations = []
+    fallbacks = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        result = analyze()
+        durations.append(time.perf_counter() - start)
+        fallbacks += is_fallback(result)
+    print(f"{name:<16} médiane {statistics.median(durations):6.2f}s  "
+          f"max {max(durations):6.2f}s  secours {fallbacks:>3}/{count}  "
+          f"disjoncteur {breaker.state}")
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disjoncteur et requêtes doublées")
+    parser.add_argument("--requests", type=int, default=30, help="Analyses par phase")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence normale du stub (s)")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Latence d'une réponse lente (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="Réponses lentes pour le doublement")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.stub_claude import StubClaudeServer
+
+    stub = StubClaudeServer(latency=args.latency, slow_latency=args.slow_latency)
+    os.environ["ANTHROPIC_API_URL"] = stub.start()
+    # Timeout de lecture court pour que la panne reste mesurable
+    os.environ.setdefault("ANTHROPIC_READ_TIMEOUT", str(args.slow_latency / 2))
+    os.environ.setdefault("CIRCUIT_OPEN_DURATION", "3")
+    os.environ.setdefault("CIRCUIT_SLOW_CALL", str(args.slow_latency / 4))
+
+    import app
+    from modules.circuit_breaker import CircuitBreaker
+
+    fallback = app.get_fallback_analysis('fr')
+
+    def analyze():
+        return app.analyze_with_claude([], 'fr', deadline=time.monotonic() + app.ANALYSIS_DEADLINE)
+
+    def is_fallback(result):
+        return result == fallback
+
+    breaker = app.claude_breaker
+    print("=== Panne puis rétablissement ===")
+    run_phase("API saine", args.requests, analyze, is_fallback, breaker)
+
+    stub.config['slow_rate'] = 1.0
+    run_phase("API lente", args.requests, analyze, is_fallback, breaker)
+
+    stub.config['slow_rate'] = 0.0
+    stub.config['error_rate'] = 1.0
+    run_phase("API en 529", args.requests, analyze, is_fallback, breaker)
+
+    stub.config['error_rate'] = 0.0
+    time.sleep(breaker.open_duration)
+    run_phase("Rétablie", args.requests, analyze, is_fallback, breaker)
+    print(f"Compteurs : {breaker.stats()}")
+
+    print(f"\n=== {args.slow_rate:.0%} de réponses lentes : sans / avec doublement ===")
+    stub.config['slow_rate'] = args.slow_rate
+    results = {}
+    for hedge in (False, True):
+        app.claude_breaker = CircuitBreaker(slow_call=args.slow_latency * 2, hedge=hedge, hedge_min_delay=0.1,
+                                            min_latency_samples=10, is_failure=app.is_upstream_failure)
+        # Amorçage des latences pour le p95
+        for _ in range(10):
+            stub.config['slow_rate'] = 0.0
+            analyze()
+        stub.config['slow_rate'] = args.slow_rate
+        durations = run_phase("avec doublement" if hedge else "sans doublement",
+                              args.requests * 3, analyze, is_fallback, app.claude_breaker)
+        results[hedge] = durations
+
+    for hedge, durations in results.items():
+        print(f"{'avec' if hedge else 'sans'} : p50 {percentile(durations, 0.5):.2f}s  "
+              f"p95 {percentile(durations, 0.95):.2f}s  p99 {percentile(durations, 0.99):.2f}s")
+    print(f"Requêtes doublées : {app.claude_breaker.stats()['hedged']}, "
+          f"gagnées par le doublon : {app.claude_breaker.stats()['hedge_wins']}")
+    print(f"Requêtes reçues par le stub : {stub.message_requests}")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
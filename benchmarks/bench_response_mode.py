@@ -0,0 +1,78 @@
+# benchmarks/bench_response_mode.py
+"""
+Compare les deux formats de réponse de Claude (CLAUDE_RESPONSE_MODE) :
+tokens de sortie et durée de bout en bout de analyze_with_claude
+
+- full : Claude rédige le titre et la description
+- compact : Claude renvoie les attributs codés, le texte est généré localement
+
+Le stub Claude simule la génération (délai par morceau de 8 caractères) :
+la durée dépend donc de la longueur de la réponse, comme avec l'API.
+
+Usage :
+    python -m benchmarks.bench_response_mode --latency 1.0 --token-delay 0.02
+    python -m benchmarks.bench_response_mode --stream
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Format de réponse complet contre compact")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=1.0, help="Délai avant le premier token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Délai par morceau généré (s)")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--stream", action="store_true", help="Réponse streamée champ par champ")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.stub_claude import StubClaudeServer
+
+    stub = StubClaudeServer(latency=args.latency, token_delay=args.token_delay)
+    os.environ["ANTHROPIC_API_URL"] = stub.start()
+
+    from app import analyze_with_claude
+    from modules import claude_analysis
+    from modules.metrics import usage_stats
+
+    on_field = (lambda name, value: None) if args.stream else None
+    results = {}
+    for mode in claude_analysis.RESPONSE_MODES:
+        claude_analysis.RESPONSE_MODE = mode
+        before = usage_stats()
+        durations = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            analysis = analyze_with_claude([], args.language, on_field=on_field)
+            durations.append(time.perf_counter() - start)
+        after = usage_stats()
+        results[mode] = {
+            'output_tokens': (after['output_tokens'] - before['output_tokens']) / args.runs,
+            'input_tokens': (after['input_tokens'] - before['input_tokens']) / args.runs,
+            'median': statistics.median(durations),
+            'title': analysis['title']
+        }
+
+    print(f"\n✍️ {args.runs} analyses par format (latence {args.latency}s, {args.token_delay}s par morceau"
+          f"{', streaming' if args.stream else ''})\n")
+    print(f"   {'format':<10}{'tokens sortie':>15}{'tokens prompt':>15}{'durée':>9}   titre")
+    for mode, result in results.items():
+        print(f"   {mode:<10}{result['output_tokens']:>15.0f}{result['input_tokens']:>15.0f}"
+              f"{result['median']:>8.2f}s   {result['title']}")
+
+    full, compact = results['full'], results['compact']
+    print(f"\n   Compact : {1 - compact['output_tokens'] / full['output_tokens']:.0%} de tokens de sortie en moins,"
+          f" {full['median'] - compact['median']:.2f} s gagnées par analyse\n")
+
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
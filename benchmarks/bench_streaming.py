@@ -0,0 +1,55 @@
+# benchmarks/bench_streaming.py
+"""
+Mesure le délai avant le premier champ utile : réponse complète
+contre streaming champ par champ (stub Claude à génération simulée)
+
+Usage :
+    python -m benchmarks.bench_streaming --latency 1.0 --token-delay 0.02
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Délai avant le premier champ")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=1.0, help="Délai avant le premier token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Délai par morceau généré (s)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.stub_claude import StubClaudeServer
+
+    stub = StubClaudeServer(latency=args.latency, token_delay=args.token_delay)
+    os.environ["ANTHROPIC_API_URL"] = stub.start()
+
+    from app import analyze_with_claude
+
+    blocking, first_field, streamed_total = [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        analyze_with_claude([], 'fr')
+        blocking.append(time.perf_counter() - start)
+
+        first = []
+        start = time.perf_counter()
+        analyze_with_claude([], 'fr', on_field=lambda name, value: first.append(time.perf_counter()))
+        streamed_total.append(time.perf_counter() - start)
+        first_field.append(first[0] - start)
+
+    print(f"\n📡 {args.runs} analyses (latence {args.latency}s, {args.token_delay}s par morceau)\n")
+    print(f"   Sans streaming : premier champ après {statistics.median(blocking):.2f} s")
+    print(f"   Streaming      : premier champ après {statistics.median(first_field):.2f} s"
+          f" (réponse complète {statistics.median(streamed_total):.2f} s)\n")
+
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
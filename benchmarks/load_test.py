@@ -0,0 +1,259 @@
+# benchmarks/load_test.py
+"""
+Test de charge de /analyze contre un stub Claude, pour dimensionner le
+service (« combien de vendeurs simultanés pour 2 workers ? »)
+
+Pour chaque configuration (classe de worker × nombre de workers), lance
+gunicorn contre le stub puis envoie des uploads multipart réalistes à
+concurrence croissante :
+- 1 à 5 photos par annonce
+- surtout des photos déjà réduites par le navigateur (1200 px), et une
+  part de photos de téléphone pleine taille (12 Mpx)
+- chaque photo est unique : le cache d'analyse ne répond jamais à la place de Claude
+
+Rapporte le débit, les latences p50/p95/p99, le taux d'erreurs et le
+taux d'analyses de secours (compteur vintedbot_fallback_total de /metrics),
+puis la concurrence maximale qui respecte le SLO pour chaque configuration.
+
+Usage :
+    python -m benchmarks.load_test --worker-class sync gevent --workers 1 2 --concurrency 1 5 10 25
+    python -m benchmarks.load_test --latency 3 --latency-sigma 0.5 --error-rate 0.02 --output charge.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import requests
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Photo réduite par le navigateur, et photo de téléphone (portrait ou paysage)
+BROWSER_SIZES = [(1200, 900), (900, 1200)]
+PHONE_SIZES = [(4032, 3024), (3024, 4032)]
+
+FALLBACK_METRIC = re.compile(r'^vintedbot_fallback_total\{[^}]*\} ([0-9.e+]+)$', re.MULTILINE)
+
+
+class PhotoFactory:
+    """
+    Photos JPEG réalistes (texture, grain) et toutes différentes
+
+    Les textures de base sont générées une fois par taille ; chaque photo
+    y ajoute une marque unique avant l'encodage JPEG.
+    """
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self._bases = {}
+        self._counter = 0
+
+    def _base(self, size):
+        if size not in self._bases:
+            width, height = size
+            # Dégradé coloré + grain : taille de fichier proche d'une vraie photo
+            x = np.linspace(0, 255, width, dtype=np.float32)
+            y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+            pixels = np.empty((height, width, 3), dtype=np.float32)
+            pixels[..., 0] = x
+            pixels[..., 1] = y
+            pixels[..., 2] = (x + y) / 2
+            pixels += self.rng.normal(0, 18, (height, width, 1)).astype(np.float32)
+            self._bases[size] = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        return self._bases[size]
+
+    def photo(self, size):
+        self._counter += 1
+        img = self._base(size).copy()
+        # Marque unique : un bloc dont la couleur encode le compteur
+        color = (self._counter % 256, (self._counter // 256) % 256, (self._counter // 65536) % 256)
+        img.paste(color, (0, 0, 64, 64))
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=88)
+        return buffer.getvalue()
+
+
+def make_payloads(factory, count, full_size_ratio, rng):
+    """Une liste de photos (1 à 5) par requête"""
+    payloads = []
+    for _ in range(count):
+        photos = []
+        for _ in range(rng.randint(1, 5)):
+            sizes = PHONE_SIZES if rng.random() < full_size_ratio else BROWSER_SIZES
+            photos.append(factory.photo(rng.choice(sizes)))
+        payloads.append(photos)
+    return payloads
+
+
+def start_app(worker_class, workers, port, stub_url, work_dir):
+    """Démarre gunicorn et attend que /health réponde"""
+    name = f"{worker_class}-{workers}"
+    env = dict(os.environ,
+               PORT=str(port),
+               WEB_WORKER_CLASS=worker_class,
+               WEB_CONCURRENCY=str(workers),
+               ANTHROPIC_API_URL=stub_url,
+               ANALYSIS_CACHE_PATH=os.path.join(work_dir, f"{name}.sqlite3"),
+               JOBS_DB_PATH=os.path.join(work_dir, f"{name}-jobs.sqlite3"),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(work_dir, f"{name}-metrics"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"gunicorn ({name}) n'a pas démarré")
+
+
+def fallback_count(base_url):
+    """Analyses de secours renvoyées depuis le démarrage (tous workers)"""
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=5).text
+    except requests.RequestException:
+        return 0.0
+    return sum(float(value) for value in FALLBACK_METRIC.findall(text))
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def run_level(base_url, payloads, concurrency):
+    """Envoie toutes les requêtes avec `concurrency` clients simultanés"""
+
+    def send(photos):
+        files = [('photos', (f'photo{j}.jpg', data, 'image/jpeg')) for j, data in enumerate(photos)]
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{base_url}/analyze", files=files,
+                                     data={'language': 'fr'}, timeout=180)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    fallbacks_before = fallback_count(base_url)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, payloads))
+    elapsed = time.perf_counter() - start
+    fallbacks = fallback_count(base_url) - fallbacks_before
+
+    total = len(results)
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'photos': sum(len(photos) for photos in payloads),
+        'throughput': total / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'error_rate': errors / total,
+        'fallback_rate': fallbacks / total
+    }
+
+
+def capacity(levels, slo, max_failure_rate):
+    """Plus forte concurrence testée qui respecte le SLO (p95) et le taux d'échec, sans palier raté avant"""
+    best = None
+    for level in levels:
+        if level['p95'] > slo or level['error_rate'] + level['fallback_rate'] > max_failure_rate:
+            break
+        best = level['concurrency']
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de /analyze")
+    parser.add_argument("--worker-class", nargs="+", default=["sync", "gevent"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[2])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 5, 10, 25])
+    parser.add_argument("--requests-per-client", type=int, default=3,
+                        help="Requêtes par client à chaque palier (minimum 10 au total)")
+    parser.add_argument("--full-size-ratio", type=float, default=0.1,
+                        help="Part des photos envoyées en pleine taille (12 Mpx)")
+    parser.add_argument("--latency", type=float, default=2.0, help="Latence médiane du stub Claude (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Dispersion log-normale (0 = fixe)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses 529 du stub")
+    parser.add_argument("--slo", type=float, default=10.0, help="p95 maximal acceptable (s)")
+    parser.add_argument("--max-failure-rate", type=float, default=0.01,
+                        help="Erreurs + analyses de secours acceptables")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Résultats détaillés en JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.stub_claude import StubClaudeServer
+
+    stub = StubClaudeServer(latency=args.latency, latency_sigma=args.latency_sigma, error_rate=args.error_rate)
+    stub_url = stub.start()
+
+    print(f"\n🚦 Latence Claude médiane {args.latency}s (σ {args.latency_sigma}), "
+          f"erreurs {args.error_rate:.0%}, photos pleine taille {args.full_size_ratio:.0%}\n")
+    print(f"   {'config':<12}{'clients':>8}{'req':>6}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}"
+          f"{'erreurs':>9}{'secours':>9}")
+
+    factory = PhotoFactory(args.seed)
+    rng = random.Random(args.seed)
+    report = []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for worker_class in args.worker_class:
+            for workers in args.workers:
+                name = f"{worker_class}×{workers}"
+                process, base_url = start_app(worker_class, workers, args.port, stub_url, work_dir)
+                levels = []
+                try:
+                    for concurrency in args.concurrency:
+                        # Photos générées avant le palier : le client ne prend pas de CPU pendant la mesure
+                        payloads = make_payloads(factory, max(10, concurrency * args.requests_per_client),
+                                                 args.full_size_ratio, rng)
+                        level = run_level(base_url, payloads, concurrency)
+                        levels.append(level)
+                        print(f"   {name:<12}{concurrency:>8}{level['requests']:>6}{level['throughput']:>8.2f}"
+                              f"{level['p50']:>7.2f}s{level['p95']:>7.2f}s{level['p99']:>7.2f}s"
+                              f"{level['error_rate']:>9.1%}{level['fallback_rate']:>9.1%}")
+                finally:
+                    process.terminate()
+                    process.wait()
+
+                report.append({'worker_class': worker_class, 'workers': workers, 'levels': levels,
+                               'capacity': capacity(levels, args.slo, args.max_failure_rate)})
+
+    print(f"\n📈 Concurrence maximale avec p95 ≤ {args.slo}s et échecs ≤ {args.max_failure_rate:.0%} :")
+    for entry in report:
+        tested = max(args.concurrency)
+        value = entry['capacity']
+        label = "aucune" if value is None else (f"≥ {value}" if value == tested else str(value))
+        print(f"   {entry['worker_class'] + '×' + str(entry['workers']):<12} {label}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': report}, f, indent=2)
+        print(f"\n💾 Résultats détaillés : {args.output}")
+
+    stub.shutdown()
+    print()
+
+
+if __name__ == "__main__":
+    main()
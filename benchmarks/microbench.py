@@ -0,0 +1,294 @@
+# benchmarks/microbench.py
+"""
+Micro-benchmarks des chemins critiques du paquet modules, avec références
+
+Chemins mesurés (fixtures fixes, générées de façon déterministe) :
+- image_analyzer.analyze_image et analyze_multiple_photos
+- price_analyzer.get_price_range
+- description_generator.generate_listing et optimize_for_search
+- prétraitement des photos de app.analyze() (preprocess_images)
+
+Chaque cas est mesuré en meilleur temps sur plusieurs répétitions, puis
+divisé par une boucle d'étalonnage exécutée sur la même machine : les
+références (benchmarks/baseline.json) restent comparables d'une machine à
+l'autre. Le code de sortie vaut 1 si un cas régresse au-delà du seuil.
+Aucun accès réseau : la base de prix du marché est ignorée.
+
+Usage :
+    python -m benchmarks.microbench                    # comparaison aux références
+    python -m benchmarks.microbench --update-baseline  # enregistre les références
+    python -m benchmarks.microbench --only analyze_image --threshold 0.3
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Durée minimale d'une répétition : les appels courts sont groupés
+MIN_REPEAT_SECONDS = 0.1
+DEFAULT_REPEATS = 7
+DEFAULT_THRESHOLD = 0.25
+
+# Nouvelles mesures d'un cas en régression avant d'échouer (bruit de la machine)
+CONFIRM_RUNS = 2
+
+# Photos des fixtures : (largeur, hauteur, couleur du vêtement, couleur du fond)
+FIXTURE_PHOTOS = [
+    (1200, 1600, (200, 30, 40), (235, 235, 230)),    # maillot rouge, portrait
+    (1600, 1200, (20, 40, 120), (240, 240, 240)),    # jean bleu, paysage
+    (1000, 1000, (110, 70, 40), (225, 220, 210)),    # sac marron, carré
+    (900, 1800, (15, 15, 15), (250, 250, 250)),      # robe noire, très haute
+]
+
+# Photos de téléphone pour le prétraitement (12 Mpx)
+FIXTURE_UPLOAD_SIZE = (4000, 3000)
+FIXTURE_UPLOADS = 3
+
+
+def make_photo(width, height, garment, background, seed):
+    """Photo synthétique déterministe : vêtement sur fond uni, avec du grain"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    pixels = np.empty((height, width, 3), dtype=np.int16)
+    pixels[:] = background
+    top, bottom = height // 8, height * 7 // 8
+    left, right = width // 5, width * 4 // 5
+    pixels[top:bottom, left:right] = garment
+    pixels += rng.integers(-12, 13, size=(height, width, 1), dtype=np.int16)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def write_fixtures(directory):
+    """
+    Écrit les fixtures dans `directory`
+
+    Returns:
+        dict: photos (chemins), uploads (octets JPEG bruts)
+    """
+    from io import BytesIO
+
+    photos = []
+    for seed, (width, height, garment, background) in enumerate(FIXTURE_PHOTOS):
+        path = os.path.join(directory, f"photo_{seed}.jpg")
+        make_photo(width, height, garment, background, seed).save(path, quality=90)
+        photos.append(path)
+
+    uploads = []
+    for seed in range(FIXTURE_UPLOADS):
+        width, height, garment, background = FIXTURE_PHOTOS[seed]
+        buffer = BytesIO()
+        make_photo(*FIXTURE_UPLOAD_SIZE, garment, background, 100 + seed).save(buffer, format='JPEG', quality=92)
+        uploads.append(buffer.getvalue())
+
+    return {'photos': photos, 'uploads': uploads}
+
+
+def calibrate():
+    """
+    Boucle d'étalonnage : interpréteur Python, NumPy et Pillow, comme les
+    chemins mesurés
+
+    Returns:
+        float: Meilleur temps (s)
+    """
+    import numpy as np
+    from PIL import Image
+
+    img = Image.new('RGB', (800, 600), (120, 80, 40))
+    array = np.arange(200_000, dtype=np.float64)
+
+    def work():
+        total = 0
+        for i in range(300_000):
+            total += i % 7
+        for _ in range(60):
+            np.sqrt(array).sum()
+        for _ in range(3):
+            img.resize((400, 300), Image.Resampling.LANCZOS)
+        return total
+
+    return measure(work, repeats=2 * DEFAULT_REPEATS)[0]
+
+
+def measure(func, repeats=DEFAULT_REPEATS):
+    """
+    Meilleur temps par appel, sur `repeats` répétitions d'au moins
+    MIN_REPEAT_SECONDS
+
+    Returns:
+        tuple: (secondes par appel, appels par répétition)
+    """
+    func()  # Préchauffage (imports, caches, pool de threads)
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_REPEAT_SECONDS:
+            break
+        number *= max(2, min(10, int(MIN_REPEAT_SECONDS / max(elapsed, 1e-9))))
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number, number
+
+
+def build_cases(fixtures):
+    """Cas mesurés : nom -> fonction sans argument"""
+    from modules.description_generator import generate_listing, optimize_for_search
+    from modules.image_analyzer import analyze_image, analyze_multiple_photos
+    from modules.image_preprocessing import preprocess_images
+    from modules.price_analyzer import BASE_PRICES, CONDITION_MULTIPLIERS, get_price_range
+
+    photos = fixtures['photos']
+    uploads = fixtures['uploads']
+    item_types = list(BASE_PRICES) + ['inconnu']
+    brands = ['Nike', 'Zara', None, 'Marque locale']
+    conditions = list(CONDITION_MULTIPLIERS)
+    combinations = [(item_type, brand, condition)
+                    for item_type in item_types for brand in brands for condition in conditions]
+
+    listings = [('t-shirt', ['noir'], 'bon', 'Nike', 'fr'), ('jean', ['bleu'], 'très bon', None, 'en'),
+                ('sac', ['marron', 'beige'], 'neuf', 'Zara', 'fr'), ('robe', ['rouge'], 'satisfaisant', None, 'fr')]
+    long_title = "  Maillot   officiel  " * 12
+    long_description = "Très bon état, porté quelques fois. " * 40
+
+    return {
+        'analyze_image': lambda: analyze_image(photos[0]),
+        'analyze_multiple_photos': lambda: analyze_multiple_photos(photos),
+        'get_price_range': lambda: [get_price_range(*combination) for combination in combinations],
+        'generate_listing': lambda: [generate_listing(item_type, colors, condition, brand, language)
+                                     for item_type, colors, condition, brand, language in listings],
+        'optimize_for_search': lambda: optimize_for_search(long_title, long_description),
+        'preprocess_images': lambda: preprocess_images(uploads),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_suite(only=None, repeats=DEFAULT_REPEATS):
+    """
+    Mesure l'étalonnage puis chaque cas
+
+    Returns:
+        dict: {'calibration_s', 'cases': {nom: {'per_call_us', 'normalized', 'number'}}}
+    """
+    # Hors ligne et déterministe : pas de base de prix du marché
+    os.environ['MARKET_PRICES_PATH'] = os.devnull + ".absent"
+    sys.path.insert(0, ROOT)
+
+    with tempfile.TemporaryDirectory() as directory:
+        fixtures = write_fixtures(directory)
+        cases = build_cases(fixtures)
+        if only:
+            unknown = set(only) - set(cases)
+            if unknown:
+                raise SystemExit(f"Cas inconnus : {', '.join(sorted(unknown))}")
+            cases = {name: func for name, func in cases.items() if name in only}
+
+        # Étalonnage avant et après : le meilleur des deux écarte un ralentissement passager
+        calibration = calibrate()
+        timings = {name: measure(func, repeats) for name, func in cases.items()}
+        calibration = min(calibration, calibrate())
+
+        results = {}
+        for name, (per_call, number) in timings.items():
+            results[name] = {
+                'per_call_us': float(f"{per_call * 1e6:.4g}"),
+                'normalized': float(f"{per_call / calibration:.4g}"),
+                'number': number
+            }
+
+    return {'calibration_s': float(f"{calibration:.4g}"), 'cases': results}
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare les temps normalisés aux références
+
+    Returns:
+        list: Noms des cas en régression
+    """
+    regressions = []
+    print(f"{'Cas':<26}{'µs/appel':>12}{'normalisé':>12}{'référence':>12}{'écart':>9}")
+    for name, result in results['cases'].items():
+        reference = (baseline or {}).get('cases', {}).get(name)
+        if reference is None:
+            print(f"{name:<26}{result['per_call_us']:>12.1f}{result['normalized']:>12.4g}{'-':>12}{'-':>9}")
+            continue
+        change = result['normalized'] / reference['normalized'] - 1
+        status = ''
+        if change > threshold:
+            regressions.append(name)
+            status = '  ❌'
+        print(f"{name:<26}{result['per_call_us']:>12.1f}{result['normalized']:>12.4g}"
+              f"{reference['normalized']:>12.4g}{change:>+8.0%}{status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des chemins critiques")
+    parser.add_argument("--only", nargs="+", help="Cas à mesurer")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression tolérée (0.25 = +25 %% du temps normalisé)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistre les mesures comme références")
+    args = parser.parse_args()
+
+    results = run_suite(args.only, args.repeats)
+    print(f"⏱️ Étalonnage : {results['calibration_s'] * 1000:.1f} ms")
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {'cases': {}}
+        baseline['cases'].update(results['cases'])
+        baseline['calibration_s'] = results['calibration_s']
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        compare(results, None, args.threshold)
+        print(f"✅ Références enregistrées dans {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠️ Aucune référence ({args.baseline}) : lancer avec --update-baseline")
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(CONFIRM_RUNS):
+        if not regressions:
+            break
+        # Un pic de charge passager ne suffit pas : on garde la meilleure mesure
+        print(f"🔁 Nouvelle mesure : {', '.join(regressions)}")
+        retry = run_suite(regressions, args.repeats)
+        for name, result in retry['cases'].items():
+            if result['normalized'] < results['cases'][name]['normalized']:
+                results['cases'][name] = result
+        regressions = compare({'cases': {name: results['cases'][name] for name in regressions}},
+                              baseline, args.threshold)
+    if regressions:
+        print(f"❌ Régression au-delà de {args.threshold:.0%} : {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ Aucune régression")
+
+
+if __name__ == "__main__":
+    main()
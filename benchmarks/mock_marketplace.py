@@ -0,0 +1,140 @@
+# benchmarks/mock_marketplace.py
+"""
+Fausse API de marketplace pour tester modules.vinted_poster
+
+- POST /api/v2/photos et POST /api/v2/items
+- Limite de débit (429 + Retry-After au-delà du quota)
+- Pannes injectées, y compris des réponses perdues APRÈS la création
+- Respect de l'en-tête Idempotency-Key : une clé déjà vue renvoie l'objet
+  existant au lieu d'en créer un nouveau
+
+Usage :
+    python -m benchmarks.mock_marketplace --port 8090 --rate 10 --error-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockMarketplaceHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        server = self.server
+
+        if self.path not in ("/api/v2/photos", "/api/v2/items"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        if not server.allow_request():
+            self._send_json(429, {"error": "rate limited"}, {"Retry-After": "1"})
+            return
+
+        if server.config['latency'] > 0:
+            time.sleep(server.config['latency'])
+
+        # Panne avant traitement : rien n'est créé
+        if random.random() < server.config['error_rate'] / 2:
+            self._send_json(503, {"error": "unavailable"})
+            return
+
+        kind = "photo" if self.path.endswith("photos") else "item"
+        created = server.create(kind, self.headers.get("Idempotency-Key"))
+
+        # Panne après création : la réponse est perdue, le client réessaiera
+        if random.random() < server.config['error_rate'] / 2:
+            self._send_json(503, {"error": "unavailable"})
+            return
+
+        self._send_json(201, created)
+
+
+class MockMarketplaceServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=0, rate=10.0, error_rate=0.0, latency=0.0):
+        super().__init__((host, port), MockMarketplaceHandler)
+        self.config = {'rate': rate, 'error_rate': error_rate, 'latency': latency}
+        self.lock = threading.Lock()
+        self.objects = {'photo': {}, 'item': {}}
+        self.creations = {'photo': 0, 'item': 0}
+        self.rate_limited = 0
+        self._tokens = rate
+        self._updated = time.monotonic()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def allow_request(self):
+        """Quota de la plateforme : seau de jetons côté serveur"""
+        with self.lock:
+            now = time.monotonic()
+            rate = self.config['rate']
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.rate_limited += 1
+            return False
+
+    def create(self, kind, key):
+        """Crée un objet, ou renvoie celui déjà créé avec la même clé"""
+        with self.lock:
+            store = self.objects[kind]
+            if key and key in store:
+                return store[key]
+            self.creations[kind] += 1
+            created = {"id": self.creations[kind], "kind": kind}
+            store[key or f"anonymous-{self.creations[kind]}"] = created
+            return created
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fausse API de marketplace")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--rate", type=float, default=10.0, help="Requêtes/s autorisées")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence simulée (s)")
+    args = parser.parse_args()
+
+    server = MockMarketplaceServer(args.host, args.port, args.rate, args.error_rate, args.latency)
+    print(f"🛒 Marketplace simulée sur {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# benchmarks/stub_claude.py
+"""
+Faux serveur de l'API Claude (endpoint Messages) pour les benchmarks
+
+Usage :
+    python -m benchmarks.stub_claude --port 8089 --latency 0.5
+
+Puis lancer l'application avec ANTHROPIC_API_URL=http://127.0.0.1:8089
+
+La réponse suit le format demandé par le prompt : analyse complète
+(titre et description) ou attributs compacts (CLAUDE_RESPONSE_MODE=compact).
+Les tokens de sortie sont comptés sur le texte renvoyé.
+
+Simule aussi l'API Message Batches (/v1/messages/batches) : un lot est
+terminé `batch_delay` secondes après sa création.
+
+La latence suit une loi log-normale de médiane `latency` si
+`latency_sigma` > 0 (queue de distribution réaliste), fixe sinon.
+
+Injection de pannes (modifiable à chaud via `server.config`) :
+- error_rate : réponses 529 overloaded_error
+- slow_rate / slow_latency : réponses très lentes (API dégradée)
+- reset_rate : connexion fermée sans réponse
+"""
+
+import argparse
+import base64
+import json
+import math
+import random
+import socket
+import ssl
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ANALYSIS = {
+    "type": "Maillot Bayern Munich",
+    "brand": "Adidas",
+    "color": "Rouge",
+    "condition": "Très bon état",
+    "price": "30",
+    "title": "Maillot officiel Bayern Munich - Saison 2021/22",
+    "description": "Maillot officiel du Bayern Munich de la saison 2021/22, en très bon état. "
+                   "Couleurs vives, flocage et logos intacts, aucun défaut visible. "
+                   "Tissu respirant Adidas, coupe ajustée, taille M. "
+                   "Idéal pour les fans comme pour le sport, envoi soigné sous 48h !"
+}
+
+STUB_COMPACT = {"t": "maillot", "m": "Bayern Munich 2021/22", "b": "Adidas", "c": "rouge", "s": "très bon", "p": 30}
+
+# Caractères par morceau streamé (environ 2 tokens)
+CHUNK_CHARS = 8
+
+
+def block_tokens(block):
+    """Tokens d'un bloc de contenu : ~4 caractères par token, l × h / 750 par image"""
+    from io import BytesIO
+    from PIL import Image
+
+    if block.get("type") == "text":
+        return math.ceil(len(block["text"]) / 4)
+    if block.get("type") == "image":
+        width, height = Image.open(BytesIO(base64.b64decode(block["source"]["data"]))).size
+        return min(1600, math.ceil(width * height / 750))
+    return 0
+
+
+def compute_usage(request):
+    """
+    Tokens d'entrée d'une requête, comme l'API les facture
+
+    Returns:
+        dict: input_tokens
+    """
+    tokens = 0
+    for message in request.get("messages", []):
+        content = message.get("content", [])
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        tokens += sum(block_tokens(block) for block in content)
+    return {"input_tokens": tokens}
+
+
+def response_text(request):
+    """Texte renvoyé : attributs compacts si le prompt ne demande pas de description"""
+    prompt = ""
+    for message in request.get("messages", []):
+        content = message.get("content", [])
+        if isinstance(content, str):
+            prompt += content
+        else:
+            prompt += "".join(block.get("text", "") for block in content)
+    if '"description"' in prompt or not prompt:
+        return "```json\n" + json.dumps(STUB_ANALYSIS, ensure_ascii=False) + "\n```"
+    return json.dumps(STUB_COMPACT, ensure_ascii=False, separators=(",", ":"))
+
+
+def output_tokens(text):
+    """Tokens de sortie d'un texte : ~4 caractères par token, comme block_tokens"""
+    return math.ceil(len(text) / 4)
+
+
+def sample_latency(config):
+    """Latence d'une réponse : fixe, ou log-normale de médiane config['latency']"""
+    if config['latency_sigma'] > 0:
+        return config['latency'] * random.lognormvariate(0, config['latency_sigma'])
+    return config['latency']
+
+
+def build_message(text, usage=None):
+    """Construit une réponse Messages au format de l'API"""
+    usage = dict(usage or {"input_tokens": 1500})
+    usage["output_tokens"] = output_tokens(text)
+    return {
+        "id": f"msg_stub_{random.randrange(1 << 32):08x}",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-sonnet-4-20250514",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": usage
+    }
+
+
+class StubClaudeHandler(BaseHTTPRequestHandler):
+    """Répond aux requêtes Messages après une latence simulée"""
+
+    # HTTP/1.1 : le keep-alive est possible, comme sur la vraie API
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_event(self, event, payload):
+        """Écrit un événement SSE dans un morceau HTTP (chunked)"""
+        data = f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream_message(self, text, token_delay, usage):
+        """Renvoie le texte morceau par morceau, comme l'API en streaming"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        message = build_message("", usage)
+        message["content"] = []
+        message["usage"]["output_tokens"] = output_tokens(text)
+        self._send_event("message_start", {"type": "message_start", "message": message})
+        self._send_event("content_block_start", {
+            "type": "content_block_start", "index": 0,
+            "content_block": {"type": "text", "text": ""}
+        })
+        for i in range(0, len(text), CHUNK_CHARS):
+            if token_delay > 0:
+                time.sleep(token_delay)
+            self._send_event("content_block_delta", {
+                "type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": text[i:i + CHUNK_CHARS]}
+            })
+        self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._send_event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn"},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]}
+        })
+        self._send_event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _batch_object(self, batch):
+        """Objet message_batch tel que renvoyé par l'API"""
+        ended = time.time() >= batch["ends_at"]
+        total = len(batch["results"])
+        errored = sum(1 for r in batch["results"] if r["result"]["type"] == "errored")
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total - errored if ended else 0,
+                "errored": errored if ended else 0,
+                "canceled": 0,
+                "expired": 0
+            },
+            "results_url": f"{self.server.url}/v1/messages/batches/{batch['id']}/results" if ended else None
+        }
+
+    def _create_batch(self, body):
+        """Enregistre un lot : chaque requête est traitée comme /v1/messages"""
+        config = self.server.config
+        results = []
+        for item in json.loads(body)["requests"]:
+            if random.random() < config['error_rate']:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "overloaded_error"}}}
+            else:
+                message = build_message(response_text(item["params"]), self.server.usage(item["params"]))
+                result = {"type": "succeeded", "message": message}
+            results.append({"custom_id": item["custom_id"], "result": result})
+
+        batch = {"id": f"msgbatch_stub_{uuid.uuid4().hex[:16]}", "results": results,
+                 "ends_at": time.time() + config['batch_delay']}
+        with self.server.lock:
+            self.server.batches[batch["id"]] = batch
+            self.server.batch_requests += len(results)
+        self._send_json(200, self._batch_object(batch))
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        batch = None
+        if len(parts) >= 4 and parts[:3] == ["v1", "messages", "batches"]:
+            batch = self.server.batches.get(parts[3])
+        if batch is None:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+            return
+
+        with self.server.lock:
+            self.server.batch_polls += 1
+
+        if len(parts) == 5 and parts[4] == "results":
+            body = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch["results"]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send_json(200, self._batch_object(batch))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self.path == "/v1/messages/batches":
+            self._create_batch(body)
+            return
+
+        if self.path != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+            return
+
+        with self.server.lock:
+            self.server.message_requests += 1
+
+        config = self.server.config
+        if random.random() < config['reset_rate']:
+            # Connexion coupée sans réponse (ConnectionError côté client)
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+
+        if random.random() < config['slow_rate']:
+            time.sleep(config['slow_latency'])
+        elif config['latency'] > 0:
+            time.sleep(sample_latency(config))
+
+        if random.random() < config['error_rate']:
+            self._send_json(529, {"type": "error", "error": {"type": "overloaded_error"}})
+            return
+
+        request = json.loads(body or b"{}")
+        usage = self.server.usage(request)
+        text = response_text(request)
+        if request.get("stream"):
+            self._stream_message(text, config['token_delay'], usage)
+            return
+
+        # Sans streaming, la génération complète est attendue avant la réponse
+        if config['token_delay'] > 0:
+            time.sleep(config['token_delay'] * -(-len(text) // CHUNK_CHARS))
+        self._send_json(200, build_message(text, usage))
+
+
+class StubClaudeServer(ThreadingHTTPServer):
+    """Serveur multi-thread configurable, démarrable en arrière-plan"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0,
+                 certfile=None, keyfile=None, token_delay=0.0, batch_delay=2.0,
+                 slow_rate=0.0, slow_latency=60.0, reset_rate=0.0,
+                 latency_sigma=0.0):
+        super().__init__((host, port), StubClaudeHandler)
+        self.config = {'latency': latency, 'error_rate': error_rate, 'token_delay': token_delay,
+                       'batch_delay': batch_delay, 'slow_rate': slow_rate, 'slow_latency': slow_latency, 'reset_rate': reset_rate,
+                       'latency_sigma': latency_sigma}
+        self.lock = threading.Lock()
+        self.message_requests = 0
+        self.batches = {}
+        self.batch_requests = 0
+        self.batch_polls = 0
+        self.scheme = "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+            self.scheme = "https"
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        # Client parti avant la réponse (timeout, requête doublée) : attendu
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def usage(self, request):
+        """Consommation de tokens d'une requête"""
+        return compute_usage(request)
+
+    def start(self):
+        """Démarre le serveur dans un thread et retourne son URL"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self.url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur de l'API Claude")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence simulée (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.0,
+                        help="Dispersion log-normale de la latence (0 = fixe)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses 529")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Délai par morceau généré (s)")
+    parser.add_argument("--batch-delay", type=float, default=2.0, help="Durée de traitement d'un lot (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Proportion de réponses très lentes")
+    parser.add_argument("--slow-latency", type=float, default=60.0, help="Latence des réponses lentes (s)")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Proportion de connexions coupées")
+    parser.add_argument("--certfile", help="Certificat TLS (optionnel)")
+    parser.add_argument("--keyfile", help="Clé privée TLS (optionnel)")
+    args = parser.parse_args()
+
+    server = StubClaudeServer(args.host, args.port, args.latency, args.error_rate,
+                              args.certfile, args.keyfile, args.token_delay, args.batch_delay,
+                              args.slow_rate, args.slow_latency, args.reset_rate,
+                              args.latency_sigma)
+    print(f"🤖 Stub Claude sur {server.url} (latence {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 # Configuration Vinted
 VINTED_EMAIL = os.getenv("VINTED_EMAIL", "")
 VINTED_PASSWORD = os.getenv("VINTED_PASSWORD", "")
+VINTED_API_URL = os.getenv("VINTED_API_URL", "https://www.vinted.fr")
+VINTED_ACCESS_TOKEN = os.getenv("VINTED_ACCESS_TOKEN", "")
+VINTED_RATE_LIMIT = float(os.getenv("VINTED_RATE_LIMIT", 2))  # requêtes/s
 
 # Dossiers
 TEMP_IMAGE_FOLDER = "data/temp_images"
@@ -0,0 +1,40 @@
+# gunicorn.conf.py
+"""
+Configuration gunicorn
+
+Par défaut, workers `gevent` : un appel à Claude bloqué jusqu'à 45 s ne
+monopolise plus un worker, chaque worker garde des centaines d'analyses
+en attente. Le travail CPU part dans un pool de threads (modules/workers.py).
+WEB_WORKER_CLASS=sync restaure l'ancien mode.
+"""
+
+import os
+import shutil
+
+# Métriques Prometheus partagées entre les workers (fichiers par pid).
+# Défini avant le fork : prometheus_client le lit à l'import dans chaque worker
+METRICS_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.abspath('data/metrics'))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 500))
+timeout = 120
+
+
+def post_worker_init(worker):
+    """Reprend les jobs d'analyse laissés par un worker précédent"""
+    from app import job_runner
+    job_runner.recover()
+
+
+def on_starting(server):
+    """Repart de métriques vides : les fichiers d'un lancement précédent fausseraient les compteurs"""
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Les métriques d'un worker arrêté restent comptées, ses jauges « live » non"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,16 +3,22 @@ Bot Vinted Automatisé avec IA
 Analyse les photos, génère les descriptions et propose les prix
 """
 
+import argparse
+import json
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Ajouter le dossier modules au path
 sys.path.append(str(Path(__file__).parent))
 
-from modules.image_analyzer import ImageAnalyzer
-from modules.price_analyzer import PriceAnalyzer
-from modules.description_generator import DescriptionGenerator
+from modules.image_analyzer import analyze_image, detect_brand
+from modules.price_analyzer import get_price_estimate
+from modules.description_generator import generate_listing
+
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
 
 def print_banner():
     """Affiche le logo du bot"""
@@ -24,6 +30,36 @@ def print_banner():
     ╚═══════════════════════════════════════════╝
     """)
 
+def analyze_product(image_path):
+    """Étape 1 : type, couleurs, état et marque à partir de la photo"""
+    item_type, colors, condition = analyze_image(image_path)
+    return {
+        "type": item_type,
+        "marque": detect_brand(image_path),
+        "couleur": colors[0] if colors else 'multicolore',
+        "couleurs": colors,
+        "etat": condition,
+        "taille": "À préciser"
+    }
+
+def calculate_price(product_info):
+    """Étape 2 : fourchette et prix recommandé"""
+    return get_price_estimate(
+        product_info['type'], product_info['marque'], product_info['etat']
+    )
+
+def create_listing(product_info, price_info, language='fr'):
+    """Étape 3 : titre et description de l'annonce"""
+    title, description = generate_listing(
+        product_info['type'], product_info['couleurs'], product_info['etat'],
+        product_info['marque'], language, f"{price_info['prix_recommande']}€"
+    )
+    return {
+        "titre": title,
+        "description": description,
+        "prix": price_info['prix_recommande']
+    }
+
 def process_image(image_path):
     """
     Traite une image complètement : analyse, prix, description
@@ -37,24 +73,18 @@ def process_image(image_path):
     print(f"\n📸 Traitement de l'image : {image_path}\n")
     
     # ÉTAPE 1 : Analyser l'image
-    print("🔍 ÉTAPE 1/3 : Analyse de l'image avec IA...")
-    analyzer = ImageAnalyzer()
-    product_info = analyzer.analyze_product(image_path)
-    
-    if not product_info:
-        print("❌ Impossible d'analyser l'image")
-        return None
+    print("🔍 ÉTAPE 1/3 : Analyse de l'image...")
+    product_info = analyze_product(image_path)
     
     print(f"\n   Type : {product_info['type']}")
-    print(f"   Marque : {product_info['marque']}")
+    print(f"   Marque : {product_info['marque'] or 'Non identifiée'}")
     print(f"   Couleur : {product_info['couleur']}")
     print(f"   État : {product_info['etat']}")
     print(f"   Taille : {product_info['taille']}")
     
     # ÉTAPE 2 : Analyser les prix du marché
     print("\n💰 ÉTAPE 2/3 : Analyse des prix du marché...")
-    price_analyzer = PriceAnalyzer()
-    price_info = price_analyzer.calculate_optimal_price(product_info)
+    price_info = calculate_price(product_info)
     
     print(f"\n   Prix recommandé : {price_info['prix_recommande']}€")
     print(f"   Fourchette : {price_info['prix_min']}€ - {price_info['prix_max']}€")
@@ -62,8 +92,7 @@ def process_image(image_path):
     
     # ÉTAPE 3 : Générer l'annonce
     print("\n✍️ ÉTAPE 3/3 : Génération de l'annonce...")
-    desc_generator = DescriptionGenerator()
-    listing = desc_generator.create_full_listing(product_info, price_info)
+    listing = create_listing(product_info, price_info)
     
     print(f"\n   Titre : {listing['titre']}")
     print(f"\n   Description :\n   {listing['description']}")
@@ -78,6 +107,23 @@ def process_image(image_path):
     
     return result
 
+def process_item(image_path, language='fr'):
+    """
+    Version silencieuse de process_image, exécutée dans les processus du pool
+    
+    Returns:
+        dict: Toutes les infos de l'annonce
+    """
+    product_info = analyze_product(image_path)
+    price_info = calculate_price(product_info)
+    listing = create_listing(product_info, price_info, language)
+    return {
+        "produit": product_info,
+        "prix": price_info,
+        "annonce": listing,
+        "image_path": image_path
+    }
+
 def save_draft(result, output_file="annonce_draft.txt"):
     """Sauvegarde le brouillon de l'annonce"""
     with open(output_file, "w", encoding="utf-8") as f:
@@ -105,6 +151,206 @@ def save_draft(result, output_file="annonce_draft.txt"):
     
     print(f"\n✅ Brouillon sauvegardé dans '{output_file}'")
 
+def find_photos(directory):
+    """Liste les photos d'un dossier (et de ses sous-dossiers), triées"""
+    return sorted(
+        str(path) for path in Path(directory).rglob('*')
+        if path.suffix.lower() in PHOTO_EXTENSIONS
+    )
+
+def load_done(output_file):
+    """
+    Lit les photos déjà traitées dans un fichier JSONL existant
+    
+    Une dernière ligne incomplète (arrêt brutal) est retirée du fichier
+    pour que la reprise écrive des lignes valides.
+    """
+    done = set()
+    if not os.path.exists(output_file):
+        return done
+    
+    with open(output_file, "rb+") as f:
+        content = f.read()
+        valid_end = content.rfind(b"\n") + 1
+        if valid_end < len(content):
+            f.truncate(valid_end)
+    
+    for line in content[:valid_end].decode("utf-8").splitlines():
+        try:
+            done.add(json.loads(line)["image_path"])
+        except (ValueError, KeyError):
+            continue
+    return done
+
+def run_batch(directory, output_file="annonces.jsonl", workers=None, language='fr'):
+    """
+    Traite toutes les photos d'un dossier avec un pool de processus
+    
+    Les annonces sont ajoutées au fichier JSONL au fil de l'eau : en cas
+    d'arrêt, une nouvelle exécution reprend là où la précédente s'est arrêtée.
+    
+    Returns:
+        tuple: (nombre d'annonces générées, nombre d'erreurs)
+    """
+    photos = find_photos(directory)
+    done = load_done(output_file)
+    todo = [photo for photo in photos if photo not in done]
+    
+    print(f"📂 {len(photos)} photos trouvées, {len(photos) - len(todo)} déjà traitées, {len(todo)} à traiter")
+    if not todo:
+        return 0, 0
+    
+    processed = 0
+    errors = 0
+    start = time.perf_counter()
+    
+    with open(output_file, "a", encoding="utf-8") as output, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_item, photo, language): photo for photo in todo}
+        
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                errors += 1
+                print(f"\n❌ {futures[future]} : {e}")
+            else:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                processed += 1
+            
+            elapsed = time.perf_counter() - start
+            rate = (processed + errors) / elapsed if elapsed > 0 else 0
+            print(f"\r   {processed + errors}/{len(todo)} • {rate:.1f} annonces/s • {errors} erreur(s)",
+                  end="", flush=True)
+    
+    print()
+    return processed, errors
+
+def batch_main(args):
+    """Point d'entrée de : python main.py batch <dossier>"""
+    parser = argparse.ArgumentParser(prog="python main.py batch",
+                                     description="Génère les annonces de toutes les photos d'un dossier")
+    parser.add_argument("directory", help="Dossier de photos")
+    parser.add_argument("--output", default="annonces.jsonl", help="Fichier JSONL de sortie")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--language", default="fr", choices=['fr', 'en', 'es', 'de'])
+    options = parser.parse_args(args)
+    
+    if not os.path.isdir(options.directory):
+        print(f"❌ Erreur : Le dossier '{options.directory}' n'existe pas")
+        return
+    
+    processed, errors = run_batch(options.directory, options.output, options.workers, options.language)
+    print(f"\n✅ {processed} annonce(s) ajoutée(s) à '{options.output}'"
+          + (f", {errors} erreur(s)" if errors else ""))
+
+def bulk_main(args):
+    """Point d'entrée de : python main.py bulk <dossier> (analyse Claude par lots)"""
+    from modules.batch_analysis import POLL_MIN_INTERVAL, run_bulk_analysis
+    
+    parser = argparse.ArgumentParser(prog="python main.py bulk",
+                                     description="Analyse un stock de photos avec Claude via l'API Message Batches")
+    parser.add_argument("directory", help="Dossier d'articles (un sous-dossier par article, ou une photo par article)")
+    parser.add_argument("--output", default="analyses.jsonl", help="Fichier JSONL de sortie")
+    parser.add_argument("--language", default="fr", choices=['fr', 'en', 'es', 'de'])
+    parser.add_argument("--poll", type=float, default=POLL_MIN_INTERVAL, help="Intervalle d'interrogation des lots (s)")
+    options = parser.parse_args(args)
+    
+    if not os.path.isdir(options.directory):
+        print(f"❌ Erreur : Le dossier '{options.directory}' n'existe pas")
+        return
+    
+    stats = run_bulk_analysis(options.directory, options.output, options.language,
+                              done=load_done(options.output), poll_interval=options.poll)
+    print(f"\n✅ {stats['succeeded']} analyse(s) ajoutée(s) à '{options.output}'"
+          + (f", {stats['failed']} échec(s) (relancer pour les resoumettre)" if stats['failed'] else ""))
+    usage = stats['usage']
+    if usage['requests']:
+        print(f"   Tokens : {usage['input_tokens']} en entrée, {usage['output_tokens']} en sortie")
+
+def publish_main(args):
+    """Point d'entrée de : python main.py publish <annonces.jsonl>"""
+    from config import VINTED_ACCESS_TOKEN, VINTED_API_URL, VINTED_RATE_LIMIT
+    from modules.vinted_poster import VintedPoster
+
+    parser = argparse.ArgumentParser(prog="python main.py publish",
+                                     description="Publie les annonces générées par `python main.py batch`")
+    parser.add_argument("input", nargs="?", default="annonces.jsonl", help="Fichier JSONL d'annonces")
+    parser.add_argument("--api-url", default=VINTED_API_URL)
+    parser.add_argument("--rate", type=float, default=VINTED_RATE_LIMIT,
+                        help="Requêtes par seconde autorisées")
+    parser.add_argument("--concurrency", type=int, default=4, help="Annonces publiées simultanément")
+    parser.add_argument("--log", default="publications.jsonl", help="Journal des annonces publiées")
+    options = parser.parse_args(args)
+
+    if not os.path.exists(options.input):
+        print(f"❌ Erreur : Le fichier '{options.input}' n'existe pas")
+        return
+
+    with open(options.input, encoding='utf-8') as f:
+        listings = [json.loads(line) for line in f if line.strip()]
+
+    # Les annonces déjà publiées (journal) ne sont pas renvoyées
+    done = load_done(options.log)
+    listings = [listing for listing in listings if listing.get('image_path') not in done]
+    print(f"📤 {len(listings)} annonce(s) à publier sur {options.api_url}")
+
+    with open(options.log, 'a', encoding='utf-8') as log:
+        def on_result(listing, result, error):
+            # Annonce éventuellement mal formée : c'est peut-être la cause de l'échec
+            label = (listing.get('annonce') or {}).get('titre') or listing.get('image_path') or '?'
+            if error:
+                print(f"   ❌ {label} : {error}")
+                return
+            log.write(json.dumps({"image_path": listing.get('image_path'), "item": result},
+                                 ensure_ascii=False) + "\n")
+            log.flush()
+            print(f"   ✅ {label}")
+
+        with VintedPoster(options.api_url, VINTED_ACCESS_TOKEN or None,
+                          rate=options.rate) as poster:
+            stats = poster.publish_many(listings, options.concurrency, on_result)
+
+    print(f"\n✅ {stats['published']} annonce(s) publiée(s) en {stats['elapsed']:.1f} s"
+          f" ({stats['listings_per_minute']:.0f} annonces/minute)"
+          + (f", {stats['failed']} échec(s)" if stats['failed'] else ""))
+
+def prices_main(args):
+    """Point d'entrée de : python main.py prices <ingest|fetch|stats>"""
+    from modules.market_prices import DEFAULT_MARKET_PATH, MarketPriceStore, fetch_sources, ingest_files
+
+    parser = argparse.ArgumentParser(prog="python main.py prices",
+                                     description="Base locale de prix du marché")
+    parser.add_argument("--db", default=os.environ.get('MARKET_PRICES_PATH', DEFAULT_MARKET_PATH))
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    ingest = commands.add_parser("ingest", help="Ingère des pages HTML enregistrées")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--source", default="local")
+    
+    commands.add_parser("fetch", help="Télécharge et ingère config.PRICE_SOURCES")
+    commands.add_parser("stats", help="Affiche l'état de la base")
+    options = parser.parse_args(args)
+    
+    store = MarketPriceStore(options.db)
+    
+    if options.command == "ingest":
+        added = ingest_files(store, options.files, options.source)
+    elif options.command == "fetch":
+        from config import PRICE_SOURCES
+        added = fetch_sources(store, PRICE_SOURCES)
+    else:
+        added = None
+    
+    if added is not None:
+        groups = store.rebuild_stats()
+        print(f"\n✅ {added} nouvelle(s) annonce(s), {groups} groupe(s) (type, marque, état)")
+    
+    summary = store.summary()
+    print(f"📊 {summary['listings']} annonce(s) en base, "
+          f"{summary['groups']} groupe(s) avec au moins {store.min_references} références")
+
 def main():
     """Fonction principale du programme"""
     print_banner()
@@ -112,9 +358,29 @@ def main():
     # Vérifier si une image est fournie
     if len(sys.argv) < 2:
         print("❌ Usage : python main.py chemin/vers/image.jpg")
+        print("          python main.py batch chemin/vers/dossier [--output annonces.jsonl]")
+        print("          python main.py bulk chemin/vers/dossier [--output analyses.jsonl]")
+        print("          python main.py publish annonces.jsonl")
+        print("          python main.py prices ingest pages/*.html")
         print("\nExemple : python main.py data/temp_images/tshirt.jpg")
         return
     
+    if sys.argv[1] == "batch":
+        batch_main(sys.argv[2:])
+        return
+    
+    if sys.argv[1] == "bulk":
+        bulk_main(sys.argv[2:])
+        return
+    
+    if sys.argv[1] == "publish":
+        publish_main(sys.argv[2:])
+        return
+    
+    if sys.argv[1] == "prices":
+        prices_main(sys.argv[2:])
+        return
+    
     image_path = sys.argv[1]
     
     # Vérifier que le fichier existe
@@ -139,8 +405,8 @@ def main():
             print("   1. Vérifie le brouillon dans 'annonce_draft.txt'")
             print("   2. Ajuste le prix si nécessaire")
             print("   3. Publie manuellement sur Vinted")
-            print("\n💡 Astuce : Pour automatiser la publication, il faudra")
-            print("   configurer Selenium avec tes identifiants Vinted")
+            print("\n💡 Astuce : Pour publier en masse, génère les annonces avec")
+            print("   'python main.py batch' puis lance 'python main.py publish'")
         
     except Exception as e:
         print(f"\n❌ ERREUR : {str(e)}")
@@ -148,4 +414,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,14 +4,17 @@
 Package modules pour le bot Vinted
 """
 
-from .image_analyzer import analyze_image, detect_brand
-from .price_analyzer import get_price_range
+from .image_analyzer import analyze_image, analyze_images_batch, detect_brand
+from .price_analyzer import get_price_estimate, get_price_estimates_batch, get_price_range
 from .description_generator import generate_listing
 from .translations import TRANSLATIONS
 
 __all__ = [
     'analyze_image',
+    'analyze_images_batch',
     'detect_brand',
+    'get_price_estimate',
+    'get_price_estimates_batch',
     'get_price_range',
     'generate_listing',
     'TRANSLATIONS'
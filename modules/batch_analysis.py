@@ -0,0 +1,283 @@
+# modules/batch_analysis.py
+"""
+Analyse en masse via l'API Message Batches
+
+Pour traiter un gros stock de photos sans contrainte de latence (la nuit),
+les analyses sont regroupées en lots asynchrones, facturés moitié prix :
+- un article = un sous-dossier de photos (jusqu'à 5), ou une photo seule
+- même préparation des photos et mêmes prompts que l'application web
+- les lots soumis sont enregistrés dans un fichier d'état : après une
+  interruption, la reprise interroge les lots en cours au lieu de les
+  soumettre à nouveau, et ignore les articles déjà écrits
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+
+from .claude_analysis import build_analysis_payload, parse_analysis
+from .http_client import create_message_batch, get_message_batch, iter_batch_results
+from .image_preprocessing import preprocess_images
+from .metrics import record_usage, usage_stats
+from .token_budget import fit_token_budget
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+MAX_PHOTOS_PER_ITEM = 5
+
+# Taille des lots (limites de l'API : 100 000 requêtes, 256 Mo)
+BATCH_MAX_REQUESTS = int(os.environ.get('CLAUDE_BATCH_MAX_REQUESTS', 10000))
+BATCH_MAX_BYTES = int(os.environ.get('CLAUDE_BATCH_MAX_BYTES', 100 * 1024 * 1024))
+
+# Interrogation des lots : intervalle croissant tant que rien ne change
+POLL_MIN_INTERVAL = 10
+POLL_MAX_INTERVAL = 300
+
+
+def find_items(directory):
+    """
+    Liste les articles d'un dossier
+
+    Returns:
+        list: (identifiant de l'article, chemins de ses photos), triés
+    """
+    items = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.is_dir():
+            photos = sorted(
+                os.path.join(entry.path, name) for name in os.listdir(entry.path)
+                if name.lower().endswith(PHOTO_EXTENSIONS)
+            )
+            if photos:
+                items.append((entry.path, photos[:MAX_PHOTOS_PER_ITEM]))
+        elif entry.name.lower().endswith(PHOTO_EXTENSIONS):
+            items.append((entry.path, [entry.path]))
+    return items
+
+
+def custom_id(item):
+    """Identifiant de requête stable (format imposé : [a-zA-Z0-9_-]{1,64})"""
+    return hashlib.sha256(item.encode()).hexdigest()[:40]
+
+
+def build_request(item, photos, language):
+    """
+    Prépare la requête d'un article, sérialisée pour le corps du lot
+
+    Returns:
+        bytes: {"custom_id": ..., "params": ...} en JSON
+    """
+    raw = []
+    for path in photos:
+        with open(path, 'rb') as f:
+            raw.append(f.read())
+    images, _ = fit_token_budget(preprocess_images(raw))
+    images_base64 = [base64.b64encode(image).decode() for image in images]
+
+    entry = {"custom_id": custom_id(item), "params": build_analysis_payload(images_base64, language)}
+    return json.dumps(entry, ensure_ascii=False).encode()
+
+
+class BatchState:
+    """
+    Lots soumis et pas encore récupérés, enregistrés sur disque
+
+    Format : {"batches": {id: {"items": {custom_id: [article, photos]}}}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.batches = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.batches = json.load(f).get('batches', {})
+
+    def save(self):
+        # Écriture atomique : un arrêt brutal ne corrompt pas l'état
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'batches': self.batches}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def pending_items(self):
+        return {item for batch in self.batches.values() for item, _ in batch['items'].values()}
+
+    def add(self, batch_id, items):
+        self.batches[batch_id] = {'items': items, 'submitted_at': time.time()}
+        self.save()
+
+    def remove(self, batch_id):
+        self.batches.pop(batch_id, None)
+        self.save()
+
+
+def submit_batch(parts, items, state):
+    """Envoie un lot et l'enregistre dans l'état"""
+    body = b'{"requests":[' + b','.join(parts) + b']}'
+    response = create_message_batch(body)
+    if response.status_code != 200:
+        raise RuntimeError(f"Création du lot refusée : {response.status_code} - {response.text[:200]}")
+
+    batch_id = response.json()['id']
+    state.add(batch_id, items)
+    print(f"   📦 Lot {batch_id} : {len(items)} article(s), {len(body) / 1e6:.1f} Mo")
+    return batch_id
+
+
+def submit_items(todo, language, state, max_requests=BATCH_MAX_REQUESTS, max_bytes=BATCH_MAX_BYTES):
+    """
+    Regroupe les articles en lots bornés (nombre de requêtes et octets)
+
+    Returns:
+        int: Nombre de lots soumis
+    """
+    parts, items, size, submitted = [], {}, 0, 0
+    for item, photos in todo:
+        try:
+            part = build_request(item, photos, language)
+        except (OSError, ValueError) as e:
+            print(f"   ❌ {item} : {e}")
+            continue
+
+        if parts and (len(parts) >= max_requests or size + len(part) > max_bytes):
+            submit_batch(parts, items, state)
+            submitted += 1
+            parts, items, size = [], {}, 0
+
+        parts.append(part)
+        items[custom_id(item)] = [item, photos]
+        size += len(part) + 1
+
+    if parts:
+        submit_batch(parts, items, state)
+        submitted += 1
+    return submitted
+
+
+def collect_batch(batch, output, language, done=()):
+    """
+    Écrit les résultats d'un lot terminé dans le fichier de sortie
+
+    Les articles de `done` (déjà écrits avant une interruption en pleine
+    récupération) sont ignorés.
+
+    Returns:
+        tuple: (succès, échecs)
+    """
+    succeeded = failed = 0
+    for line in iter_batch_results(batch['results_url']):
+        entry = batch['items'].get(line['custom_id'])
+        if entry is None:
+            continue
+        item, photos = entry
+        if item in done:
+            continue
+        result = line['result']
+        try:
+            if result['type'] != 'succeeded':
+                raise ValueError(result['type'])
+            record_usage(result['message'].get('usage'))
+            analysis = parse_analysis(result['message']['content'][0]['text'], language)
+        except (KeyError, IndexError, ValueError) as e:
+            # Non écrit : l'article sera resoumis au prochain lancement
+            print(f"   ❌ {item} : {e}")
+            failed += 1
+            continue
+
+        output.write(json.dumps({
+            "image_path": item,
+            "photos": photos,
+            "language": language,
+            "analyse": analysis
+        }, ensure_ascii=False) + "\n")
+        succeeded += 1
+    output.flush()
+    return succeeded, failed
+
+
+def wait_for_batches(state, output, language, poll_interval=POLL_MIN_INTERVAL, done=()):
+    """
+    Interroge les lots en cours jusqu'à ce qu'ils soient tous récupérés
+
+    L'intervalle double (jusqu'à POLL_MAX_INTERVAL) tant qu'aucun lot ne
+    progresse : un lot peut prendre jusqu'à 24 h.
+
+    Returns:
+        tuple: (succès, échecs)
+    """
+    succeeded = failed = 0
+    interval = poll_interval
+    progress = {}
+
+    while state.batches:
+        changed = False
+        for batch_id in list(state.batches):
+            try:
+                response = get_message_batch(batch_id)
+                response.raise_for_status()
+                info = response.json()
+            except Exception as e:
+                print(f"   ⚠️ Lot {batch_id} : {e}")
+                continue
+
+            counts = info.get('request_counts', {})
+            if counts != progress.get(batch_id):
+                progress[batch_id] = counts
+                changed = True
+
+            if info['processing_status'] != 'ended':
+                continue
+
+            batch = dict(state.batches[batch_id], results_url=info['results_url'])
+            ok, ko = collect_batch(batch, output, language, done)
+            succeeded += ok
+            failed += ko
+            state.remove(batch_id)
+            changed = True
+            print(f"   ✅ Lot {batch_id} terminé : {ok} analyse(s), {ko} échec(s)")
+
+        if not state.batches:
+            break
+        interval = poll_interval if changed else min(interval * 2, POLL_MAX_INTERVAL)
+        time.sleep(interval)
+
+    return succeeded, failed
+
+
+def run_bulk_analysis(directory, output_file="analyses.jsonl", language='fr', done=(),
+                      poll_interval=POLL_MIN_INTERVAL, max_requests=BATCH_MAX_REQUESTS,
+                      max_bytes=BATCH_MAX_BYTES):
+    """
+    Analyse tous les articles d'un dossier via des lots Message Batches
+
+    Args:
+        directory: Dossier d'articles (sous-dossiers ou photos)
+        output_file: Fichier JSONL des analyses (complété, jamais écrasé)
+        language: Langue des analyses
+        done: Articles déjà présents dans `output_file`
+        poll_interval: Intervalle initial d'interrogation des lots (s)
+
+    Returns:
+        dict: Statistiques (articles, lots soumis, succès, échecs)
+    """
+    state = BatchState(f"{output_file}.batches.json")
+    pending = state.pending_items()
+    items = find_items(directory)
+    todo = [(item, photos) for item, photos in items if item not in done and item not in pending]
+
+    print(f"📂 {len(items)} article(s) : {len(done)} déjà analysé(s), "
+          f"{len(pending)} en cours dans {len(state.batches)} lot(s), {len(todo)} à soumettre")
+
+    submitted = submit_items(todo, language, state, max_requests, max_bytes)
+
+    with open(output_file, 'a', encoding='utf-8') as output:
+        succeeded, failed = wait_for_batches(state, output, language, poll_interval, done)
+
+    return {
+        'items': len(items),
+        'batches': submitted,
+        'succeeded': succeeded,
+        'failed': failed,
+        'usage': usage_stats()
+    }
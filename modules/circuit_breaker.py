@@ -0,0 +1,293 @@
+# modules/circuit_breaker.py
+"""
+Disjoncteur (circuit breaker) et requêtes doublées autour de l'appel Claude
+
+Quand l'API est dégradée, chaque analyse attendait le timeout de lecture
+complet avant l'analyse de secours, et deux workers bloqués suffisaient à
+rendre le site indisponible :
+- fermé : les appels passent ; les échecs récents (et les appels trop
+  lents, si CIRCUIT_SLOW_CALL est défini) sont comptés sur une fenêtre
+  glissante
+- ouvert : au-delà du seuil d'échecs, les appels échouent immédiatement
+  (analyse de secours sans attendre) pendant `open_duration` secondes
+- semi-ouvert : un seul appel sonde l'API ; succès = fermé, échec = ouvert
+- optionnellement, un appel qui dépasse le p95 des latences récentes est
+  doublé par une seconde requête ; la première réponse l'emporte
+
+L'état est propre à chaque worker gunicorn.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Levée quand le disjoncteur refuse un appel"""
+
+
+class DeadlineExceeded(Exception):
+    """Levée quand le délai global d'une analyse est écoulé"""
+
+
+def remaining(deadline):
+    """Secondes restantes avant `deadline` (time.monotonic), None = illimité"""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à fenêtre glissante, avec mesure des latences
+    """
+
+    def __init__(self, window=20, min_calls=5, failure_ratio=0.5, slow_call=None,
+                 open_duration=30.0, hedge=False, hedge_min_delay=2.0, latency_window=100,
+                 min_latency_samples=20, is_failure=None):
+        """
+        Args:
+            window: Nombre d'appels récents pris en compte
+            min_calls: Appels minimum dans la fenêtre avant d'ouvrir
+            failure_ratio: Proportion d'échecs qui ouvre le disjoncteur
+            slow_call: Durée (s) au-delà de laquelle un appel réussi compte comme un
+                échec ; None = désactivé (un aller-retour normal peut durer jusqu'au
+                timeout de lecture, qui reste compté comme un échec)
+            open_duration: Durée (s) avant la sonde en semi-ouvert
+            hedge: Doubler les appels plus lents que le p95
+            hedge_min_delay: Délai minimum (s) avant de doubler un appel
+            latency_window: Nombre de latences conservées pour le p95
+            min_latency_samples: Latences nécessaires avant de doubler
+            is_failure: Fonction résultat -> bool (ex : réponse HTTP 5xx)
+        """
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call = slow_call
+        self.open_duration = open_duration
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.min_latency_samples = min_latency_samples
+        self.is_failure = is_failure or (lambda result: False)
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=latency_window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.counters = {
+            'calls': 0,
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+            'deadline_exceeded': 0
+        }
+
+    @classmethod
+    def from_env(cls, is_failure=None):
+        """Construit le disjoncteur selon l'environnement"""
+        return cls(
+            window=int(os.environ.get('CIRCUIT_WINDOW', 20)),
+            min_calls=int(os.environ.get('CIRCUIT_MIN_CALLS', 5)),
+            failure_ratio=float(os.environ.get('CIRCUIT_FAILURE_RATIO', 0.5)),
+            slow_call=float(os.environ['CIRCUIT_SLOW_CALL']) if os.environ.get('CIRCUIT_SLOW_CALL') else None,
+            open_duration=float(os.environ.get('CIRCUIT_OPEN_DURATION', 30)),
+            hedge=os.environ.get('CLAUDE_HEDGE', '0') == '1',
+            hedge_min_delay=float(os.environ.get('CLAUDE_HEDGE_MIN_DELAY', 2)),
+            is_failure=is_failure
+        )
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def before_call(self):
+        """
+        Réserve un appel, ou lève CircuitOpenError
+
+        En semi-ouvert, un seul appel (la sonde) passe à la fois.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError("Disjoncteur ouvert")
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError("Sonde déjà en cours")
+                self._probe_in_flight = True
+
+            self.counters['calls'] += 1
+
+    def record(self, success, latency):
+        """Enregistre l'issue d'un appel réservé par before_call()"""
+        failed = not success or (self.slow_call is not None and latency > self.slow_call)
+        with self._lock:
+            if failed:
+                self.counters['failures'] += 1
+            elif success:
+                self._latencies.append(latency)
+
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    print("✅ Disjoncteur Claude refermé")
+                return
+
+            self._outcomes.append(failed)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio):
+                self._open()
+
+    def _open(self):
+        # Appelée sous self._lock
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.counters['opened'] += 1
+        print(f"⚡ Disjoncteur Claude ouvert pour {self.open_duration:.0f}s")
+
+    def p95_latency(self):
+        """p95 des latences réussies récentes (None si trop peu de mesures)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_latency_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def hedge_delay(self):
+        """Délai avant de doubler un appel (None = pas de doublement)"""
+        if not self.hedge:
+            return None
+        p95 = self.p95_latency()
+        if p95 is None:
+            return None
+        return max(p95, self.hedge_min_delay)
+
+    def call(self, func, deadline=None, max_timeout=None):
+        """
+        Exécute func(timeout) sous la protection du disjoncteur
+
+        Args:
+            func: Fonction appelée avec le timeout de lecture à utiliser
+            deadline: Échéance globale (time.monotonic), None = aucune
+            max_timeout: Timeout de lecture maximal (s)
+
+        Returns:
+            Résultat de func (le premier arrivé si l'appel est doublé)
+
+        Raises:
+            CircuitOpenError, DeadlineExceeded, ou l'exception de func
+        """
+        left = remaining(deadline)
+        if left is not None and left <= 0:
+            self._count('deadline_exceeded')
+            raise DeadlineExceeded("Délai de l'analyse écoulé")
+
+        self.before_call()
+        timeout = max_timeout
+        if left is not None:
+            timeout = left if timeout is None else min(timeout, left)
+
+        start = time.monotonic()
+        try:
+            result = self._run(func, timeout, left)
+        except DeadlineExceeded:
+            self._count('deadline_exceeded')
+            self.record(False, time.monotonic() - start)
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - start)
+            raise
+        self.record(not self.is_failure(result), time.monotonic() - start)
+        return result
+
+    def _run(self, func, timeout, left):
+        """Appel direct, ou doublé après hedge_delay() sans réponse"""
+        delay = self.hedge_delay()
+        if delay is None or (left is not None and delay >= left):
+            if left is None:
+                return func(timeout)
+            # Même sans doublement, le délai global borne l'attente
+            return self._race(func, timeout, left, None)
+        return self._race(func, timeout, left, delay)
+
+    def _race(self, func, timeout, left, hedge_delay):
+        """
+        Lance func dans un thread (deux si doublement) et retourne le
+        premier succès ; le perdant se termine seul à son timeout
+        """
+        results = queue.Queue()
+
+        def attempt(hedged):
+            try:
+                result = func(timeout)
+            except Exception as e:
+                results.put((hedged, None, e))
+            else:
+                results.put((hedged, result, None))
+
+        threading.Thread(target=attempt, args=(False,), daemon=True).start()
+        end = None if left is None else time.monotonic() + left
+        started = 1
+        last_error = None
+        last_result = None
+
+        while started:
+            wait = None if end is None else end - time.monotonic()
+            if hedge_delay is not None and started == 1 and last_error is None:
+                wait = hedge_delay if wait is None else min(wait, hedge_delay)
+            try:
+                hedged, result, error = results.get(timeout=wait if wait is None else max(wait, 0))
+            except queue.Empty:
+                if end is not None and time.monotonic() >= end:
+                    raise DeadlineExceeded("Délai de l'analyse écoulé")
+                # Pas de réponse après le p95 : seconde requête en parallèle
+                self._count('hedged')
+                threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                started += 1
+                hedge_delay = None
+                continue
+
+            started -= 1
+            if error is None and not self.is_failure(result):
+                if hedged:
+                    self._count('hedge_wins')
+                return result
+            last_error, last_result = error, result
+            hedge_delay = None
+
+        if last_error is not None:
+            raise last_error
+        return last_result
+
+    def stats(self):
+        """
+        État et compteurs de ce worker
+
+        Returns:
+            dict: État, appels, échecs, refus, doublements, p95 (s)
+        """
+        p95 = self.p95_latency()
+        with self._lock:
+            stats = dict(self.counters, state=self.state)
+        stats['p95_latency'] = round(p95, 3) if p95 is not None else None
+        return stats
@@ -0,0 +1,391 @@
+# modules/claude_analysis.py
+"""
+Requête d'analyse envoyée à Claude et lecture de sa réponse
+
+Partagé par l'application web (analyse interactive) et le mode bulk
+(modules.batch_analysis) : mêmes prompts, même post-traitement du JSON.
+
+Deux formats de réponse (CLAUDE_RESPONSE_MODE) :
+- full : Claude rédige aussi le titre et la description
+- compact : Claude ne renvoie que les attributs, codés par des valeurs
+  fixes (type, couleur, état) ; titre et description sont générés
+  localement par description_generator. Beaucoup moins de tokens de
+  sortie, donc une réponse plus rapide.
+"""
+
+import json
+import os
+
+from .description_generator import generate_listing
+from .translations import TRANSLATIONS
+
+MODEL = "claude-sonnet-4-20250514"
+MAX_TOKENS = 2048
+TEMPERATURE = 0.3  # Plus bas pour plus de précision
+
+# 'full' (titre et description rédigés par Claude) ou 'compact' (attributs seuls)
+RESPONSE_MODES = ('full', 'compact')
+RESPONSE_MODE = os.environ.get('CLAUDE_RESPONSE_MODE', 'full')
+if RESPONSE_MODE not in RESPONSE_MODES:
+    # Une faute de frappe ne doit pas revenir silencieusement au mode complet
+    raise ValueError(f"CLAUDE_RESPONSE_MODE invalide : {RESPONSE_MODE!r} (valeurs possibles : "
+                     f"{', '.join(RESPONSE_MODES)})")
+
+# Réponse compacte : une ligne de JSON, quelques dizaines de tokens
+COMPACT_MAX_TOKENS = 256
+
+# Prompts optimisés selon la langue
+ANALYSIS_PROMPTS = {
+    'fr': """Tu es un expert en analyse de vêtements et accessoires pour Vinted. Analyse ces photos avec PRÉCISION MAXIMALE.
+
+INSTRUCTIONS CRITIQUES :
+1. TYPE : Identifie le type EXACT (maillot de foot, t-shirt, pull, sweat, pantalon, chaussures, sac, etc.)
+   - Si c'est un maillot d'équipe sportive, dis "Maillot [équipe]" (ex: "Maillot Bayern Munich")
+   - Si incertain, choisis le type le plus proche mais PRÉCIS
+
+2. MARQUE : Détecte la marque VISIBLE sur les photos
+   - Cherche logos, étiquettes, inscriptions
+   - Pour les équipes : Bayern Munich, Real Madrid, FC Barcelona, PSG, etc.
+   - Pour marques sport : Nike, Adidas, Puma, etc.
+   - Si AUCUNE marque visible, écris "Non identifiée"
+
+3. COULEUR : Identifie la couleur DOMINANTE exacte (Rouge, Bleu, Noir, Blanc, Gris, Vert, etc.)
+
+4. ÉTAT : Estime l'état (Neuf avec étiquette, Très bon état, Bon état, Satisfaisant)
+
+5. PRIX : Suggère un prix réaliste basé sur :
+   - Type de produit
+   - Marque (équipes pro = 25-40€, marques sport = 15-30€, basique = 8-15€)
+   - État
+
+6. TITRE : Crée un titre accrocheur et précis (ex: "Maillot officiel Bayern Munich - Lewandowski #9 - Saison 2021/22")
+
+7. DESCRIPTION : Rédige une description attrayante, honnête et détaillée en 3-4 phrases.
+
+Réponds UNIQUEMENT en JSON :
+{
+    "type": "type exact du produit",
+    "brand": "marque détectée ou 'Non identifiée'",
+    "color": "couleur dominante",
+    "condition": "état estimé",
+    "price": "XX",
+    "title": "titre accrocheur",
+    "description": "description détaillée"
+}
+
+SOIS ULTRA-PRÉCIS. Analyse VRAIMENT les images.""",
+
+    'en': """You are an expert in analyzing clothing and accessories for Vinted. Analyze these photos with MAXIMUM PRECISION.
+
+CRITICAL INSTRUCTIONS:
+1. TYPE: Identify the EXACT type (football jersey, t-shirt, sweater, sweatshirt, pants, shoes, bag, etc.)
+   - If it's a sports team jersey, say "Jersey [team]" (e.g., "Bayern Munich Jersey")
+   - If uncertain, choose the closest but PRECISE type
+
+2. BRAND: Detect VISIBLE brand in photos
+   - Look for logos, labels, inscriptions
+   - For teams: Bayern Munich, Real Madrid, FC Barcelona, PSG, etc.
+   - For sport brands: Nike, Adidas, Puma, etc.
+   - If NO visible brand, write "Unidentified"
+
+3. COLOR: Identify exact DOMINANT color (Red, Blue, Black, White, Gray, Green, etc.)
+
+4. CONDITION: Estimate condition (New with tags, Very good, Good, Fair)
+
+5. PRICE: Suggest realistic price based on:
+   - Product type
+   - Brand (pro teams = €25-40, sport brands = €15-30, basic = €8-15)
+   - Condition
+
+6. TITLE: Create catchy and precise title (e.g., "Official Bayern Munich Jersey - Lewandowski #9 - 2021/22 Season")
+
+7. DESCRIPTION: Write attractive, honest and detailed description in 3-4 sentences.
+
+Respond ONLY in JSON:
+{
+    "type": "exact product type",
+    "brand": "detected brand or 'Unidentified'",
+    "color": "dominant color",
+    "condition": "estimated condition",
+    "price": "XX",
+    "title": "catchy title",
+    "description": "detailed description"
+}
+
+BE ULTRA-PRECISE. REALLY analyze the images.""",
+
+    'es': """Eres un experto en análisis de ropa y accesorios para Vinted. Analiza estas fotos con MÁXIMA PRECISIÓN.
+
+INSTRUCCIONES CRÍTICAS:
+1. TIPO: Identifica el tipo EXACTO (camiseta de fútbol, camiseta, jersey, sudadera, pantalón, zapatos, bolso, etc.)
+   - Si es una camiseta de equipo deportivo, di "Camiseta [equipo]" (ej: "Camiseta Bayern Munich")
+   - Si no estás seguro, elige el tipo más cercano pero PRECISO
+
+2. MARCA: Detecta marca VISIBLE en fotos
+   - Busca logos, etiquetas, inscripciones
+   - Para equipos: Bayern Munich, Real Madrid, FC Barcelona, PSG, etc.
+   - Para marcas deportivas: Nike, Adidas, Puma, etc.
+   - Si NO hay marca visible, escribe "No identificada"
+
+3. COLOR: Identifica color DOMINANTE exacto (Rojo, Azul, Negro, Blanco, Gris, Verde, etc.)
+
+4. ESTADO: Estima el estado (Nuevo con etiqueta, Muy buen estado, Buen estado, Aceptable)
+
+5. PRECIO: Sugiere precio realista basado en:
+   - Tipo de producto
+   - Marca (equipos pro = €25-40, marcas deportivas = €15-30, básico = €8-15)
+   - Estado
+
+6. TÍTULO: Crea título atractivo y preciso (ej: "Camiseta oficial Bayern Munich - Lewandowski #9 - Temporada 2021/22")
+
+7. DESCRIPCIÓN: Redacta descripción atractiva, honesta y detallada en 3-4 frases.
+
+Responde SOLO en JSON:
+{
+    "type": "tipo exacto de producto",
+    "brand": "marca detectada o 'No identificada'",
+    "color": "color dominante",
+    "condition": "estado estimado",
+    "price": "XX",
+    "title": "título atractivo",
+    "description": "descripción detallada"
+}
+
+SÉ ULTRA-PRECISO. Analiza REALMENTE las imágenes.""",
+
+    'de': """Du bist Experte für die Analyse von Kleidung und Accessoires für Vinted. Analysiere diese Fotos mit MAXIMALER PRÄZISION.
+
+KRITISCHE ANWEISUNGEN:
+1. TYP: Identifiziere den GENAUEN Typ (Fußballtrikot, T-Shirt, Pullover, Sweatshirt, Hose, Schuhe, Tasche, etc.)
+   - Wenn es ein Sportteam-Trikot ist, sage "Trikot [Team]" (z.B. "Bayern München Trikot")
+   - Wenn unsicher, wähle den nächsten aber PRÄZISEN Typ
+
+2. MARKE: Erkenne SICHTBARE Marke auf Fotos
+   - Suche nach Logos, Etiketten, Aufschriften
+   - Für Teams: Bayern München, Real Madrid, FC Barcelona, PSG, etc.
+   - Für Sportmarken: Nike, Adidas, Puma, etc.
+   - Wenn KEINE sichtbare Marke, schreibe "Nicht identifiziert"
+
+3. FARBE: Identifiziere genaue DOMINANTE Farbe (Rot, Blau, Schwarz, Weiß, Grau, Grün, etc.)
+
+4. ZUSTAND: Schätze Zustand (Neu mit Etikett, Sehr gut, Gut, Akzeptabel)
+
+5. PREIS: Schlage realistischen Preis vor basierend auf:
+   - Produkttyp
+   - Marke (Profi-Teams = €25-40, Sportmarken = €15-30, Basis = €8-15)
+   - Zustand
+
+6. TITEL: Erstelle ansprechenden und präzisen Titel (z.B. "Offizielles Bayern München Trikot - Lewandowski #9 - Saison 2021/22")
+
+7. BESCHREIBUNG: Verfasse attraktive, ehrliche und detaillierte Beschreibung in 3-4 Sätzen.
+
+Antworte NUR in JSON:
+{
+    "type": "genauer Produkttyp",
+    "brand": "erkannte Marke oder 'Nicht identifiziert'",
+    "color": "dominante Farbe",
+    "condition": "geschätzter Zustand",
+    "price": "XX",
+    "title": "ansprechender Titel",
+    "description": "detaillierte Beschreibung"
+}
+
+SEI ULTRA-PRÄZISE. Analysiere die Bilder WIRKLICH."""
+}
+
+
+# Valeurs codées : clés des traductions, communes à toutes les langues
+_CODES = TRANSLATIONS['fr']
+
+# Mode compact : un seul prompt, la langue ne sert qu'au rendu local
+COMPACT_PROMPT = f"""Tu es un expert en analyse de vêtements et accessoires pour Vinted. Analyse ces photos avec PRÉCISION et décris l'article par ses attributs UNIQUEMENT (pas de titre, pas de description).
+
+Réponds UNIQUEMENT avec un objet JSON sur une ligne, sans texte autour :
+{{"t":"<type>","m":"<modèle>","b":"<marque>","c":"<couleur>","s":"<état>","p":<prix>}}
+
+VALEURS :
+- t : type, une valeur parmi {', '.join(_CODES['types'])}
+- m : équipe, modèle ou collection visible, 5 mots maximum (ex: "Bayern Munich 2021/22"), null si rien de notable
+- b : marque VISIBLE (logos, étiquettes, inscriptions), null si aucune
+- c : couleur DOMINANTE, une valeur parmi {', '.join(_CODES['colors'])}
+- s : état, une valeur parmi {', '.join(_CODES['conditions'])} (neuf = avec étiquette)
+- p : prix réaliste en euros, nombre entier (équipes pro = 25-40, marques sport = 15-30, basique = 8-15)
+
+Analyse VRAIMENT les images."""
+
+# Marque absente, dans la langue de l'annonce (comme en mode complet)
+UNIDENTIFIED_BRAND = {
+    'fr': 'Non identifiée',
+    'en': 'Unidentified',
+    'es': 'No identificada',
+    'de': 'Nicht identifiziert'
+}
+
+
+def get_prompt(language, mode=None):
+    """Prompt d'analyse de la langue demandée (français par défaut)"""
+    if (mode or RESPONSE_MODE) == 'compact':
+        return COMPACT_PROMPT
+    return ANALYSIS_PROMPTS.get(language, ANALYSIS_PROMPTS['fr'])
+
+
+def build_analysis_payload(images_base64, language, mode=None):
+    """
+    Construit le corps de la requête Messages
+
+    Args:
+        images_base64: Photos JPEG encodées en base64
+        language: Langue de l'analyse
+        mode: Format de réponse, 'full' ou 'compact' (défaut : CLAUDE_RESPONSE_MODE)
+
+    Returns:
+        dict: Corps JSON pour /v1/messages
+    """
+    mode = mode or RESPONSE_MODE
+    if mode not in RESPONSE_MODES:
+        raise ValueError(f"Format de réponse inconnu : {mode!r}")
+    content = [{"type": "text", "text": get_prompt(language, mode)}]
+
+    for img_base64 in images_base64:
+        content.append({
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/jpeg",
+                "data": img_base64
+            }
+        })
+
+    return {
+        "model": MODEL,
+        "max_tokens": COMPACT_MAX_TOKENS if mode == 'compact' else MAX_TOKENS,
+        "temperature": TEMPERATURE,
+        "messages": [{
+            "role": "user",
+            "content": content
+        }]
+    }
+
+
+def parse_claude_json(text_content):
+    """Extrait et normalise le JSON de la réponse de Claude"""
+    # Extraire le JSON de la réponse
+    if '```json' in text_content:
+        text_content = text_content.split('```json')[1].split('```')[0].strip()
+    elif '```' in text_content:
+        text_content = text_content.split('```')[1].split('```')[0].strip()
+
+    result = json.loads(text_content)
+
+    # Formater le prix
+    if 'price' in result and result['price']:
+        result['price'] = format_price(result['price'])
+
+    return result
+
+
+def format_price(price):
+    """Normalise un prix au format 'XX€'"""
+    price_value = str(price).replace('€', '').replace('EUR', '').strip()
+    return f"{price_value}€"
+
+
+def is_compact(result):
+    """Réponse au format compact (attributs codés, sans titre)"""
+    return 't' in result and 'title' not in result
+
+
+def parse_analysis(text_content, language):
+    """
+    Analyse complète à partir de la réponse de Claude, quel que soit son
+    format (le format compact est reconnu à ses clés)
+    """
+    result = parse_claude_json(text_content)
+    if is_compact(result):
+        return render_compact_analysis(result, language)
+    return result
+
+
+# Champ affichable mis à jour par chaque attribut compact
+COMPACT_FIELDS = {'t': 'type', 'm': 'type', 'b': 'brand', 'c': 'color', 's': 'condition', 'p': 'price'}
+
+
+def streamed_fields(name, value, attributes, language):
+    """
+    Champs à transmettre pour un champ JSON reçu en streaming
+
+    Les attributs compacts sont accumulés dans `attributes` puis décodés
+    (le modèle `m` complète le type déjà transmis).
+
+    Returns:
+        list: (nom, valeur) à transmettre
+    """
+    if name not in COMPACT_FIELDS:
+        if name == 'price' and value:
+            value = format_price(value)
+        return [(name, value)]
+    attributes[name] = value
+    field = COMPACT_FIELDS[name]
+    fields = compact_fields(attributes, language)
+    return [(field, fields[field])] if field in fields else []
+
+
+def _capitalize(text):
+    """Majuscule initiale, sans toucher au reste (noms communs allemands)"""
+    return text[:1].upper() + text[1:]
+
+
+def _type_name(attributes, trans):
+    """Type affiché : type traduit, suivi du modèle ou de l'équipe"""
+    code = attributes.get('t') or 'accessoire'
+    name = trans['types'].get(code, code)
+    if attributes.get('m'):
+        name = f"{name} {attributes['m']}"
+    return name
+
+
+def compact_fields(attributes, language):
+    """
+    Champs affichables déjà connus d'une réponse compacte (éventuellement
+    partielle, en streaming) : type, marque, couleur, état, prix
+    """
+    trans = TRANSLATIONS.get(language, TRANSLATIONS['fr'])
+    fields = {}
+    if 't' in attributes:
+        fields['type'] = _type_name(attributes, trans)
+    if 'b' in attributes:
+        fields['brand'] = attributes['b'] or UNIDENTIFIED_BRAND.get(language, UNIDENTIFIED_BRAND['fr'])
+    if attributes.get('c'):
+        fields['color'] = _capitalize(trans['colors'].get(attributes['c'], attributes['c']))
+    if attributes.get('s'):
+        fields['condition'] = _capitalize(trans['conditions'].get(attributes['s'], attributes['s']))
+    if attributes.get('p'):
+        fields['price'] = format_price(attributes['p'])
+    return fields
+
+
+def render_compact_analysis(attributes, language):
+    """
+    Analyse complète (mêmes champs que le mode full) à partir des attributs
+    codés : titre et description générés localement
+    """
+    trans = TRANSLATIONS.get(language, TRANSLATIONS['fr'])
+    result = compact_fields(attributes, language)
+    item_type = attributes.get('t') or 'accessoire'
+    condition = attributes.get('s') or 'bon'
+    brand = attributes.get('b') or None
+
+    if 'price' not in result:
+        from .price_analyzer import get_suggested_price
+        result['price'] = format_price(get_suggested_price(item_type, brand, condition))
+
+    title, description = generate_listing(item_type, [attributes.get('c') or 'multicolore'], condition, brand,
+                                          language, model=attributes.get('m'))
+    # Attributs absents : mêmes valeurs par défaut que pour le rendu
+    result.setdefault('type', _type_name(attributes, trans))
+    result.setdefault('brand', UNIDENTIFIED_BRAND.get(language, UNIDENTIFIED_BRAND['fr']))
+    result.setdefault('color', _capitalize(trans['colors']['multicolore']))
+    result.setdefault('condition', _capitalize(trans['conditions']['bon']))
+    result['title'] = title
+    result['description'] = description
+    return result
@@ -6,7 +6,7 @@ Génération de titres et descriptions attractifs pour Vinted
 import random
 from .translations import TRANSLATIONS
 
-def generate_listing(item_type, colors, condition, brand=None, language='fr', price=None):
+def generate_listing(item_type, colors, condition, brand=None, language='fr', price=None, model=None):
     """
     Génère un titre et une description optimisés pour Vinted
     
@@ -17,6 +17,7 @@ def generate_listing(item_type, colors, condition, brand=None, language='fr', pr
         brand: Marque (optionnel)
         language: Langue ('fr', 'en', 'es', 'de')
         price: Prix suggéré (optionnel)
+        model: Modèle, équipe ou collection, ajouté au type (optionnel)
         
     Returns:
         tuple: (title, description)
@@ -25,6 +26,8 @@ def generate_listing(item_type, colors, condition, brand=None, language='fr', pr
     
     # Traductions
     type_name = trans['types'].get(item_type, item_type)
+    if model:
+        type_name = f"{type_name} {model}"
     color_name = trans['colors'].get(colors[0], colors[0]) if colors else 'multicolore'
     condition_name = trans['conditions'].get(condition, condition)
     
@@ -33,7 +36,8 @@ def generate_listing(item_type, colors, condition, brand=None, language='fr', pr
     
     # ===== GÉNÉRATION DE LA DESCRIPTION =====
     description = generate_description(
-        type_name, color_name, condition_name, brand, trans, price
+        type_name, color_name, condition_name, brand, trans, price,
+        type_key=item_type, condition_key=condition
     )
     
     return title, description
@@ -66,10 +70,15 @@ def generate_title(item_type, color, brand, trans):
     return random.choice(templates).strip()
 
 
-def generate_description(item_type, color, condition, brand, trans, price=None):
+def generate_description(item_type, color, condition, brand, trans, price=None,
+                         type_key=None, condition_key=None):
     """
     Génère une description complète et engageante
     
+    `type_key` et `condition_key` (clés non traduites, ex : 'pull', 'bon')
+    choisissent les textes propres au type et à l'état ; à défaut, les
+    noms affichés sont utilisés.
+    
     Structure optimale :
     1. Phrase d'accroche
     2. Détails du produit
@@ -102,7 +111,7 @@ def generate_description(item_type, color, condition, brand, trans, price=None):
         brand_section = None  # On ne met rien si pas de marque
     
     # 3. DÉTAILS SPÉCIFIQUES AU TYPE
-    type_details = get_type_specific_details(item_type, trans)
+    type_details = get_type_specific_details(type_key or item_type, trans)
     
     # 4. PRIX (si fourni)
     price_section = None
@@ -115,7 +124,7 @@ def generate_description(item_type, color, condition, brand, trans, price=None):
         'très bon': "Très bon état. Porté avec soin.",
         'bon': "Bon état général. Quelques signes d'usage normaux.",
         'satisfaisant': "État satisfaisant. Traces d'utilisation visibles."
-    }).get(condition, "Bon état général.")
+    }).get(condition_key or condition, "Bon état général.")
     
     # 6. INFOS PRATIQUES
     practical_info = trans.get('practical_info', [
@@ -0,0 +1,223 @@
+# modules/http_client.py
+"""
+Client HTTP persistant pour l'API Claude
+
+Une session `requests` par processus : les connexions TCP+TLS vers
+api.anthropic.com sont réutilisées d'une requête à l'autre (keep-alive).
+La session est recréée dans chaque worker après le fork de gunicorn.
+"""
+
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import record_upstream_status
+
+ANTHROPIC_API_URL = os.environ.get('ANTHROPIC_API_URL', 'https://api.anthropic.com').rstrip('/')
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Taille du pool de connexions par worker
+POOL_SIZE = int(os.environ.get('ANTHROPIC_POOL_SIZE', 10))
+
+# Timeouts séparés : connexion courte, lecture longue (génération du modèle)
+CONNECT_TIMEOUT = float(os.environ.get('ANTHROPIC_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('ANTHROPIC_READ_TIMEOUT', 45))
+
+# Réponses qui signalent une API dégradée (529 = overloaded_error)
+UPSTREAM_FAILURE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+def _create_session():
+    """Crée une session avec un pool de connexions keep-alive"""
+    session = requests.Session()
+
+    # Pas de retry automatique : un POST vers /v1/messages n'est pas idempotent
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers.update({
+        "Content-Type": "application/json",
+        "anthropic-version": ANTHROPIC_VERSION
+    })
+    api_key = os.environ.get('ANTHROPIC_API_KEY')
+    if api_key:
+        session.headers["x-api-key"] = api_key
+
+    return session
+
+
+def get_session():
+    """
+    Retourne la session HTTP du processus courant
+
+    Returns:
+        requests.Session: Session partagée par tous les threads du worker
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _create_session()
+                _session_pid = pid
+    return _session
+
+
+def _reset_after_fork():
+    """Oublie la session héritée du parent : ses sockets ne sont pas partageables"""
+    global _session, _session_pid, _lock
+    _session = None
+    _session_pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_timeout(read_timeout=None):
+    """
+    Retourne le couple (connexion, lecture) pour `requests`
+
+    Args:
+        read_timeout: Timeout de lecture spécifique (optionnel)
+    """
+    return (CONNECT_TIMEOUT, read_timeout if read_timeout is not None else READ_TIMEOUT)
+
+
+def is_upstream_failure(response):
+    """Indique si la réponse révèle une panne de l'API (et non une requête invalide)"""
+    return response.status_code in UPSTREAM_FAILURE_STATUS
+
+
+def post_messages(payload, read_timeout=None):
+    """
+    Envoie une requête à l'endpoint Messages via la session persistante
+
+    Args:
+        payload: Corps JSON de la requête
+        read_timeout: Timeout de lecture spécifique (optionnel)
+
+    Returns:
+        requests.Response: Réponse brute de l'API
+    """
+    return _send_messages(json=payload, timeout=get_timeout(read_timeout))
+
+
+def stream_messages(payload, read_timeout=None):
+    """
+    Envoie une requête Messages en mode streaming
+
+    Args:
+        payload: Corps JSON de la requête (sans le champ `stream`)
+        read_timeout: Timeout de lecture entre deux morceaux (optionnel)
+
+    Returns:
+        requests.Response: Réponse ouverte, à lire avec iter_events()
+    """
+    return _send_messages(json=dict(payload, stream=True), timeout=get_timeout(read_timeout), stream=True)
+
+
+def _send_messages(**kwargs):
+    """POST /v1/messages, avec comptage des codes de réponse"""
+    try:
+        response = get_session().post(f"{ANTHROPIC_API_URL}/v1/messages", **kwargs)
+    except requests.RequestException:
+        record_upstream_status('error')
+        raise
+    record_upstream_status(response.status_code)
+    return response
+
+
+def iter_events(response):
+    """
+    Décode le flux server-sent events de l'API Messages
+
+    Yields:
+        dict: Événements (message_start, content_block_delta, message_delta...)
+    """
+    # text/event-stream est toujours en UTF-8 (requests supposerait latin-1)
+    response.encoding = 'utf-8'
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith('data:'):
+            yield json.loads(line[5:].strip())
+
+
+def iter_text_deltas(response, usage=None):
+    """
+    Extrait les morceaux de texte générés d'un flux Messages
+
+    Args:
+        response: Réponse ouverte par stream_messages()
+        usage: Dict complété avec la consommation de tokens (optionnel)
+
+    Yields:
+        str: Morceaux de texte dans l'ordre de génération
+    """
+    for event in iter_events(response):
+        if usage is not None:
+            if event.get('type') == 'message_start':
+                usage.update(event.get('message', {}).get('usage', {}))
+            elif event.get('type') == 'message_delta':
+                usage.update(event.get('usage', {}))
+        if event.get('type') == 'content_block_delta':
+            delta = event.get('delta', {})
+            if delta.get('type') == 'text_delta':
+                yield delta['text']
+        elif event.get('type') == 'error':
+            raise RuntimeError(event.get('error', {}).get('message', 'Erreur de streaming'))
+
+
+def create_message_batch(body, read_timeout=None):
+    """
+    Soumet un lot à l'API Message Batches
+
+    Args:
+        body: Corps JSON déjà sérialisé ({"requests": [...]}), en octets
+        read_timeout: Timeout de lecture spécifique (optionnel)
+
+    Returns:
+        requests.Response: Réponse brute (objet message_batch)
+    """
+    return get_session().post(
+        f"{ANTHROPIC_API_URL}/v1/messages/batches",
+        data=body,
+        timeout=get_timeout(read_timeout)
+    )
+
+
+def get_message_batch(batch_id):
+    """
+    Retourne l'état d'un lot (processing_status, request_counts, results_url)
+
+    Returns:
+        requests.Response: Réponse brute
+    """
+    return get_session().get(
+        f"{ANTHROPIC_API_URL}/v1/messages/batches/{batch_id}",
+        timeout=get_timeout()
+    )
+
+
+def iter_batch_results(results_url):
+    """
+    Lit les résultats d'un lot terminé, ligne par ligne (JSONL)
+
+    Yields:
+        dict: {'custom_id', 'result': {'type', 'message'|'error'}}
+    """
+    with get_session().get(results_url, timeout=get_timeout(), stream=True) as response:
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                yield json.loads(line)
@@ -5,110 +5,147 @@ Analyse d'images pour détecter le type de vêtement et les couleurs
 
 from PIL import Image
 from collections import Counter
+import numpy as np
 import re
 
-def analyze_image(filepath):
+# Taille d'échantillonnage des couleurs (côté, en pixels)
+SAMPLE_SIZE = 50
+
+# Couleurs reconnues, dans l'ordre de priorité des règles de classification
+COLOR_NAMES = ['blanc', 'noir', 'gris', 'bleu', 'orange', 'rouge', 'vert', 'marron', 'beige']
+
+COLOR_CATEGORIES = {
+    'leather': ['marron', 'beige'],               # Couleurs cuir (marron, beige, camel)
+    'sport': ['bleu', 'orange', 'rouge', 'vert'],  # Couleurs sport vives
+    'dark': ['noir', 'gris'],                      # Couleurs sombres
+    'white': ['blanc']                             # Blanc
+}
+
+
+def classify_pixels(pixels):
+    """
+    Classe chaque pixel dans une couleur de COLOR_NAMES
+
+    Args:
+        pixels: Tableau NumPy (..., 3) de valeurs RGB
+
+    Returns:
+        np.ndarray: Indices dans COLOR_NAMES, -1 pour les pixels non classés
+    """
+    # int16 : pas de débordement sur les comparaisons du type b > r + 40
+    rgb = np.asarray(pixels, dtype=np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+    reddish = (r > g + 40) & (r > b + 40)
+    rules = [
+        (r > 200) & (g > 200) & (b > 200),                                        # blanc
+        (r < 50) & (g < 50) & (b < 50),                                           # noir
+        (80 < r) & (r < 150) & (80 < g) & (g < 150) & (80 < b) & (b < 150),       # gris
+        (b > r + 40) & (b > g + 40),                                              # bleu
+        reddish & (g > 100),                                                      # orange
+        reddish,                                                                  # rouge
+        (g > r + 30) & (g > b + 30),                                              # vert
+        (100 < r) & (r < 180) & (60 < g) & (g < 140) & (b < 80),                  # marron
+        (180 < r) & (r < 230) & (160 < g) & (g < 210) & (130 < b) & (b < 180)     # beige
+    ]
+
+    labels = np.full(r.shape, -1, dtype=np.int8)
+    # Appliquées de la dernière à la première : la première règle vérifiée l'emporte
+    for code in range(len(rules) - 1, -1, -1):
+        labels[rules[code]] = code
+    return labels
+
+
+def summarize_colors(labels):
+    """
+    Résume la classification d'une image
+
+    Returns:
+        tuple: (couleurs dominantes, ratios par catégorie, nombre de couleurs)
+    """
+    flat = labels.ravel()
+    classified = flat[flat >= 0]
+    total_pixels = flat.size
+
+    # Comptage avec départage à la première apparition (comme Counter.most_common)
+    codes, first_index, counts = np.unique(classified, return_index=True, return_counts=True)
+    ranking = sorted(zip(counts.tolist(), first_index.tolist(), codes.tolist()),
+                     key=lambda item: (-item[0], item[1]))
+    dominant_colors = [COLOR_NAMES[code] for _, _, code in ranking[:2]] or ['noir']
+
+    per_color = dict(zip((COLOR_NAMES[code] for code in codes.tolist()), counts.tolist()))
+    ratios = {
+        category: sum(per_color.get(color, 0) for color in colors) / total_pixels
+        for category, colors in COLOR_CATEGORIES.items()
+    }
+    return dominant_colors, ratios, max(len(codes), 1)
+
+
+def detect_type(ratio, color_ratios, nb_colors):
+    """
+    DÉTECTION DU TYPE basée sur ratio + couleurs
+    """
+    leather_ratio = color_ratios['leather']
+    sport_ratio = color_ratios['sport']
+    dark_ratio = color_ratios['dark']
+
+    # Logique de détection améliorée
+    if ratio < 0.65:
+        # Format horizontal = probablement chaussures
+        return 'chaussures'
+        
+    elif ratio > 1.4:
+        # Format vertical = sweat ou veste
+        if dark_ratio > 0.6 and leather_ratio < 0.1:
+            return 'sweat'
+        return 'pull'
+            
+    elif 0.85 <= ratio <= 1.15:
+        # Format carré = sac OU t-shirt
+        if leather_ratio > 0.4:
+            # Beaucoup de couleurs cuir = probablement un sac
+            return 'sac'
+        elif sport_ratio > 0.3 and nb_colors > 3:
+            # Couleurs variées = possiblement un maillot
+            return 'maillot'
+        # Par défaut = t-shirt
+        return 't-shirt'
+            
+    # Ratio intermédiaire
+    if leather_ratio > 0.3:
+        return 'sac'
+    return 't-shirt'
+
+
+def _load_sample(filepath, sample_size):
+    """Ouvre une image et retourne (ratio hauteur/largeur, échantillon RGB)"""
+    img = Image.open(filepath)
+    img = img.convert('RGB')
+    width, height = img.size
+    ratio = height / width if width > 0 else 1
+    
+    # Échantillonnage des couleurs
+    img_small = img.resize((sample_size, sample_size))
+    return ratio, np.asarray(img_small)
+
+
+def analyze_image(filepath, sample_size=SAMPLE_SIZE):
     """
     Analyse une image pour déterminer le type, les couleurs et l'état
     
+    Args:
+        filepath: Chemin vers l'image
+        sample_size: Côté de l'échantillon de couleurs (50 par défaut)
+    
     Returns:
         tuple: (item_type, colors, condition)
     """
     try:
-        img = Image.open(filepath)
-        img = img.convert('RGB')
-        width, height = img.size
-        ratio = height / width if width > 0 else 1
-        
-        # Échantillonnage des couleurs (50x50 pixels)
-        img_small = img.resize((50, 50))
-        pixels = list(img_small.getdata())
+        ratio, sample = _load_sample(filepath, sample_size)
         
         # Détection des couleurs
-        colors_detected = []
-        color_categories = {
-            'leather': 0,  # Couleurs cuir (marron, beige, camel)
-            'sport': 0,    # Couleurs sport vives
-            'dark': 0,     # Couleurs sombres
-            'white': 0     # Blanc
-        }
-        
-        for r, g, b in pixels:
-            # Classification des couleurs
-            if r > 200 and g > 200 and b > 200:
-                colors_detected.append('blanc')
-                color_categories['white'] += 1
-            elif r < 50 and g < 50 and b < 50:
-                colors_detected.append('noir')
-                color_categories['dark'] += 1
-            elif 80 < r < 150 and 80 < g < 150 and 80 < b < 150:
-                colors_detected.append('gris')
-                color_categories['dark'] += 1
-            elif b > r + 40 and b > g + 40:
-                colors_detected.append('bleu')
-                color_categories['sport'] += 1
-            elif r > g + 40 and r > b + 40:
-                if g > 100:  # Orange
-                    colors_detected.append('orange')
-                    color_categories['sport'] += 1
-                else:  # Rouge
-                    colors_detected.append('rouge')
-                    color_categories['sport'] += 1
-            elif g > r + 30 and g > b + 30:
-                colors_detected.append('vert')
-                color_categories['sport'] += 1
-            elif 100 < r < 180 and 60 < g < 140 and b < 80:
-                # Couleurs cuir/marron
-                colors_detected.append('marron')
-                color_categories['leather'] += 1
-            elif 180 < r < 230 and 160 < g < 210 and 130 < b < 180:
-                # Beige/camel
-                colors_detected.append('beige')
-                color_categories['leather'] += 1
-        
-        # Couleur dominante
-        if not colors_detected:
-            colors_detected = ['noir']
-        
-        color_counts = Counter(colors_detected)
-        dominant_colors = [color for color, _ in color_counts.most_common(2)]
-        
-        # DÉTECTION DU TYPE basée sur ratio + couleurs
-        total_pixels = len(pixels)
-        leather_ratio = color_categories['leather'] / total_pixels
-        sport_ratio = color_categories['sport'] / total_pixels
-        dark_ratio = color_categories['dark'] / total_pixels
-        
-        # Logique de détection améliorée
-        if ratio < 0.65:
-            # Format horizontal = probablement chaussures
-            item_type = 'chaussures'
-            
-        elif ratio > 1.4:
-            # Format vertical = sweat ou veste
-            if dark_ratio > 0.6 and leather_ratio < 0.1:
-                item_type = 'sweat'
-            else:
-                item_type = 'pull'
-                
-        elif 0.85 <= ratio <= 1.15:
-            # Format carré = sac OU t-shirt
-            if leather_ratio > 0.4:
-                # Beaucoup de couleurs cuir = probablement un sac
-                item_type = 'sac'
-            elif sport_ratio > 0.3 and len(set(colors_detected)) > 3:
-                # Couleurs variées = possiblement un maillot
-                item_type = 'maillot'
-            else:
-                # Par défaut = t-shirt
-                item_type = 't-shirt'
-                
-        else:
-            # Ratio intermédiaire
-            if leather_ratio > 0.3:
-                item_type = 'sac'
-            else:
-                item_type = 't-shirt'
+        dominant_colors, color_ratios, nb_colors = summarize_colors(classify_pixels(sample))
+        item_type = detect_type(ratio, color_ratios, nb_colors)
         
         # État (simulation basique)
         condition = 'bon'
@@ -120,6 +157,44 @@ def analyze_image(filepath):
         return 't-shirt', ['noir'], 'bon'
 
 
+def analyze_images_batch(filepaths, sample_size=SAMPLE_SIZE):
+    """
+    Analyse plusieurs images en classant tous leurs pixels en un seul appel
+    
+    Args:
+        filepaths: Liste de chemins vers les images
+        sample_size: Côté de l'échantillon de couleurs (50 par défaut)
+    
+    Returns:
+        list: Un tuple (item_type, colors, condition) par image, dans l'ordre
+    """
+    results = [('t-shirt', ['noir'], 'bon')] * len(filepaths)
+    ratios, samples, positions = [], [], []
+    
+    for position, filepath in enumerate(filepaths):
+        try:
+            ratio, sample = _load_sample(filepath, sample_size)
+        except Exception as e:
+            print(f"❌ Erreur analyse image: {e}")
+            continue
+        ratios.append(ratio)
+        samples.append(sample)
+        positions.append(position)
+    
+    if not samples:
+        return results
+    
+    # Classification vectorisée de la pile (N, taille, taille, 3)
+    labels = classify_pixels(np.stack(samples))
+    
+    for position, ratio, image_labels in zip(positions, ratios, labels):
+        dominant_colors, color_ratios, nb_colors = summarize_colors(image_labels)
+        item_type = detect_type(ratio, color_ratios, nb_colors)
+        results[position] = (item_type, dominant_colors, 'bon')
+    
+    return results
+
+
 def detect_brand(filepath):
     """
     Détecte la marque sur l'image (simulation pour l'instant)
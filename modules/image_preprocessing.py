@@ -0,0 +1,104 @@
+# modules/image_preprocessing.py
+"""
+Préparation des photos envoyées à Claude : redimensionnement et JPEG
+"""
+
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from .metrics import stage
+from .profiling import profiled
+from .workers import map_cpu_bound
+
+# Taille maximale (côté le plus long) des photos envoyées à Claude
+MAX_IMAGE_SIZE = 1200
+JPEG_QUALITY = 90
+
+# Marge conservée entre la réduction rapide et le rééchantillonnage final
+REDUCING_GAP = 2.0
+
+
+def is_conforming(img):
+    """
+    Indique si une photo est déjà prête à être envoyée telle quelle
+
+    C'est le cas des photos redimensionnées par le navigateur : JPEG RGB,
+    à la taille cible, sans rotation EXIF à appliquer.
+    """
+    if img.format != 'JPEG' or img.mode != 'RGB':
+        return False
+    if max(img.size) > MAX_IMAGE_SIZE:
+        return False
+    orientation = img.getexif().get(0x0112, 1)
+    return orientation == 1
+
+
+def decode_reduced(img, target):
+    """
+    Décode une photo directement à une taille proche de la cible
+
+    - JPEG : mise à l'échelle dans le domaine DCT (1/2, 1/4, 1/8) pendant
+      le décodage, sans jamais descendre sous la cible
+    - Puis réduction entière par moyenne de blocs (Image.reduce), en gardant
+      une marge de REDUCING_GAP pour le LANCZOS final
+
+    Args:
+        img: Image ouverte mais pas encore décodée
+        target: Taille cible du côté le plus long
+
+    Returns:
+        PIL.Image: Image décodée, d'au moins `target` pixels de côté
+    """
+    if img.format == 'JPEG':
+        img.draft(None, (target, target))
+
+    factor = int(max(img.size) / (target * REDUCING_GAP))
+    if factor >= 2:
+        return img.reduce(factor)
+    img.load()
+    return img
+
+
+@profiled
+def preprocess_image(data):
+    """
+    Redimensionne une photo et la réencode en JPEG
+
+    Args:
+        data: Octets du fichier envoyé
+
+    Returns:
+        bytes: Photo JPEG d'au plus MAX_IMAGE_SIZE pixels de côté
+    """
+    # Image.open ne lit que l'en-tête : le test ne décode pas la photo
+    img = Image.open(BytesIO(data))
+    if is_conforming(img):
+        return data
+
+    with stage('decode'):
+        img = decode_reduced(img, MAX_IMAGE_SIZE)
+
+        # Rotation EXIF appliquée sur l'image déjà réduite (peu coûteux)
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+    # Rééchantillonnage final de qualité
+    with stage('resize'):
+        img.thumbnail((MAX_IMAGE_SIZE, MAX_IMAGE_SIZE), Image.Resampling.LANCZOS)
+
+    with stage('jpeg_encode'):
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+def preprocess_images(photos):
+    """
+    Prépare toutes les photos d'une requête en parallèle
+
+    Returns:
+        list: Photos JPEG, dans l'ordre d'envoi
+    """
+    return map_cpu_bound(preprocess_image, photos)
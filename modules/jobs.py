@@ -0,0 +1,377 @@
+# modules/jobs.py
+"""
+Analyses asynchrones : file de jobs persistante et pool de workers borné
+
+Les jobs et leurs photos sont stockés dans SQLite (mode WAL), partagé par
+les workers gunicorn : n'importe quel worker peut répondre à
+GET /jobs/<id>, et les jobs d'un worker redémarré sont repris.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOBS_PATH = "data/jobs/jobs.sqlite3"
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+
+
+class QueueFullError(Exception):
+    """Levée quand le worker a déjà trop de jobs en attente"""
+
+
+def _pid_alive(pid):
+    """Vérifie si un processus existe encore (workers sur la même machine)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    Stockage SQLite des jobs d'analyse
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH):
+        self.path = path
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        """Connexion SQLite du processus courant (recréée après un fork)"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    result TEXT,
+                    partial TEXT,
+                    error TEXT,
+                    owner_pid INTEGER,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_photos (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (job_id, position)
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if 'partial' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN partial TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+            conn.commit()
+
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def create(self, photos, language):
+        """
+        Enregistre un nouveau job et ses photos prétraitées
+
+        Returns:
+            str: Identifiant du job
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO jobs (id, status, language, owner_pid, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, language, os.getpid(), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_photos (job_id, position, data) VALUES (?, ?, ?)",
+                [(job_id, position, data) for position, data in enumerate(photos)]
+            )
+            conn.commit()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Retourne l'état public d'un job
+
+        Returns:
+            dict or None: {'id', 'status', 'fields'|'result'|'error'} ou None si inconnu
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status, result, partial, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, result, partial, error = row
+        job = {'id': job_id, 'status': status}
+        if result is not None:
+            job['result'] = json.loads(result)
+        elif partial is not None:
+            # Champs déjà générés par Claude pendant l'analyse
+            job['fields'] = json.loads(partial)
+        if error is not None:
+            job['error'] = error
+        return job
+
+    def claim(self, job_id):
+        """
+        Passe un job en cours d'exécution pour ce processus
+
+        Returns:
+            tuple or None: (langue, photos) si le job a été obtenu
+        """
+        with self._lock:
+            conn = self._connection()
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, owner_pid = ?, updated_at = ? WHERE id = ? AND status = ? AND owner_pid = ?",
+                (RUNNING, os.getpid(), time.time(), job_id, QUEUED, os.getpid())
+            ).rowcount
+            conn.commit()
+            if not claimed:
+                return None
+
+            language = conn.execute("SELECT language FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            photos = [data for (data,) in conn.execute(
+                "SELECT data FROM job_photos WHERE job_id = ? ORDER BY position", (job_id,)
+            )]
+        return language, photos
+
+    def set_field(self, job_id, name, value):
+        """Ajoute un champ généré aux résultats partiels du job"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET partial = json_set(COALESCE(partial, '{}'), '$.' || json_quote(?), json(?)), updated_at = ? WHERE id = ?",
+                (name, json.dumps(value, ensure_ascii=False), time.time(), job_id)
+            )
+            conn.commit()
+
+    def finish(self, job_id, result=None, error=None):
+        """Enregistre le résultat (ou l'erreur) et libère les photos"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (ERROR if error else DONE,
+                 json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id)
+            )
+            conn.execute("DELETE FROM job_photos WHERE job_id = ?", (job_id,))
+            conn.commit()
+
+    def adopt_orphans(self, stale_after, limit=None):
+        """
+        Récupère les jobs abandonnés par un worker mort ou bloqué
+
+        Args:
+            stale_after: Secondes sans nouvelles avant qu'un job soit repris
+            limit: Nombre maximal de jobs repris (places libres du worker)
+
+        Returns:
+            list: Identifiants des jobs repris par ce processus
+        """
+        now = time.time()
+        adopted = []
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT id, owner_pid, updated_at FROM jobs WHERE status IN (?, ?)",
+                (QUEUED, RUNNING)
+            ).fetchall()
+            for job_id, owner_pid, updated_at in rows:
+                if limit is not None and len(adopted) >= limit:
+                    break
+                if owner_pid == os.getpid():
+                    continue
+                if _pid_alive(owner_pid) and now - updated_at < stale_after:
+                    continue
+                # Reprise atomique : un seul worker gagne
+                taken = conn.execute(
+                    "UPDATE jobs SET status = ?, owner_pid = ?, updated_at = ? WHERE id = ? AND owner_pid = ? AND status IN (?, ?)",
+                    (QUEUED, os.getpid(), now, job_id, owner_pid, QUEUED, RUNNING)
+                ).rowcount
+                if taken:
+                    adopted.append(job_id)
+            conn.commit()
+        return adopted
+
+    def release(self, job_ids):
+        """
+        Rend des jobs repris mais non lancés : marqués comme anciens, ils
+        sont adoptés aussitôt par un autre worker
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "UPDATE jobs SET updated_at = 0 WHERE id = ? AND owner_pid = ? AND status = ?",
+                [(job_id, os.getpid(), QUEUED) for job_id in job_ids]
+            )
+            conn.commit()
+
+    def purge(self, older_than):
+        """Supprime les jobs terminés depuis plus de `older_than` secondes"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, ERROR, time.time() - older_than)
+            )
+            conn.commit()
+
+
+class JobRunner:
+    """
+    Pool borné qui exécute les jobs d'analyse en arrière-plan
+    """
+
+    def __init__(self, store, handler, max_workers=4, queue_limit=100,
+                 stale_after=300, retention=24 * 3600):
+        """
+        Args:
+            store: JobStore partagé
+            handler: Fonction (photos, langue, on_field) -> résultat
+            max_workers: Analyses simultanées par worker gunicorn
+            queue_limit: Jobs en attente maximum par worker gunicorn
+            stale_after: Délai après lequel un job en cours est considéré perdu
+            retention: Durée de conservation des jobs terminés
+        """
+        self.store = store
+        self.handler = handler
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.stale_after = stale_after
+        self.retention = retention
+
+        self._executor = None
+        self._executor_pid = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, handler):
+        """Construit le runner à partir des variables d'environnement"""
+        return cls(
+            JobStore(os.environ.get('JOBS_DB_PATH', DEFAULT_JOBS_PATH)),
+            handler,
+            max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+            queue_limit=int(os.environ.get('JOB_QUEUE_LIMIT', 100)),
+            stale_after=int(os.environ.get('JOB_STALE_AFTER', 300))
+        )
+
+    def _pool(self):
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            self._executor_pid = pid
+            self._pending = 0
+        return self._executor
+
+    def _reserve(self):
+        """Réserve une place dans la file de ce worker (libérée par _run)"""
+        with self._lock:
+            # _pool() d'abord : après un fork, le compteur est remis à zéro
+            self._pool()
+            if self._pending >= self.queue_limit:
+                raise QueueFullError("Trop d'analyses en attente")
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _dispatch(self, job_id):
+        """Confie au pool un job dont la place est déjà réservée"""
+        try:
+            with self._lock:
+                self._pool().submit(self._run, job_id)
+        except BaseException:
+            self._release()
+            raise
+
+    def _enqueue(self, job_id):
+        self._reserve()
+        self._dispatch(job_id)
+
+    def submit(self, photos, language):
+        """
+        Crée un job et le confie au pool
+
+        Returns:
+            str: Identifiant du job
+
+        Raises:
+            QueueFullError: Si la file de ce worker est pleine
+        """
+        # Place réservée avant d'écrire le job : une file pleine ne laisse
+        # jamais en base un job que personne n'attend
+        self._reserve()
+        try:
+            job_id = self.store.create(photos, language)
+        except BaseException:
+            self._release()
+            raise
+        self._dispatch(job_id)
+        return job_id
+
+    def _run(self, job_id):
+        try:
+            claimed = self.store.claim(job_id)
+            if claimed is None:
+                return
+            language, photos = claimed
+            try:
+                result = self.handler(
+                    photos, language,
+                    lambda name, value: self.store.set_field(job_id, name, value)
+                )
+            except Exception as e:
+                print(f"Erreur job {job_id}: {e}")
+                self.store.finish(job_id, error=str(e))
+            else:
+                self.store.finish(job_id, result=result)
+        finally:
+            self._release()
+
+    def recover(self):
+        """Reprend les jobs orphelins (à appeler au démarrage d'un worker)"""
+        self.store.purge(self.retention)
+        with self._lock:
+            self._pool()
+            free = max(0, self.queue_limit - self._pending)
+        adopted = self.store.adopt_orphans(self.stale_after, limit=free)
+        for position, job_id in enumerate(adopted):
+            try:
+                self._enqueue(job_id)
+            except QueueFullError:
+                # Places prises entre-temps : les autres workers reprennent le reste
+                self.store.release(adopted[position:])
+                adopted = adopted[:position]
+                break
+        if adopted:
+            print(f"♻️ {len(adopted)} job(s) repris")
+        return adopted
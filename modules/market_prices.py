@@ -0,0 +1,455 @@
+# modules/market_prices.py
+"""
+Base locale de prix du marché, construite à partir d'annonces réelles
+
+- Les pages d'annonces (config.PRICE_SOURCES, ou pages HTML enregistrées)
+  sont analysées : JSON-LD schema.org (Product / Offer / ItemList), puis
+  balises meta Open Graph en secours
+- Les prix sont stockés dans SQLite, indexés par (type, marque, état)
+- Les quartiles p25/p50/p75 de chaque groupe sont précalculés à
+  l'ingestion : une estimation de prix est une simple recherche en mémoire
+
+Usage :
+    python main.py prices ingest pages/*.html --source vinted
+    python main.py prices fetch
+    python main.py prices stats
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from html.parser import HTMLParser
+
+DEFAULT_MARKET_PATH = "data/market/prices.sqlite3"
+
+# Nombre minimum d'annonces comparables pour faire confiance aux quartiles
+MIN_REFERENCES = int(os.environ.get('MARKET_MIN_REFERENCES', 5))
+
+# Mots-clés (titre ou catégorie) → type d'article de price_analyzer
+TYPE_KEYWORDS = [
+    ('t-shirt', ('t-shirt', 'tee-shirt', 'tshirt', 't shirt', 'tee')),
+    ('sweat', ('sweat', 'hoodie', 'sweatshirt')),
+    ('pull', ('pull', 'sweater', 'jumper', 'gilet', 'cardigan')),
+    ('jogging', ('jogging', 'survêtement', 'tracksuit')),
+    ('jean', ('jean',)),
+    ('pantalon', ('pantalon', 'trousers', 'chino')),
+    ('manteau', ('manteau', 'parka', 'doudoune', 'coat')),
+    ('veste', ('veste', 'blouson', 'jacket')),
+    ('robe', ('robe', 'dress')),
+    ('jupe', ('jupe', 'skirt')),
+    ('short', ('short',)),
+    ('chemise', ('chemise', 'shirt', 'blouse')),
+    ('maillot', ('maillot', 'jersey')),
+    ('baskets', ('baskets', 'sneakers', 'tennis')),
+    ('chaussures', ('chaussures', 'bottes', 'boots', 'escarpins', 'sandales', 'shoes')),
+    ('sac', ('sac', 'bag', 'pochette')),
+    ('accessoire', ('accessoire', 'ceinture', 'écharpe', 'casquette', 'bonnet', 'lunettes')),
+]
+
+# Conditions schema.org et libellés courants → états de price_analyzer
+CONDITIONS = {
+    'newcondition': 'neuf',
+    'refurbishedcondition': 'très bon',
+    'usedcondition': 'bon',
+    'damagedcondition': 'satisfaisant',
+    'neuf avec étiquette': 'neuf',
+    'neuf sans étiquette': 'neuf',
+    'neuf': 'neuf',
+    'new': 'neuf',
+    'très bon état': 'très bon',
+    'très bon': 'très bon',
+    'very good': 'très bon',
+    'bon état': 'bon',
+    'bon': 'bon',
+    'good': 'bon',
+    'satisfaisant': 'satisfaisant',
+    'état satisfaisant': 'satisfaisant',
+    'satisfactory': 'satisfaisant',
+}
+
+
+def normalize_brand(brand):
+    """Forme canonique d'une marque pour l'index ('' si inconnue)"""
+    if not brand:
+        return ''
+    return ' '.join(str(brand).split()).casefold()
+
+
+def detect_type(*texts):
+    """Déduit le type d'article d'un titre ou d'une catégorie"""
+    text = ' '.join(t for t in texts if t).casefold()
+    for item_type, keywords in TYPE_KEYWORDS:
+        for keyword in keywords:
+            if re.search(r'(?<!\w)' + re.escape(keyword) + r's?(?!\w)', text):
+                return item_type
+    return None
+
+
+def normalize_condition(condition):
+    """Convertit un état (URL schema.org ou libellé) en état interne"""
+    if not condition:
+        return 'bon'
+    value = str(condition).rstrip('/').rsplit('/', 1)[-1].strip().casefold()
+    return CONDITIONS.get(value, 'bon')
+
+
+def parse_price(value):
+    """'12,50 €' / '12.5' / 12.5 → 12.5 (None si illisible)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return None
+    match = re.search(r'\d+(?:[\s  ]\d{3})*(?:[.,]\d+)?', str(value))
+    if not match:
+        return None
+    number = re.sub(r'[\s  ]', '', match.group()).replace(',', '.')
+    return float(number)
+
+
+class _PageParser(HTMLParser):
+    """Collecte les blocs JSON-LD et les balises meta d'une page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld = []
+        self.meta = {}
+        self._in_json_ld = False
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and (attrs.get('type') or '').lower() == 'application/ld+json':
+            self._in_json_ld = True
+            self._buffer = []
+        elif tag == 'meta':
+            name = attrs.get('property') or attrs.get('name')
+            if name and attrs.get('content') is not None:
+                self.meta.setdefault(name.lower(), attrs['content'])
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._in_json_ld:
+            self._in_json_ld = False
+            try:
+                self.json_ld.append(json.loads(''.join(self._buffer)))
+            except ValueError:
+                pass
+
+
+def _iter_products(node):
+    """Parcourt un document JSON-LD et renvoie ses objets Product"""
+    if isinstance(node, list):
+        for child in node:
+            yield from _iter_products(child)
+    elif isinstance(node, dict):
+        types = node.get('@type')
+        types = types if isinstance(types, list) else [types]
+        if 'Product' in types:
+            yield node
+        for key in ('@graph', 'itemListElement', 'item', 'mainEntity'):
+            if key in node:
+                yield from _iter_products(node[key])
+
+
+def _product_listing(product, url):
+    offers = product.get('offers') or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+
+    currency = offers.get('priceCurrency', 'EUR')
+    price = parse_price(offers.get('price', offers.get('lowPrice')))
+    if price is None or currency != 'EUR':
+        return None
+
+    brand = product.get('brand')
+    if isinstance(brand, dict):
+        brand = brand.get('name')
+    condition = offers.get('itemCondition') or product.get('itemCondition')
+
+    return {
+        'url': offers.get('url') or product.get('url') or url,
+        'title': product.get('name', ''),
+        'type': detect_type(product.get('category'), product.get('name')),
+        'brand': brand,
+        'condition': normalize_condition(condition),
+        'price': price
+    }
+
+
+def parse_listing_page(html, url=None):
+    """
+    Extrait les annonces d'une page HTML
+
+    Args:
+        html: Contenu de la page
+        url: URL de la page (identifiant de secours des annonces)
+
+    Returns:
+        list: Annonces {'url', 'title', 'type', 'brand', 'condition', 'price'}
+    """
+    parser = _PageParser()
+    parser.feed(html)
+    parser.close()
+
+    listings = []
+    for document in parser.json_ld:
+        for product in _iter_products(document):
+            listing = _product_listing(product, url)
+            if listing:
+                listings.append(listing)
+
+    if listings:
+        return listings
+
+    # Pas de JSON-LD : page d'annonce décrite par Open Graph
+    meta = parser.meta
+    price = parse_price(meta.get('product:price:amount') or meta.get('og:price:amount'))
+    currency = meta.get('product:price:currency') or meta.get('og:price:currency') or 'EUR'
+    if price is None or currency != 'EUR':
+        return []
+
+    title = meta.get('og:title', '')
+    return [{
+        'url': meta.get('og:url') or url,
+        'title': title,
+        'type': detect_type(meta.get('product:category'), title),
+        'brand': meta.get('product:brand'),
+        'condition': normalize_condition(meta.get('product:condition')),
+        'price': price
+    }]
+
+
+def _quartiles(prices):
+    if len(prices) == 1:
+        return prices[0], prices[0], prices[0]
+    p25, p50, p75 = statistics.quantiles(prices, n=4, method='inclusive')
+    return p25, p50, p75
+
+
+class MarketPriceStore:
+    """
+    Stockage SQLite des prix observés et de leurs quartiles par groupe
+    """
+
+    def __init__(self, path=DEFAULT_MARKET_PATH, min_references=MIN_REFERENCES):
+        self.path = path
+        self.min_references = min_references
+        self._conn = None
+        self._conn_pid = None
+        self._stats = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        """Connexion SQLite du processus courant (recréée après un fork)"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    url TEXT,
+                    title TEXT,
+                    type TEXT NOT NULL,
+                    brand TEXT NOT NULL,
+                    condition TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    seen_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_listings_group
+                ON listings(type, brand, condition, price)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_stats (
+                    type TEXT NOT NULL,
+                    brand TEXT NOT NULL,
+                    condition TEXT NOT NULL,
+                    p25 REAL NOT NULL,
+                    p50 REAL NOT NULL,
+                    p75 REAL NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (type, brand, condition)
+                )
+            """)
+            conn.commit()
+
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def add_listings(self, listings, source):
+        """
+        Enregistre des annonces (les doublons sont ignorés)
+
+        Returns:
+            int: Nombre d'annonces nouvelles
+        """
+        rows = []
+        now = time.time()
+        for listing in listings:
+            if not listing.get('type'):
+                continue
+            identity = listing.get('url') or json.dumps(
+                [listing.get('title'), listing.get('brand'), listing['price']], ensure_ascii=False
+            )
+            listing_id = hashlib.sha256(f"{source}\0{identity}".encode()).hexdigest()
+            rows.append((listing_id, source, listing.get('url'), listing.get('title'),
+                         listing['type'], normalize_brand(listing.get('brand')),
+                         listing['condition'], listing['price'], now))
+
+        with self._lock:
+            conn = self._connection()
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO listings (id, source, url, title, type, brand, condition, price, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+            return conn.total_changes - before
+
+    def rebuild_stats(self):
+        """
+        Recalcule les quartiles de chaque groupe (type, marque, état)
+
+        Returns:
+            int: Nombre de groupes
+        """
+        with self._lock:
+            conn = self._connection()
+            stats = []
+            group, prices = None, []
+            # L'index fournit les prix déjà groupés et triés
+            for item_type, brand, condition, price in conn.execute(
+                "SELECT type, brand, condition, price FROM listings ORDER BY type, brand, condition, price"
+            ):
+                if (item_type, brand, condition) != group:
+                    if prices:
+                        stats.append(group + _quartiles(prices) + (len(prices),))
+                    group, prices = (item_type, brand, condition), []
+                prices.append(price)
+            if prices:
+                stats.append(group + _quartiles(prices) + (len(prices),))
+
+            conn.execute("DELETE FROM price_stats")
+            conn.executemany(
+                "INSERT INTO price_stats (type, brand, condition, p25, p50, p75, count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                stats
+            )
+            conn.commit()
+            self._stats = None
+        return len(stats)
+
+    def _load(self):
+        """Charge les quartiles en mémoire (une fois par processus)"""
+        if self._stats is None:
+            with self._lock:
+                if self._stats is None:
+                    rows = self._connection().execute(
+                        "SELECT type, brand, condition, p25, p50, p75, count FROM price_stats"
+                    )
+                    self._stats = {
+                        (item_type, brand, condition): {'p25': p25, 'p50': p50, 'p75': p75, 'count': count}
+                        for item_type, brand, condition, p25, p50, p75, count in rows
+                    }
+        return self._stats
+
+    def lookup(self, item_type, brand=None, condition='bon'):
+        """
+        Quartiles des annonces comparables
+
+        Returns:
+            dict or None: {'p25', 'p50', 'p75', 'count'}, ou None si moins
+            de `min_references` annonces comparables
+        """
+        stats = self._load().get((item_type, normalize_brand(brand), condition))
+        if stats is None or stats['count'] < self.min_references:
+            return None
+        return stats
+
+    def summary(self):
+        """Nombre d'annonces et de groupes exploitables"""
+        with self._lock:
+            conn = self._connection()
+            listings = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+            groups = conn.execute(
+                "SELECT COUNT(*) FROM price_stats WHERE count >= ?", (self.min_references,)
+            ).fetchone()[0]
+        return {'listings': listings, 'groups': groups}
+
+
+_store = None
+
+
+def get_market_store():
+    """
+    Base de prix du processus, ou None si aucune n'a été construite
+
+    Le chemin est lu dans MARKET_PRICES_PATH.
+    """
+    global _store
+
+    path = os.environ.get('MARKET_PRICES_PATH', DEFAULT_MARKET_PATH)
+    if _store is None or _store.path != path:
+        if not os.path.exists(path):
+            return None
+        _store = MarketPriceStore(path)
+    return _store
+
+
+def ingest_files(store, paths, source):
+    """Analyse des pages HTML enregistrées et les ajoute à la base"""
+    added = 0
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            listings = parse_listing_page(f.read(), url=f"file://{os.path.abspath(path)}")
+        added += store.add_listings(listings, source)
+        print(f"   📄 {path} : {len(listings)} annonce(s)")
+    return added
+
+
+def fetch_sources(store, sources, pages_dir="data/market/pages"):
+    """
+    Télécharge les pages de config.PRICE_SOURCES, les archive et les ingère
+
+    Les pages brutes sont conservées pour pouvoir rejouer l'ingestion.
+    """
+    from .http_client import get_timeout
+    import requests
+
+    os.makedirs(pages_dir, exist_ok=True)
+    added = 0
+    with requests.Session() as session:
+        session.headers['User-Agent'] = "Mozilla/5.0 (compatible; VintedBot price sampler)"
+        for url in sources:
+            try:
+                response = session.get(url, timeout=get_timeout())
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"   ❌ {url} : {e}")
+                continue
+
+            source = re.sub(r'^www\.', '', url.split('/')[2])
+            path = os.path.join(pages_dir, f"{source}-{int(time.time())}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(response.text)
+
+            listings = parse_listing_page(response.text, url=url)
+            added += store.add_listings(listings, source)
+            print(f"   🌐 {url} : {len(listings)} annonce(s)")
+    return added
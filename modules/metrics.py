@@ -0,0 +1,106 @@
+# modules/metrics.py
+"""
+Métriques de l'application, exposées au format Prometheus sur /metrics
+
+- durée de chaque étape d'une analyse (lecture multipart, décodage,
+  redimensionnement, encodage JPEG, base64, appel Claude, extraction JSON)
+- analyses de secours, codes HTTP de l'API, octets d'images reçus et
+  envoyés, tokens consommés
+
+Avec gunicorn, chaque worker écrit ses valeurs dans PROMETHEUS_MULTIPROC_DIR
+(défini par gunicorn.conf.py) et /metrics agrège tous les workers, quel que
+soit celui qui répond. Les compteurs de tokens par worker restent aussi
+disponibles pour /health et le mode bulk.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens')
+
+# Des millisecondes (base64) à la minute (appel Claude)
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0)
+
+STAGE_SECONDS = Histogram(
+    'vintedbot_stage_seconds', "Durée de chaque étape d'une analyse",
+    ['stage'], buckets=STAGE_BUCKETS
+)
+FALLBACKS = Counter(
+    'vintedbot_fallback_total', "Analyses de secours renvoyées", ['reason']
+)
+UPSTREAM_RESPONSES = Counter(
+    'vintedbot_upstream_responses_total', "Réponses de l'API Claude par code HTTP", ['status']
+)
+IMAGE_BYTES = Counter(
+    'vintedbot_image_bytes_total', "Octets d'images reçus des clients et envoyés à Claude", ['direction']
+)
+TOKENS = Counter(
+    'vintedbot_claude_tokens_total', "Tokens consommés par catégorie", ['kind']
+)
+
+_lock = threading.Lock()
+_usage = dict.fromkeys(USAGE_FIELDS, 0)
+_usage['requests'] = 0
+
+
+@contextmanager
+def stage(name):
+    """Mesure la durée du bloc dans l'histogramme de l'étape `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+def record_fallback(reason):
+    FALLBACKS.labels(reason).inc()
+
+
+def record_upstream_status(status):
+    """Code HTTP d'une réponse, ou 'error' si la requête n'a pas abouti"""
+    UPSTREAM_RESPONSES.labels(str(status)).inc()
+
+
+def record_image_bytes(direction, images):
+    IMAGE_BYTES.labels(direction).inc(sum(len(image) for image in images))
+
+
+def record_usage(usage):
+    """Ajoute le champ `usage` d'une réponse Messages aux compteurs"""
+    if not usage:
+        return
+    with _lock:
+        _usage['requests'] += 1
+        for field in USAGE_FIELDS:
+            _usage[field] += usage.get(field) or 0
+    for field in USAGE_FIELDS:
+        if usage.get(field):
+            TOKENS.labels(field).inc(usage[field])
+
+
+def usage_stats():
+    """Compteurs de ce worker : requêtes, tokens d'entrée et de sortie"""
+    with _lock:
+        return dict(_usage)
+
+
+def render_metrics():
+    """
+    Métriques au format texte Prometheus
+
+    Returns:
+        tuple: (corps, type de contenu)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Registre éphémère : agrège les fichiers de tous les workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,123 @@
+# modules/precompressed.py
+"""
+Réponses HTTP calculées une seule fois : compression et validation
+
+Pour un contenu figé au démarrage (page d'accueil d'une langue) :
+- variantes gzip (et brotli si le module `brotli` est installé)
+  compressées une fois, au niveau maximal
+- ETag fort par variante, dérivé du contenu
+- If-None-Match géré : 304 sans corps
+
+Servir une page ne coûte alors qu'un choix de variante.
+"""
+
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# En dessous, la compression ne fait rien gagner
+MIN_COMPRESS_SIZE = 1024
+
+
+def _accepted_encodings(header):
+    """Encodages acceptés (q > 0) d'un en-tête Accept-Encoding"""
+    accepted = set()
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+class PrecompressedAsset:
+    """
+    Contenu statique avec ses variantes compressées et leurs ETags
+    """
+
+    def __init__(self, body, content_type, cache_control):
+        """
+        Args:
+            body: Contenu (str encodé en UTF-8, ou bytes)
+            content_type: Type MIME (ex : 'text/html; charset=utf-8')
+            cache_control: Valeur de l'en-tête Cache-Control
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.content_type = content_type
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.digest = digest
+        # Une variante par encodage : un ETag fort est propre à une représentation
+        self.variants = {None: (body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            # mtime=0 : sortie gzip identique d'un worker à l'autre
+            self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+            if brotli is not None:
+                self.variants['br'] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    def _select(self, accept_encoding):
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+
+    def _not_modified(self, if_none_match, etag):
+        """If-None-Match ne valide que l'ETag de la variante servie"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                # Comparaison faible (RFC 9110) : le préfixe est ignoré
+                tag = tag[2:]
+            if tag == etag:
+                return True
+        return False
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        """
+        Réponse à servir pour une requête
+
+        Args:
+            if_none_match: En-tête If-None-Match de la requête
+            accept_encoding: En-tête Accept-Encoding de la requête
+
+        Returns:
+            tuple: (code HTTP, corps, en-têtes)
+        """
+        encoding = self._select(accept_encoding)
+        body, etag = self.variants[encoding]
+        headers = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+
+        if self._not_modified(if_none_match, etag):
+            return 304, b'', headers
+
+        headers['Content-Type'] = self.content_type
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return 200, body, headers
+
+    def stats(self):
+        """Tailles de chaque variante (octets)"""
+        return {encoding or 'identity': len(body) for encoding, (body, _) in self.variants.items()}
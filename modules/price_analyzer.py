@@ -5,10 +5,152 @@ Analyse de prix basée sur le marché Vinted
 
 import random
 
+import numpy as np
+
+from .market_prices import get_market_store
+
+# Prix de base par type (en €)
+BASE_PRICES = {
+    'pull': (12, 30),
+    't-shirt': (5, 18),
+    'sweat': (15, 40),
+    'pantalon': (12, 35),
+    'jean': (15, 40),
+    'veste': (20, 60),
+    'manteau': (30, 80),
+    'robe': (12, 40),
+    'jupe': (8, 25),
+    'short': (8, 22),
+    'chemise': (10, 28),
+    'chaussures': (20, 70),
+    'baskets': (25, 80),
+    'sac': (15, 60),
+    'accessoire': (5, 20),
+    'maillot': (12, 45),
+    'jogging': (15, 35)
+}
+
+# Prix par marque (multiplicateur)
+BRAND_MULTIPLIERS = {
+    # Marques premium
+    'Nike': 1.8,
+    'Adidas': 1.7,
+    'The North Face': 2.0,
+    'Lacoste': 1.9,
+    'Ralph Lauren': 2.0,
+    'Tommy Hilfiger': 1.8,
+    'Calvin Klein': 1.7,
+    
+    # Marques moyennes
+    'Puma': 1.4,
+    'Champion': 1.5,
+    'Vans': 1.4,
+    'Converse': 1.4,
+    'New Balance': 1.5,
+    
+    # Marques fast fashion
+    'Zara': 1.2,
+    'H&M': 1.1,
+    'Pull&Bear': 1.1,
+    'Bershka': 1.1,
+    'Mango': 1.2,
+    
+    # Marques luxe
+    'Gucci': 3.5,
+    'Louis Vuitton': 4.0,
+    'Balenciaga': 3.2,
+    'Dior': 3.8,
+    'Chanel': 4.2
+}
+
+# Multiplicateurs par état
+CONDITION_MULTIPLIERS = {
+    'neuf': 1.3,           # Neuf avec étiquette
+    'très bon': 1.1,       # Très bon état
+    'bon': 1.0,            # Bon état
+    'satisfaisant': 0.7    # Satisfaisant
+}
+
+# Fourchette par défaut d'un type inconnu
+DEFAULT_PRICE = (10, 30)
+
+# Marque inconnue = léger bonus (min, max)
+UNKNOWN_BRAND_MULTIPLIERS = (1.2, 1.3)
+
+
+def get_price_estimate(item_type, brand=None, condition='bon'):
+    """
+    Estime le prix d'un article
+    
+    Si la base de prix du marché (modules.market_prices) contient assez
+    d'annonces comparables, la fourchette va du 1er au 3e quartile et le
+    prix recommandé est la médiane. Sinon, estimation par règles.
+    
+    Args:
+        item_type: Type de vêtement
+        brand: Marque (optionnel)
+        condition: État de l'article
+        
+    Returns:
+        dict: prix_min, prix_max, prix_recommande, nb_references
+    """
+    store = get_market_store()
+    stats = store.lookup(item_type, brand, condition) if store else None
+    
+    if stats is None:
+        price_min, price_max = estimate_price_range(item_type, brand, condition)
+        return {
+            "prix_min": price_min,
+            "prix_max": price_max,
+            "prix_recommande": round_to_nice_number((price_min + price_max) // 2),
+            "nb_references": 0
+        }
+    
+    return market_estimate(stats)
+
+
+def market_estimate(stats):
+    """
+    Convertit les quartiles des annonces comparables en estimation
+    
+    Args:
+        stats: {'p25', 'p50', 'p75', 'count'} (MarketPriceStore.lookup)
+        
+    Returns:
+        dict: prix_min, prix_max, prix_recommande, nb_references
+    """
+    price_min = round_to_nice_number(int(round(stats['p25'])))
+    price_max = round_to_nice_number(int(round(stats['p75'])))
+    if price_max <= price_min:
+        price_max = price_min + 5
+    suggested = round_to_nice_number(int(round(stats['p50'])))
+    
+    return {
+        "prix_min": price_min,
+        "prix_max": price_max,
+        "prix_recommande": min(max(suggested, price_min), price_max),
+        "nb_references": stats['count']
+    }
+
+
 def get_price_range(item_type, brand=None, condition='bon'):
     """
     Calcule une fourchette de prix réaliste
     
+    Basée sur les annonces comparables de la base de prix si elle
+    existe, sinon sur les prix moyens du marché Vinted
+    
+    Returns:
+        tuple: (price_min, price_max)
+    """
+    estimate = get_price_estimate(item_type, brand, condition)
+    return estimate['prix_min'], estimate['prix_max']
+
+
+def estimate_price_range(item_type, brand=None, condition='bon'):
+    """
+    Estimation par règles, sans données de marché
+    
     Basé sur :
     - Le type d'article
     - La marque (si connue)
@@ -24,70 +166,8 @@ def get_price_range(item_type, brand=None, condition='bon'):
         tuple: (price_min, price_max)
     """
     
-    # Prix de base par type (en €)
-    BASE_PRICES = {
-        'pull': (12, 30),
-        't-shirt': (5, 18),
-        'sweat': (15, 40),
-        'pantalon': (12, 35),
-        'jean': (15, 40),
-        'veste': (20, 60),
-        'manteau': (30, 80),
-        'robe': (12, 40),
-        'jupe': (8, 25),
-        'short': (8, 22),
-        'chemise': (10, 28),
-        'chaussures': (20, 70),
-        'baskets': (25, 80),
-        'sac': (15, 60),
-        'accessoire': (5, 20),
-        'maillot': (12, 45),
-        'jogging': (15, 35)
-    }
-    
-    # Prix par marque (multiplicateur)
-    BRAND_MULTIPLIERS = {
-        # Marques premium
-        'Nike': 1.8,
-        'Adidas': 1.7,
-        'The North Face': 2.0,
-        'Lacoste': 1.9,
-        'Ralph Lauren': 2.0,
-        'Tommy Hilfiger': 1.8,
-        'Calvin Klein': 1.7,
-        
-        # Marques moyennes
-        'Puma': 1.4,
-        'Champion': 1.5,
-        'Vans': 1.4,
-        'Converse': 1.4,
-        'New Balance': 1.5,
-        
-        # Marques fast fashion
-        'Zara': 1.2,
-        'H&M': 1.1,
-        'Pull&Bear': 1.1,
-        'Bershka': 1.1,
-        'Mango': 1.2,
-        
-        # Marques luxe
-        'Gucci': 3.5,
-        'Louis Vuitton': 4.0,
-        'Balenciaga': 3.2,
-        'Dior': 3.8,
-        'Chanel': 4.2
-    }
-    
-    # Multiplicateurs par état
-    CONDITION_MULTIPLIERS = {
-        'neuf': 1.3,           # Neuf avec étiquette
-        'très bon': 1.1,       # Très bon état
-        'bon': 1.0,            # Bon état
-        'satisfaisant': 0.7    # Satisfaisant
-    }
-    
     # Récupération du prix de base
-    price_min, price_max = BASE_PRICES.get(item_type, (10, 30))
+    price_min, price_max = BASE_PRICES.get(item_type, DEFAULT_PRICE)
     
     # Application du multiplicateur de marque
     if brand and brand in BRAND_MULTIPLIERS:
@@ -96,8 +176,8 @@ def get_price_range(item_type, brand=None, condition='bon'):
         price_max = int(price_max * multiplier)
     elif brand:
         # Marque inconnue = léger bonus
-        price_min = int(price_min * 1.2)
-        price_max = int(price_max * 1.3)
+        price_min = int(price_min * UNKNOWN_BRAND_MULTIPLIERS[0])
+        price_max = int(price_max * UNKNOWN_BRAND_MULTIPLIERS[1])
     
     # Application du multiplicateur d'état
     condition_multiplier = CONDITION_MULTIPLIERS.get(condition, 1.0)
@@ -130,6 +210,126 @@ def round_to_nice_number(price):
         return round(price / 10) * 10  # Multiple de 10
 
 
+def round_to_nice_numbers(prices):
+    """
+    Version vectorisée de round_to_nice_number (mêmes résultats)
+    
+    np.round arrondit au pair le plus proche, comme round() en Python.
+    
+    Args:
+        prices: Tableau de prix entiers
+        
+    Returns:
+        np.ndarray: Prix arrondis (int64)
+    """
+    prices = np.asarray(prices, dtype=np.int64)
+    return np.where(
+        prices < 10,
+        np.maximum(5, prices),
+        np.where(prices < 50, np.round(prices / 5) * 5, np.round(prices / 10) * 10)
+    ).astype(np.int64)
+
+
+def _lookup_table(values, table, default):
+    """
+    Associe chaque élément de `values` à sa valeur dans `table`
+    
+    Les dictionnaires ne sont consultés qu'une fois par valeur distincte.
+    
+    Returns:
+        tuple: (valeurs distinctes, indices inverses, valeurs associées)
+    """
+    uniques, inverse = np.unique(values, return_inverse=True)
+    mapped = np.array([table.get(value, default) for value in uniques], dtype=np.float64)
+    return uniques, inverse.reshape(-1), mapped
+
+
+def get_price_estimates_batch(item_types, brands=None, conditions=None):
+    """
+    Estime les prix d'un inventaire entier en une passe vectorisée
+    
+    Résultats identiques à get_price_estimate appelé article par article,
+    y compris les groupes couverts par la base de prix du marché.
+    
+    Args:
+        item_types: Types d'articles (séquence de n éléments)
+        brands: Marques (None ou '' = pas de marque), optionnel
+        conditions: États ('bon' par défaut), optionnel
+        
+    Returns:
+        dict: Tableaux int64 de n éléments : prix_min, prix_max,
+        prix_recommande, nb_references
+    """
+    item_types = np.asarray(item_types, dtype=object).astype(str)
+    count = len(item_types)
+    
+    if brands is None:
+        brands = np.full(count, '', dtype=object)
+    brands = np.array(brands, dtype=object)
+    brands[np.equal(brands, None)] = ''
+    brands = brands.astype(str)
+    
+    if conditions is None:
+        conditions = np.full(count, 'bon', dtype=object)
+    conditions = np.asarray(conditions, dtype=object).astype(str)
+    
+    # Prix de base par type
+    type_values, type_index, base_min = _lookup_table(
+        item_types, {t: p[0] for t, p in BASE_PRICES.items()}, DEFAULT_PRICE[0])
+    _, _, base_max = _lookup_table(
+        type_values, {t: p[1] for t, p in BASE_PRICES.items()}, DEFAULT_PRICE[1])
+    
+    # Multiplicateurs de marque : connue, inconnue, ou absente (1.0)
+    brand_values, brand_index = np.unique(brands, return_inverse=True)
+    brand_index = brand_index.reshape(-1)
+    brand_min = np.array([
+        BRAND_MULTIPLIERS.get(b, UNKNOWN_BRAND_MULTIPLIERS[0]) if b else 1.0 for b in brand_values
+    ])
+    brand_max = np.array([
+        BRAND_MULTIPLIERS.get(b, UNKNOWN_BRAND_MULTIPLIERS[1]) if b else 1.0 for b in brand_values
+    ])
+    
+    condition_values, condition_index, condition_mult = _lookup_table(
+        conditions, CONDITION_MULTIPLIERS, 1.0)
+    
+    # Mêmes opérations que estimate_price_range : int() tronque, soit floor
+    # pour des prix positifs
+    price_min = np.floor(base_min[type_index] * brand_min[brand_index])
+    price_max = np.floor(base_max[type_index] * brand_max[brand_index])
+    price_min = np.floor(price_min * condition_mult[condition_index]).astype(np.int64)
+    price_max = np.floor(price_max * condition_mult[condition_index]).astype(np.int64)
+    
+    price_min = round_to_nice_numbers(price_min)
+    price_max = round_to_nice_numbers(price_max)
+    price_max = np.where(price_max <= price_min, price_min + 5, price_max)
+    
+    result = {
+        "prix_min": price_min,
+        "prix_max": price_max,
+        "prix_recommande": round_to_nice_numbers((price_min + price_max) // 2),
+        "nb_references": np.zeros(count, dtype=np.int64)
+    }
+    
+    # Groupes couverts par la base de prix : une recherche par groupe distinct
+    store = get_market_store()
+    if store is not None and count:
+        groups = (type_index * len(brand_values) + brand_index) * len(condition_values) + condition_index
+        group_values, group_index = np.unique(groups, return_inverse=True)
+        group_index = group_index.reshape(-1)
+        for position, group in enumerate(group_values):
+            rest, c = divmod(int(group), len(condition_values))
+            t, b = divmod(rest, len(brand_values))
+            stats = store.lookup(type_values[t], brand_values[b] or None, condition_values[c])
+            if stats is None:
+                continue
+            estimate = market_estimate(stats)
+            mask = group_index == position
+            for key in result:
+                result[key][mask] = estimate[key]
+    
+    return result
+
+
 def get_suggested_price(item_type, brand=None, condition='bon'):
     """
     Retourne UN prix suggéré (au lieu d'une fourchette)
@@ -137,12 +337,7 @@ def get_suggested_price(item_type, brand=None, condition='bon'):
     Returns:
         int: Prix suggéré
     """
-    price_min, price_max = get_price_range(item_type, brand, condition)
-    
-    # Retourne le milieu de la fourchette
-    suggested = (price_min + price_max) // 2
-    
-    return round_to_nice_number(suggested)
+    return get_price_estimate(item_type, brand, condition)['prix_recommande']
 
 
 def estimate_market_demand(item_type, brand=None):
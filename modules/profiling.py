@@ -0,0 +1,285 @@
+# modules/profiling.py
+"""
+Profilage à la demande d'une requête (échantillonnage de piles)
+
+Activé seulement si PROFILING=1, puis pour une fraction des requêtes
+(PROFILE_SAMPLE_RATE) ou celles qui portent l'en-tête X-Profile-Token
+d'un administrateur (PROFILE_ADMIN_TOKENS, séparés par des virgules).
+
+Un thread système relève la pile de la requête toutes les
+PROFILE_INTERVAL_MS millisecondes, y compris dans les threads du pool CPU
+(fonctions décorées par @profiled) et quand la greenlet est suspendue
+(attente de Claude sous gevent) : le profil couvre le temps réel écoulé.
+Chaque profil est écrit au format « piles repliées » (flamegraph.pl,
+speedscope) dans PROFILE_DIR, qui garde les PROFILE_MAX_FILES plus récents.
+
+Désactivé, les décorateurs renvoient les fonctions telles quelles : aucun
+coût à l'exécution.
+"""
+
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILING_ENABLED = os.environ.get('PROFILING', '0') == '1'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_ADMIN_TOKENS = [token for token in os.environ.get('PROFILE_ADMIN_TOKENS', '').split(',') if token]
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'data/profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+
+# Profondeur maximale d'une pile relevée
+MAX_STACK_DEPTH = 200
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_sequence = itertools.count()
+
+
+def _original(module, name, default):
+    """Primitive système d'origine, même si gevent a patché le module"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return default
+    return monkey.get_original(module, name) if monkey.is_module_patched(module) else default
+
+
+def _get_ident():
+    """Identifiant du thread système (gevent renvoie sinon celui de la greenlet)"""
+    return _original('_thread', 'get_ident', threading.get_ident)()
+
+
+def _current_greenlet():
+    """Greenlet courante sous gevent (pour relever sa pile quand elle est suspendue)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return None
+    if not monkey.is_module_patched('threading'):
+        return None
+    import greenlet
+    return greenlet.getcurrent()
+
+
+def should_profile(token=None):
+    """Indique si la requête doit être profilée (jeton administrateur ou tirage)"""
+    if not PROFILING_ENABLED:
+        return False
+    if token and any(hmac.compare_digest(token, allowed) for allowed in PROFILE_ADMIN_TOKENS):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _stack_to(frame, root):
+    """
+    Pile de `root` jusqu'à `frame` (racine en premier)
+
+    Returns:
+        list or None: Libellés des frames, None si `root` n'est pas dans la pile
+    """
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        if frame is root:
+            labels.reverse()
+            return labels
+        frame = frame.f_back
+    return None
+
+
+class _Sampler:
+    """Thread système qui échantillonne les requêtes profilées du processus"""
+
+    def __init__(self):
+        self._lock = _original('_thread', 'allocate_lock', threading.Lock)()
+        self._sleep = _original('time', 'sleep', time.sleep)
+        self._start_thread = _original('_thread', 'start_new_thread', None)
+        self._profiles = set()
+        self._running = False
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._running:
+                return
+            self._running = True
+        if self._start_thread is not None:
+            self._start_thread(self._run, ())
+        else:
+            threading.Thread(target=self._run, name='profiler', daemon=True).start()
+
+    def remove(self, profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        # S'arrête dès qu'aucune requête n'est profilée
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._running = False
+                    return
+                profiles = list(self._profiles)
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            self._sleep(PROFILE_INTERVAL)
+
+
+_sampler = None
+_sampler_pid = None
+
+
+def _get_sampler():
+    global _sampler, _sampler_pid
+    if _sampler is None or _sampler_pid != os.getpid():
+        _sampler = _Sampler()
+        _sampler_pid = os.getpid()
+    return _sampler
+
+
+class RequestProfile:
+    """
+    Profil d'une requête, utilisé comme gestionnaire de contexte
+
+    Les piles sont relevées depuis le frame d'entrée de chaque thread ou
+    greenlet enregistré : seul le travail de cette requête est compté.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = Counter()
+        self.path = None
+        self._roots = {}
+        self._lock = _original('_thread', 'allocate_lock', threading.Lock)()
+        self._token = None
+        self._start = None
+        self._closed = False
+
+    def enter(self, frame, prefix):
+        """Enregistre un point d'entrée (frame) dans la requête"""
+        key = object()
+        with self._lock:
+            self._roots[key] = (_get_ident(), frame, _current_greenlet(), prefix)
+        return key
+
+    def leave(self, key):
+        with self._lock:
+            self._roots.pop(key, None)
+
+    def sample(self, frames):
+        """Relève la pile de chaque point d'entrée actif"""
+        with self._lock:
+            if self._closed:
+                return
+            roots = list(self._roots.values())
+        stacks = []
+        for ident, root, glet, prefix in roots:
+            stack = _stack_to(frames.get(ident), root)
+            if stack is None and glet is not None:
+                # Greenlet suspendue (attente réseau) : sa pile est conservée
+                stack = _stack_to(glet.gr_frame, root)
+            if stack is not None:
+                stacks.append(';'.join(prefix + stack[1:]))
+        # Le sampler a pu copier ce profil juste avant sa fermeture
+        with self._lock:
+            if not self._closed:
+                self.samples.update(stacks)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._token = _current.set(self)
+        self._root_key = self.enter(sys._getframe(1), [self.name])
+        _get_sampler().add(self)
+        return self
+
+    def __exit__(self, *exc):
+        _get_sampler().remove(self)
+        self.leave(self._root_key)
+        _current.reset(self._token)
+        with self._lock:
+            self._closed = True
+            samples = Counter(self.samples)
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        try:
+            self.path = write_profile(self.name, samples, duration_ms)
+        except OSError as e:
+            print(f"Erreur profilage: {e}")
+        return False
+
+
+def write_profile(name, samples, duration_ms):
+    """
+    Écrit les piles repliées (« pile compte » par ligne) et fait tourner
+    le dossier des profils
+
+    Returns:
+        str: Chemin du profil écrit
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    filename = (f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{duration_ms:.0f}ms"
+                f"-{os.getpid()}-{next(_sequence)}.folded")
+    path = os.path.join(PROFILE_DIR, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    rotate_profiles()
+    print(f"🔬 Profil de {name} ({duration_ms:.0f} ms, {sum(samples.values())} échantillons) : {path}")
+    return path
+
+
+def rotate_profiles(directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+    """Supprime les profils les plus anciens au-delà de `max_files`"""
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith('.folded')]
+    if len(entries) <= max_files:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - max_files]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def profiled(func):
+    """
+    Rattache l'exécution de `func` à la requête profilée en cours, même
+    dans un thread du pool CPU ; sans effet si le profilage est désactivé
+    """
+    if not PROFILING_ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        key = profile.enter(sys._getframe(), [profile.name, f"[{threading.current_thread().name}]"])
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.leave(key)
+
+    return wrapper
+
+
+def bind_context(func):
+    """
+    Propage la requête profilée aux threads du pool CPU (contextvars n'est
+    pas transmis par ThreadPoolExecutor)
+    """
+    if _current.get() is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
@@ -0,0 +1,201 @@
+# modules/result_cache.py
+"""
+Cache des résultats d'analyse, adressé par le contenu des photos
+
+Deux niveaux :
+- un LRU en mémoire, propre à chaque worker gunicorn
+- un stockage SQLite (mode WAL) partagé par tous les workers
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = "data/cache/analyses.sqlite3"
+
+
+def make_cache_key(images, language):
+    """
+    Calcule la clé de cache d'une analyse
+
+    Args:
+        images: Liste des photos prétraitées (octets JPEG)
+        language: Langue de l'analyse
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    digest = hashlib.sha256()
+    digest.update(language.encode())
+    for image in images:
+        # Préfixe de longueur : évite les collisions par concaténation
+        digest.update(len(image).to_bytes(8, 'big'))
+        digest.update(image)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache à deux niveaux (mémoire + SQLite) avec expiration et éviction LRU
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=7 * 24 * 3600,
+                 max_entries=5000, memory_entries=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_env(cls):
+        """Construit le cache à partir des variables d'environnement"""
+        return cls(
+            path=os.environ.get('ANALYSIS_CACHE_PATH', DEFAULT_CACHE_PATH),
+            ttl=int(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 3600)),
+            max_entries=int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 5000)),
+            memory_entries=int(os.environ.get('ANALYSIS_CACHE_MEMORY_ENTRIES', 256))
+        )
+
+    def _connection(self):
+        """
+        Retourne la connexion SQLite du processus courant
+
+        La connexion est recréée après un fork (workers gunicorn) :
+        une connexion SQLite ne doit jamais être partagée entre processus.
+        """
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses(accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_expires ON analyses(expires_at)")
+            conn.commit()
+
+            self._conn = conn
+            self._conn_pid = pid
+            self._memory.clear()
+        return self._conn
+
+    def _remember(self, key, value, expires_at):
+        """Ajoute une entrée au LRU mémoire (appelé sous verrou)"""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Cherche un résultat en mémoire puis sur disque
+
+        Returns:
+            dict or None: Résultat en cache, None si absent ou expiré
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM analyses WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row is None:
+                    self.counters['misses'] += 1
+                    return None
+
+                conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Erreur cache: {e}")
+                self.counters['errors'] += 1
+                self.counters['misses'] += 1
+                return None
+
+            value, expires_at = row
+            self._remember(key, value, expires_at)
+            self.counters['disk_hits'] += 1
+            return json.loads(value)
+
+    def set(self, key, result):
+        """Enregistre un résultat dans les deux niveaux de cache"""
+        now = time.time()
+        expires_at = now + self.ttl
+        value = json.dumps(result, ensure_ascii=False)
+
+        with self._lock:
+            self._remember(key, value, expires_at)
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                self.counters['writes'] += 1
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Erreur cache: {e}")
+                self.counters['errors'] += 1
+
+    def _evict(self, conn, now):
+        """Supprime les entrées expirées puis les moins récemment utilisées"""
+        expired = conn.execute("DELETE FROM analyses WHERE expires_at <= ?", (now,)).rowcount
+        overflow = conn.execute("""
+            DELETE FROM analyses WHERE key IN (
+                SELECT key FROM analyses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,)).rowcount
+        self.counters['evictions'] += expired + overflow
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache pour ce worker
+
+        Returns:
+            dict: Compteurs et taux de succès
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 3) if lookups else 0.0
+        return counters
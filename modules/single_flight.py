@@ -0,0 +1,237 @@
+# modules/single_flight.py
+"""
+Regroupement des analyses identiques simultanées (single-flight)
+
+Un double clic sur « Analyser », ou deux onglets qui envoient les mêmes
+photos, ne déclenchent qu'un seul appel à Claude :
+- dans un worker : les requêtes suivantes attendent l'appel en cours et
+  partagent son résultat
+- entre les workers gunicorn : un bail (lease) dans la base SQLite du
+  cache désigne le worker qui appelle Claude ; les autres attendent la
+  fin du bail puis lisent le résultat dans le cache
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from .jobs import _pid_alive
+
+
+class _Call:
+    """Appel en cours dans ce worker"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class SingleFlight:
+    """
+    Exécute une seule fois une fonction par clé, pour tous les appelants
+    simultanés du même worker et des autres workers
+    """
+
+    def __init__(self, path, lookup, lease_ttl=120, wait_timeout=90, poll_interval=0.1):
+        """
+        Args:
+            path: Base SQLite des baux (celle du cache des analyses)
+            lookup: Fonction clé -> résultat en cache (ou None)
+            lease_ttl: Durée après laquelle un bail abandonné est repris
+            wait_timeout: Attente maximale avant d'appeler Claude soi-même
+            poll_interval: Intervalle de vérification du bail d'un autre worker
+        """
+        self.path = path
+        self.lookup = lookup
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+        self._calls = {}
+        self._calls_pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._conn_lock = threading.Lock()
+
+        self.counters = {
+            'upstream_calls': 0,
+            'coalesced_local': 0,
+            'coalesced_remote': 0,
+            'wait_timeouts': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_env(cls, cache):
+        """Construit le single-flight à côté du cache, selon l'environnement"""
+        return cls(
+            cache.path,
+            cache.get,
+            lease_ttl=int(os.environ.get('SINGLE_FLIGHT_LEASE_TTL', 120)),
+            wait_timeout=int(os.environ.get('SINGLE_FLIGHT_WAIT', 90))
+        )
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _connection(self):
+        """Connexion SQLite du processus courant (recréée après un fork)"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS inflight (
+                    key TEXT PRIMARY KEY,
+                    owner_pid INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def _acquire(self, key):
+        """
+        Tente de prendre le bail de `key` pour ce processus
+
+        Returns:
+            bool: True si ce worker doit appeler Claude
+        """
+        now = time.time()
+        with self._conn_lock:
+            conn = self._connection()
+            row = conn.execute("SELECT owner_pid FROM inflight WHERE key = ?", (key,)).fetchone()
+            if row is not None and not _pid_alive(row[0]):
+                # Worker mort en plein appel : son bail est libéré
+                conn.execute("DELETE FROM inflight WHERE key = ? AND owner_pid = ?", (key, row[0]))
+            acquired = conn.execute("""
+                INSERT INTO inflight (key, owner_pid, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET owner_pid = excluded.owner_pid, expires_at = excluded.expires_at
+                WHERE inflight.expires_at < ?
+            """, (key, os.getpid(), now + self.lease_ttl, now)).rowcount
+            conn.commit()
+        return acquired > 0
+
+    def _held_elsewhere(self, key):
+        """Indique si un autre worker détient encore le bail de `key`"""
+        with self._conn_lock:
+            row = self._connection().execute(
+                "SELECT owner_pid, expires_at FROM inflight WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False
+        owner_pid, expires_at = row
+        return expires_at > time.time() and _pid_alive(owner_pid)
+
+    def _release(self, key):
+        with self._conn_lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM inflight WHERE key = ? AND owner_pid = ?", (key, os.getpid()))
+            conn.commit()
+
+    def _call_upstream(self, key, func):
+        """Appel réel, sous bail ; attend le worker propriétaire si besoin"""
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+
+        while True:
+            try:
+                acquired = self._acquire(key)
+            except sqlite3.Error as e:
+                # Sans base de baux, le regroupement reste limité au worker
+                print(f"Erreur single-flight: {e}")
+                self._count('errors')
+                self._count('upstream_calls')
+                return func()
+
+            if acquired:
+                if waited:
+                    # Le bail s'est libéré sans résultat en cache (échec) : on réessaie
+                    cached = self.lookup(key)
+                    if cached is not None:
+                        self._release(key)
+                        self._count('coalesced_remote')
+                        return cached
+                try:
+                    self._count('upstream_calls')
+                    return func()
+                finally:
+                    self._release(key)
+
+            # Un autre worker analyse les mêmes photos : attendre son résultat
+            waited = True
+            while self._held_elsewhere(key):
+                if time.monotonic() > deadline:
+                    self._count('wait_timeouts')
+                    self._count('upstream_calls')
+                    return func()
+                time.sleep(self.poll_interval)
+
+            cached = self.lookup(key)
+            if cached is not None:
+                self._count('coalesced_remote')
+                return cached
+
+    def run(self, key, func):
+        """
+        Retourne func(), exécutée une seule fois pour les appels simultanés
+
+        Args:
+            key: Clé de l'analyse (make_cache_key)
+            func: Fonction sans argument qui appelle Claude et remplit le cache
+        """
+        with self._lock:
+            if self._calls_pid != os.getpid():
+                # Appels hérités du parent après un fork : jamais terminés ici
+                self._calls = {}
+                self._calls_pid = os.getpid()
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.event.wait(self.wait_timeout) and call.done:
+                self._count('coalesced_local')
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            self._count('wait_timeouts')
+            self._count('upstream_calls')
+            return func()
+
+        try:
+            call.result = self._call_upstream(key, func)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            call.done = True
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self):
+        """
+        Compteurs de ce worker
+
+        Returns:
+            dict: Appels à Claude effectués et évités
+        """
+        with self._lock:
+            counters = dict(self.counters)
+        counters['saved_calls'] = counters['coalesced_local'] + counters['coalesced_remote']
+        return counters
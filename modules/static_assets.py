@@ -0,0 +1,94 @@
+# modules/static_assets.py
+"""
+Ressources statiques de la page (CSS, JavaScript, textes par langue)
+servies sous un nom empreinte
+
+Chaque fichier est lu et compressé une seule fois au démarrage, puis servi
+sous /static/<nom>.<empreinte>.<ext> : l'empreinte change avec le contenu,
+le navigateur (ou un CDN) peut donc le garder un an sans revalider. Une
+visite suivante ne retélécharge que la page HTML.
+"""
+
+import json
+import os
+
+from .precompressed import PrecompressedAsset
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+STATIC_URL = '/static/'
+
+# Contenu immuable : une nouvelle version a une autre URL
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Longueur de l'empreinte dans le nom de fichier
+FINGERPRINT_LENGTH = 12
+
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+}
+
+
+def fingerprinted_name(name, digest):
+    """'js/app.js' -> 'js/app.<empreinte>.js'"""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+class StaticManifest:
+    """
+    Ressources statiques indexées par nom logique ('app.js') et par nom
+    empreinte (chemin servi)
+    """
+
+    def __init__(self):
+        self.urls = {}
+        self._files = {}
+
+    def add(self, name, body):
+        """
+        Ajoute une ressource
+
+        Args:
+            name: Nom logique (l'extension donne le type MIME)
+            body: Contenu (str ou bytes)
+
+        Returns:
+            str: URL empreinte de la ressource
+        """
+        content_type = CONTENT_TYPES[os.path.splitext(name)[1]]
+        asset = PrecompressedAsset(body, content_type, IMMUTABLE_CACHE_CONTROL)
+        filename = fingerprinted_name(name, asset.digest)
+        self._files[filename] = asset
+        self.urls[name] = STATIC_URL + filename
+        return self.urls[name]
+
+    def get(self, filename):
+        """Ressource servie sous `filename`, None si inconnue"""
+        return self._files.get(filename)
+
+    def stats(self):
+        """Tailles de chaque ressource et variante (octets)"""
+        return {filename: asset.stats() for filename, asset in self._files.items()}
+
+
+def build_manifest(translations, directory=STATIC_DIR):
+    """
+    Charge les fichiers de `directory` et génère un fichier de textes par langue
+
+    Args:
+        translations: {langue: {clé: texte}}
+        directory: Dossier des fichiers statiques
+
+    Returns:
+        StaticManifest
+    """
+    manifest = StaticManifest()
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if entry.is_file() and os.path.splitext(entry.name)[1] in CONTENT_TYPES:
+            with open(entry.path, 'rb') as f:
+                manifest.add(entry.name, f.read())
+    for lang, strings in translations.items():
+        manifest.add(f'i18n/{lang}.json', json.dumps(strings, ensure_ascii=False, sort_keys=True))
+    return manifest
@@ -0,0 +1,100 @@
+# modules/stream_parser.py
+"""
+Parseur JSON incrémental pour les réponses streamées de Claude
+
+Claude renvoie un objet JSON plat ({"type": ..., "brand": ..., ...}),
+parfois entouré d'un bloc ```json. Le parseur reçoit le texte morceau par
+morceau et signale chaque champ dès que sa valeur est complète.
+"""
+
+import json
+
+
+class JSONFieldStream:
+    """
+    Extrait les champs de premier niveau d'un objet JSON au fil du texte
+
+    Exemple :
+        parser = JSONFieldStream()
+        parser.feed('{"type": "Pull", "br')   # -> [('type', 'Pull')]
+        parser.feed('and": "Nike"}')          # -> [('brand', 'Nike')]
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self.done = False
+
+    def feed(self, text):
+        """
+        Ajoute un morceau de texte
+
+        Returns:
+            list: Couples (nom, valeur) des champs terminés dans ce morceau
+        """
+        fields = []
+        if self.done:
+            return fields
+
+        self._text += text
+        buffer = self._text
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                continue
+
+            if self._depth == 0:
+                # Texte avant l'objet (```json, phrase d'introduction...)
+                if char == '{':
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = i
+            elif char in '{[':
+                self._depth += 1
+            elif char == ':' and self._depth == 1 and self._value_start is None:
+                self._value_start = i + 1
+            elif char == ',' and self._depth == 1:
+                fields.extend(self._complete_field(buffer, i))
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    fields.extend(self._complete_field(buffer, i))
+                    self.done = True
+                    self._pos = i + 1
+                    return fields
+
+        self._pos = len(buffer)
+        return fields
+
+    def _complete_field(self, buffer, end):
+        """Décode la valeur du champ courant, terminée à la position `end`"""
+        if self._value_start is None or self._key is None:
+            return []
+        raw = buffer[self._value_start:end]
+        key = self._key
+        self._key = None
+        self._value_start = None
+        try:
+            return [(key, json.loads(raw))]
+        except ValueError:
+            return []
@@ -0,0 +1,208 @@
+# modules/token_budget.py
+"""
+Budget de tokens d'entrée pour les photos envoyées à Claude
+
+Claude facture (et met du temps à lire) chaque image selon son nombre de
+pixels : environ largeur × hauteur / 750 tokens. Pour un budget donné par
+requête, on choisit la résolution de chaque photo selon son rôle :
+- la photo principale (la première) garde le plus de détails
+- les gros plans d'étiquette restent nets (texte à lire)
+- les vues secondaires sont réduites en premier
+"""
+
+import math
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from .image_preprocessing import JPEG_QUALITY, decode_reduced
+from .profiling import profiled
+from .workers import map_cpu_bound
+
+# Budget de tokens pour l'ensemble des photos d'une requête (0 = désactivé)
+IMAGE_TOKEN_BUDGET = int(os.environ.get('CLAUDE_IMAGE_TOKEN_BUDGET', 4000))
+
+# En dessous de cette taille (côté le plus long), les détails se perdent
+MIN_IMAGE_SIZE = int(os.environ.get('CLAUDE_MIN_IMAGE_SIZE', 512))
+
+PIXELS_PER_TOKEN = 750
+
+# Au-delà, Claude réduit lui-même l'image (~1,15 mégapixel)
+MAX_TOKENS_PER_IMAGE = 1600
+
+# Approximation pour le texte du prompt
+TEXT_CHARS_PER_TOKEN = 3.5
+
+PRIMARY = 'primary'
+LABEL = 'label'
+SECONDARY = 'secondary'
+
+# Part du budget attribuée à chaque rôle
+ROLE_WEIGHTS = {PRIMARY: 3.0, LABEL: 2.0, SECONDARY: 1.0}
+
+# Proportion de pixels de contour au-delà de laquelle une photo est un
+# gros plan d'étiquette (texte, logo brodé, code-barres)
+LABEL_EDGE_DENSITY = 0.12
+EDGE_THRESHOLD = 48
+
+
+def estimate_image_tokens(width, height):
+    """Tokens facturés pour une image de width × height pixels"""
+    return min(MAX_TOKENS_PER_IMAGE, math.ceil(width * height / PIXELS_PER_TOKEN))
+
+
+def estimate_text_tokens(text):
+    """Estimation grossière des tokens d'un texte"""
+    return math.ceil(len(text) / TEXT_CHARS_PER_TOKEN)
+
+
+def edge_density(img):
+    """
+    Proportion de pixels à fort gradient sur une vignette en niveaux de gris
+
+    Élevée pour une étiquette (texte fin, contrastes nets), faible pour
+    une vue d'ensemble d'un vêtement (aplats de couleur).
+    """
+    gray = img.convert('L')
+    gray.thumbnail((256, 256))
+    pixels = np.asarray(gray, dtype=np.int16)
+    if pixels.shape[0] < 2 or pixels.shape[1] < 2:
+        return 0.0
+    gradient = np.abs(np.diff(pixels, axis=1))[:-1, :] + np.abs(np.diff(pixels, axis=0))[:, :-1]
+    return float((gradient > EDGE_THRESHOLD).mean())
+
+
+def image_size(data):
+    """Dimensions d'une photo JPEG, lues dans l'en-tête (sans décodage)"""
+    return Image.open(BytesIO(data)).size
+
+
+@profiled
+def inspect_image(data):
+    """
+    Densité de contours d'une photo JPEG
+
+    Returns:
+        float: Densité de contours
+    """
+    img = Image.open(BytesIO(data))
+    # Décodage à 1/8 suffisant pour mesurer les contours
+    img.draft('RGB', (img.size[0] // 8, img.size[1] // 8))
+    return edge_density(img)
+
+
+def classify_roles(densities):
+    """Rôle de chaque photo : principale, étiquette ou secondaire"""
+    roles = []
+    for position, density in enumerate(densities):
+        if position == 0:
+            roles.append(PRIMARY)
+        elif density >= LABEL_EDGE_DENSITY:
+            roles.append(LABEL)
+        else:
+            roles.append(SECONDARY)
+    return roles
+
+
+def allocate_tokens(native_tokens, weights, budget):
+    """
+    Répartit le budget au prorata des poids
+
+    Une photo ne peut pas recevoir plus que sa taille d'origine : le
+    surplus est redistribué aux autres.
+
+    Returns:
+        list: Tokens attribués à chaque photo
+    """
+    allocation = [0.0] * len(native_tokens)
+    remaining = set(range(len(native_tokens)))
+    left = float(budget)
+
+    while remaining:
+        total_weight = sum(weights[i] for i in remaining)
+        capped = [i for i in remaining if native_tokens[i] <= left * weights[i] / total_weight]
+        if not capped:
+            for i in remaining:
+                allocation[i] = left * weights[i] / total_weight
+            break
+        for i in capped:
+            allocation[i] = native_tokens[i]
+            left -= native_tokens[i]
+            remaining.discard(i)
+
+    return allocation
+
+
+def target_size(size, tokens):
+    """Dimensions correspondant à `tokens`, sans agrandir ni descendre sous MIN_IMAGE_SIZE"""
+    width, height = size
+    scale = min(1.0, math.sqrt(tokens * PIXELS_PER_TOKEN / (width * height)))
+    scale = max(scale, min(1.0, MIN_IMAGE_SIZE / max(width, height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def plan_resolutions(sizes, densities, budget=IMAGE_TOKEN_BUDGET):
+    """
+    Choisit la résolution de chaque photo pour tenir dans le budget
+
+    Returns:
+        dict: roles, sizes (dimensions cibles), image_tokens (estimation)
+    """
+    roles = classify_roles(densities)
+    native = [estimate_image_tokens(*size) for size in sizes]
+
+    if budget <= 0 or sum(native) <= budget:
+        targets = list(sizes)
+    else:
+        allocation = allocate_tokens(native, [ROLE_WEIGHTS[role] for role in roles], budget)
+        targets = [target_size(size, tokens) for size, tokens in zip(sizes, allocation)]
+
+    return {
+        'roles': roles,
+        'sizes': targets,
+        'image_tokens': sum(estimate_image_tokens(*size) for size in targets)
+    }
+
+
+@profiled
+def _resize(job):
+    data, size, target = job
+    if target == size:
+        return data
+
+    img = decode_reduced(Image.open(BytesIO(data)), max(target))
+    img = img.resize(target, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+def fit_token_budget(images_jpeg, budget=IMAGE_TOKEN_BUDGET):
+    """
+    Réduit les photos d'une requête pour respecter le budget de tokens
+
+    Args:
+        images_jpeg: Photos prétraitées (octets JPEG), la principale en premier
+        budget: Tokens d'image autorisés pour la requête
+
+    Returns:
+        tuple: (photos JPEG à envoyer, plan de plan_resolutions ; rôles
+        None si les photos n'ont pas eu à être réduites, estimation None
+        si le budget est désactivé)
+    """
+    if budget <= 0:
+        return images_jpeg, {'roles': None, 'sizes': None, 'image_tokens': None}
+
+    # Les dimensions suffisent à savoir si le budget est dépassé : le
+    # décodage et la mesure des contours ne servent qu'à répartir la réduction
+    sizes = [image_size(data) for data in images_jpeg]
+    native_tokens = sum(estimate_image_tokens(*size) for size in sizes)
+    if native_tokens <= budget:
+        return images_jpeg, {'roles': None, 'sizes': sizes, 'image_tokens': native_tokens}
+
+    densities = map_cpu_bound(inspect_image, images_jpeg)
+    plan = plan_resolutions(sizes, densities, budget)
+    images = map_cpu_bound(_resize, list(zip(images_jpeg, sizes, plan['sizes'])))
+    return images, plan
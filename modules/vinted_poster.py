@@ -0,0 +1,289 @@
+# modules/vinted_poster.py
+"""
+Publication en masse des annonces générées
+
+- Session HTTP persistante (pool de connexions keep-alive)
+- Photos d'une annonce envoyées en parallèle
+- Limiteur à seau de jetons pour respecter les quotas de la plateforme
+- Retries avec backoff exponentiel et clés d'idempotence : une annonce
+  réessayée n'est jamais créée deux fois
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Codes HTTP pour lesquels une nouvelle tentative a un sens
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class PublishError(Exception):
+    """Levée quand une annonce ne peut pas être publiée"""
+
+
+def parse_retry_after(value, default):
+    """
+    Délai d'un en-tête Retry-After (secondes ou date HTTP)
+
+    Returns:
+        float: Secondes à attendre, `default` si l'en-tête est absent ou illisible
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Seau de jetons : `rate` requêtes par seconde, rafales jusqu'à `capacity`
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, delay):
+        """Vide le seau pendant `delay` secondes (429 ou Retry-After de la plateforme)"""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - delay * self.rate
+            self._updated = time.monotonic()
+
+
+def listing_payload(listing):
+    """
+    Convertit une annonce générée (main.py) en corps de requête
+
+    Accepte le format JSONL de `python main.py batch` ou un dict déjà plat.
+
+    Returns:
+        tuple: (champs de l'annonce, chemins des photos)
+    """
+    if 'annonce' in listing:
+        produit = listing.get('produit', {})
+        annonce = listing['annonce']
+        fields = {
+            'title': annonce['titre'],
+            'description': annonce['description'],
+            'price': annonce['prix'],
+            'brand': produit.get('marque'),
+            'color': produit.get('couleur'),
+            'condition': produit.get('etat'),
+            'category': produit.get('type')
+        }
+        photos = listing.get('photos') or [listing['image_path']]
+    else:
+        fields = {key: value for key, value in listing.items() if key != 'photos'}
+        photos = listing.get('photos', [])
+
+    fields['currency'] = 'EUR'
+    return fields, photos
+
+
+def idempotency_key(*parts):
+    """Clé stable dérivée du contenu : identique d'une tentative à l'autre"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class VintedPoster:
+    """
+    Client de publication vers l'API de la plateforme
+    """
+
+    PHOTOS_PATH = "/api/v2/photos"
+    ITEMS_PATH = "/api/v2/items"
+
+    def __init__(self, base_url, access_token=None, rate=2.0, burst=5,
+                 upload_concurrency=4, max_retries=4, backoff=0.5,
+                 pool_size=10, timeout=(5, 30)):
+        """
+        Args:
+            base_url: URL de l'API (ex : https://www.vinted.fr)
+            access_token: Jeton d'accès (optionnel)
+            rate: Requêtes par seconde autorisées
+            burst: Taille maximale d'une rafale
+            upload_concurrency: Photos envoyées en parallèle par annonce
+            max_retries: Nouvelles tentatives par requête
+            backoff: Délai initial du backoff exponentiel (s)
+            pool_size: Connexions keep-alive conservées
+            timeout: (connexion, lecture) en secondes
+        """
+        self.base_url = base_url.rstrip('/')
+        self.bucket = TokenBucket(rate, burst)
+        self.upload_concurrency = upload_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if access_token:
+            self.session.headers['Authorization'] = f"Bearer {access_token}"
+
+        self._uploads = ThreadPoolExecutor(max_workers=upload_concurrency, thread_name_prefix='upload')
+
+    def close(self):
+        self._uploads.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method, path, key, **kwargs):
+        """
+        Requête avec limitation de débit, retries et clé d'idempotence
+
+        La même clé est renvoyée à chaque tentative : si une réponse est
+        perdue après la création, la plateforme renvoie l'objet existant.
+        """
+        headers = {'Idempotency-Key': key}
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self.backoff * (2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+
+            self.bucket.acquire()
+            try:
+                if 'files' in kwargs:
+                    # Le fichier est relu à chaque tentative
+                    for _, (_, handle, _) in kwargs['files'].items():
+                        handle.seek(0)
+                response = self.session.request(method, f"{self.base_url}{path}",
+                                                headers=headers, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                last_error = str(e)
+                continue
+
+            if response.status_code < 300:
+                # 204, ou 201 sans corps : rien à décoder
+                if not response.content:
+                    return {}
+                try:
+                    return response.json()
+                except ValueError:
+                    raise PublishError(f"{method} {path} : réponse illisible - {response.text[:200]}")
+
+            last_error = f"HTTP {response.status_code}"
+            if response.status_code not in RETRYABLE_STATUS:
+                raise PublishError(f"{method} {path} : {last_error} - {response.text[:200]}")
+            # Retry-After peut accompagner un 503 comme un 429
+            retry_after = response.headers.get('Retry-After')
+            if retry_after or response.status_code == 429:
+                self.bucket.penalize(parse_retry_after(retry_after, self.backoff))
+
+        raise PublishError(f"{method} {path} : échec après {self.max_retries + 1} tentatives ({last_error})")
+
+    def upload_photo(self, path):
+        """
+        Envoie une photo
+
+        Returns:
+            int or str: Identifiant de la photo sur la plateforme
+        """
+        with open(path, 'rb') as handle:
+            key = hashlib.sha256(handle.read()).hexdigest()
+            response = self._request('POST', self.PHOTOS_PATH, key,
+                                     files={'photo': (os.path.basename(path), handle, 'image/jpeg')})
+        if 'id' not in response:
+            raise PublishError(f"POST {self.PHOTOS_PATH} : identifiant de photo absent de la réponse")
+        return response['id']
+
+    def publish(self, listing):
+        """
+        Publie une annonce : photos en parallèle, puis l'annonce elle-même
+
+        Returns:
+            dict: Annonce créée, telle que renvoyée par la plateforme
+        """
+        fields, photos = listing_payload(listing)
+        photo_ids = list(self._uploads.map(self.upload_photo, photos))
+
+        # Clé calculée sans les identifiants de photos, qui peuvent changer
+        key = idempotency_key(fields, photos)
+        return self._request('POST', self.ITEMS_PATH, key, json=dict(fields, photo_ids=photo_ids))
+
+    def publish_many(self, listings, concurrency=4, on_result=None):
+        """
+        Publie une liste d'annonces
+
+        Args:
+            listings: Annonces au format de main.py
+            concurrency: Annonces publiées simultanément
+            on_result: Fonction (annonce, résultat, erreur) appelée au fil de l'eau
+
+        Returns:
+            dict: Statistiques (publiées, échecs, annonces/minute)
+        """
+        published = 0
+        failed = 0
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='publish') as pool:
+            futures = {pool.submit(self.publish, listing): listing for listing in listings}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Annonce invalide ou réponse inattendue : compte comme un échec,
+                    # les autres annonces continuent
+                    failed += 1
+                    if on_result:
+                        message = str(e) if isinstance(e, (PublishError, OSError)) else f"{type(e).__name__}: {e}"
+                        on_result(futures[future], None, message)
+                else:
+                    published += 1
+                    if on_result:
+                        on_result(futures[future], result, None)
+
+        elapsed = time.perf_counter() - start
+        return {
+            'published': published,
+            'failed': failed,
+            'elapsed': elapsed,
+            'listings_per_minute': published / elapsed * 60 if elapsed > 0 else 0.0
+        }
@@ -0,0 +1,78 @@
+# modules/workers.py
+"""
+Exécution du travail CPU hors de la boucle d'événements
+
+Avec le worker gunicorn `gevent`, les appels réseau sont coopératifs :
+des centaines d'analyses peuvent attendre Claude en parallèle. Le travail
+CPU (décodage, redimensionnement, encodage JPEG avec Pillow) bloquerait en
+revanche tout le worker : on l'envoie dans de vrais threads système.
+Avec un worker synchrone, le même pool parallélise le travail CPU d'une
+requête (Pillow libère le GIL pendant le décodage et l'encodage).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .profiling import PROFILING_ENABLED, bind_context
+
+CPU_THREADS = int(os.environ.get('CPU_THREADS', os.cpu_count() or 2))
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def is_gevent_patched():
+    """Indique si le processus tourne sous gevent (monkey-patching actif)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _create_executor():
+    if is_gevent_patched():
+        # Vrais threads système, mais futures compatibles avec les greenlets
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor(max_workers=CPU_THREADS)
+    return ThreadPoolExecutor(max_workers=CPU_THREADS, thread_name_prefix='cpu')
+
+
+def cpu_executor():
+    """
+    Retourne le pool de threads CPU du worker courant
+
+    Returns:
+        concurrent.futures.Executor: Pool créé après le fork de gunicorn
+    """
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = _create_executor()
+                _executor_pid = pid
+    return _executor
+
+
+def map_cpu_bound(func, items):
+    """
+    Applique une fonction CPU à chaque élément, en parallèle, dans l'ordre
+
+    Le pool est partagé par toutes les requêtes du worker : sa taille
+    (CPU_THREADS) borne aussi le nombre de décodages simultanés, donc la
+    mémoire. Sous gevent, seule la greenlet appelante attend les résultats.
+
+    Returns:
+        list: Résultats dans l'ordre de `items`
+    """
+    executor = cpu_executor()
+    if PROFILING_ENABLED:
+        # Requête profilée : chaque tâche du pool lui reste rattachée
+        futures = [executor.submit(bind_context(func), item) for item in items]
+    else:
+        futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
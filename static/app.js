@@ -0,0 +1,324 @@
+// APP_CONFIG est défini par la page : langue active, ses textes, URLs des ressources
+let selectedFiles = [];
+let currentLang = APP_CONFIG.lang;
+const translations = APP_CONFIG.translations;
+
+// Redimensionnement dans le navigateur, à la taille utilisée par le serveur
+const UPLOAD_MAX_SIZE = APP_CONFIG.uploadMaxSize;
+const UPLOAD_QUALITY = 0.9;
+let resizeWorker = null;
+let resizeRequestId = 0;
+const resizeCallbacks = new Map();
+const preparedUploads = new WeakMap();
+
+function getResizeWorker() {
+    if (resizeWorker === null) {
+        resizeWorker = new Worker(APP_CONFIG.resizeWorker);
+        resizeWorker.onmessage = (e) => {
+            const callback = resizeCallbacks.get(e.data.id);
+            resizeCallbacks.delete(e.data.id);
+            callback(e.data);
+        };
+    }
+    return resizeWorker;
+}
+
+async function resizeOnMainThread(file) {
+    const bitmap = await createImageBitmap(file, {imageOrientation: 'from-image'});
+    const scale = Math.min(1, UPLOAD_MAX_SIZE / Math.max(bitmap.width, bitmap.height));
+    const canvas = document.createElement('canvas');
+    canvas.width = Math.round(bitmap.width * scale);
+    canvas.height = Math.round(bitmap.height * scale);
+    const ctx = canvas.getContext('2d');
+    ctx.imageSmoothingQuality = 'high';
+    ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+    bitmap.close();
+    return new Promise((resolve, reject) => {
+        canvas.toBlob(blob => blob ? resolve(blob) : reject(new Error('toBlob')), 'image/jpeg', UPLOAD_QUALITY);
+    });
+}
+
+function resizePhoto(file) {
+    if (typeof OffscreenCanvas === 'undefined' || typeof Worker === 'undefined') {
+        return resizeOnMainThread(file);
+    }
+    return new Promise((resolve, reject) => {
+        const id = ++resizeRequestId;
+        resizeCallbacks.set(id, (result) => {
+            result.error ? reject(new Error(result.error)) : resolve(result.blob);
+        });
+        getResizeWorker().postMessage({id, file, maxSize: UPLOAD_MAX_SIZE, quality: UPLOAD_QUALITY});
+    });
+}
+
+function prepareUpload(file) {
+    // Lancé dès la sélection : l'envoi n'attend pas le redimensionnement
+    if (!preparedUploads.has(file)) {
+        const prepared = resizePhoto(file)
+            .then(blob => blob.size < file.size ? blob : file)
+            .catch(() => file);  // En cas d'échec, le serveur redimensionne
+        preparedUploads.set(file, prepared);
+    }
+    return preparedUploads.get(file);
+}
+
+async function changeLanguage() {
+    // Textes de la langue chargés à la demande, sans recharger la page
+    const lang = document.getElementById('language').value;
+    if (!translations[lang]) {
+        try {
+            const response = await fetch(APP_CONFIG.i18n[lang]);
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            translations[lang] = await response.json();
+        } catch (err) {
+            window.location.href = '/?lang=' + lang;
+            return;
+        }
+    }
+    currentLang = lang;
+    applyTranslations();
+    history.replaceState(null, '', '/?lang=' + lang);
+}
+
+function applyTranslations() {
+    const t = translations[currentLang];
+    document.documentElement.lang = currentLang;
+    document.title = t.title;
+    document.querySelectorAll('[data-i18n]').forEach(el => {
+        el.textContent = t[el.dataset.i18n];
+    });
+}
+
+// Drag and drop
+const uploadZone = document.getElementById('uploadZone');
+
+uploadZone.addEventListener('dragover', (e) => {
+    e.preventDefault();
+    uploadZone.classList.add('dragover');
+});
+
+uploadZone.addEventListener('dragleave', () => {
+    uploadZone.classList.remove('dragover');
+});
+
+uploadZone.addEventListener('drop', (e) => {
+    e.preventDefault();
+    uploadZone.classList.remove('dragover');
+    const files = e.dataTransfer.files;
+    document.getElementById('photos').files = files;
+    previewImages();
+});
+
+function previewImages() {
+    const files = document.getElementById('photos').files;
+    const preview = document.getElementById('preview');
+    const analyzeBtn = document.getElementById('analyzeBtn');
+    
+    selectedFiles = Array.from(files).slice(0, 5);
+    preview.innerHTML = '';
+    
+    if (selectedFiles.length > 0) {
+        analyzeBtn.disabled = false;
+        selectedFiles.forEach((file, index) => {
+            prepareUpload(file);
+            const reader = new FileReader();
+            reader.onload = (e) => {
+                const div = document.createElement('div');
+                div.className = 'preview-item';
+                div.innerHTML = `
+                    <img src="${e.target.result}" alt="Photo ${index + 1}">
+                    <button class="remove-btn" onclick="removeImage(${index})" type="button">×</button>
+                `;
+                preview.appendChild(div);
+            };
+            reader.readAsDataURL(file);
+        });
+    } else {
+        analyzeBtn.disabled = true;
+    }
+}
+
+function removeImage(index) {
+    selectedFiles.splice(index, 1);
+    const dataTransfer = new DataTransfer();
+    selectedFiles.forEach(file => dataTransfer.items.add(file));
+    document.getElementById('photos').files = dataTransfer.files;
+    previewImages();
+}
+
+async function analyzePhotos() {
+    const loading = document.getElementById('loading');
+    const results = document.getElementById('results');
+    const error = document.getElementById('error');
+    const analyzeBtn = document.getElementById('analyzeBtn');
+    
+    if (selectedFiles.length === 0) {
+        showError(translations[currentLang].select_photos);
+        return;
+    }
+
+    loading.classList.add('show');
+    results.classList.remove('show');
+    error.classList.remove('show');
+    analyzeBtn.disabled = true;
+
+    clearResults();
+
+    const uploads = await Promise.all(selectedFiles.map(prepareUpload));
+    const formData = new FormData();
+    uploads.forEach((upload, index) => formData.append('photos', upload, 'photo' + (index + 1) + '.jpg'));
+    formData.append('language', currentLang);
+
+    try {
+        // Job asynchrone : la connexion n'attend pas la fin de l'analyse
+        const response = await fetch('/jobs', {
+            method: 'POST',
+            body: formData
+        });
+
+        const job = await response.json();
+        const data = job.error ? job : await waitForJob(job.id);
+
+        if (data.error) {
+            results.classList.remove('show');
+            showError(data.error);
+        } else {
+            Object.keys(FIELD_IDS).forEach(name => showField(name, data[name]));
+        }
+    } catch (err) {
+        showError(translations[currentLang].error + ': ' + err.message);
+    } finally {
+        loading.classList.remove('show');
+        analyzeBtn.disabled = false;
+    }
+}
+
+// Champ de la réponse -> carte de résultat
+const FIELD_IDS = {
+    type: 'type',
+    brand: 'brand',
+    color: 'color',
+    condition: 'condition',
+    price: 'price',
+    title: 'listingTitle',
+    description: 'description'
+};
+
+function showField(name, value) {
+    const id = FIELD_IDS[name];
+    if (!id || value === undefined) {
+        return;
+    }
+    document.getElementById(id).textContent = value;
+    document.getElementById('results').classList.add('show');
+}
+
+function clearResults() {
+    Object.values(FIELD_IDS).forEach(id => {
+        document.getElementById(id).textContent = '';
+    });
+}
+
+function waitForJob(jobId) {
+    return new Promise((resolve) => {
+        if (!window.EventSource) {
+            pollJob(jobId, resolve);
+            return;
+        }
+        const events = new EventSource('/jobs/' + jobId + '/events');
+        events.addEventListener('field', (e) => {
+            // Remplissage progressif pendant la génération
+            const field = JSON.parse(e.data);
+            showField(field.name, field.value);
+        });
+        events.addEventListener('result', (e) => {
+            events.close();
+            resolve(JSON.parse(e.data));
+        });
+        events.addEventListener('failure', (e) => {
+            events.close();
+            resolve(JSON.parse(e.data));
+        });
+        events.onerror = () => {
+            // Flux interrompu : on bascule sur l'interrogation périodique
+            events.close();
+            pollJob(jobId, resolve);
+        };
+    });
+}
+
+async function pollJob(jobId, resolve) {
+    try {
+        const response = await fetch('/jobs/' + jobId);
+        const job = await response.json();
+        Object.entries(job.fields || {}).forEach(([name, value]) => showField(name, value));
+        if (job.status === 'done') {
+            resolve(job.result);
+            return;
+        }
+        if (job.status === 'error' || response.status === 404) {
+            resolve({error: job.error});
+            return;
+        }
+    } catch (err) {
+        // Erreur réseau passagère : on réessaie
+    }
+    setTimeout(() => pollJob(jobId, resolve), 1000);
+}
+
+function showError(message) {
+    const error = document.getElementById('error');
+    error.textContent = message;
+    error.classList.add('show');
+}
+
+function copyField(fieldId) {
+    const field = document.getElementById(fieldId);
+    const text = field.textContent;
+    navigator.clipboard.writeText(text).then(() => {
+        showToast();
+    });
+}
+
+function copyAll() {
+    const fields = ['type', 'brand', 'color', 'condition', 'price', 'listingTitle', 'description'];
+    const labels = {
+        'type': translations[currentLang].product_type,
+        'brand': translations[currentLang].brand,
+        'color': translations[currentLang].color,
+        'condition': translations[currentLang].condition,
+        'price': translations[currentLang].price,
+        'listingTitle': translations[currentLang].title_field,
+        'description': translations[currentLang].description
+    };
+    
+    let allText = '';
+    fields.forEach(field => {
+        const value = document.getElementById(field).textContent;
+        allText += `${labels[field]}: ${value}
+
+`;
+    });
+    
+    navigator.clipboard.writeText(allText).then(() => {
+        showToast();
+    });
+}
+
+function showToast() {
+    const toast = document.getElementById('toast');
+    toast.classList.add('show');
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 2000);
+}
+
+function reset() {
+    document.getElementById('results').classList.remove('show');
+    document.getElementById('preview').innerHTML = '';
+    document.getElementById('photos').value = '';
+    selectedFiles = [];
+    document.getElementById('analyzeBtn').disabled = true;
+}
@@ -0,0 +1,19 @@
+// Redimensionnement des photos hors du thread principal (OffscreenCanvas)
+self.onmessage = async (e) => {
+    const {id, file, maxSize, quality} = e.data;
+    try {
+        const bitmap = await createImageBitmap(file, {imageOrientation: 'from-image'});
+        const scale = Math.min(1, maxSize / Math.max(bitmap.width, bitmap.height));
+        const width = Math.round(bitmap.width * scale);
+        const height = Math.round(bitmap.height * scale);
+        const canvas = new OffscreenCanvas(width, height);
+        const ctx = canvas.getContext('2d');
+        ctx.imageSmoothingQuality = 'high';
+        ctx.drawImage(bitmap, 0, 0, width, height);
+        bitmap.close();
+        const blob = await canvas.convertToBlob({type: 'image/jpeg', quality});
+        self.postMessage({id, blob});
+    } catch (err) {
+        self.postMessage({id, error: err.message});
+    }
+};
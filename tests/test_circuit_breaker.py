@@ -0,0 +1,52 @@
+# tests/test_circuit_breaker.py
+"""
+Disjoncteur : un appel lent mais réussi ne compte pas comme un échec
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+
+class SlowCallTest(unittest.TestCase):
+
+    def record_calls(self, breaker, count, success, latency):
+        for _ in range(count):
+            breaker.before_call()
+            breaker.record(success, latency)
+
+    def test_slow_successful_call_is_not_a_failure_by_default(self):
+        breaker = CircuitBreaker(window=10, min_calls=5, failure_ratio=0.5)
+        # Aller-retour normal de 40 s, sous le timeout de lecture de 45 s
+        self.record_calls(breaker, 10, True, 40.0)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.counters['failures'], 0)
+
+    def test_slow_calls_do_not_add_to_real_failures(self):
+        breaker = CircuitBreaker(window=10, min_calls=5, failure_ratio=0.5)
+        # 4 échecs sur 10 : sous le seuil, tant que les 6 appels lents ne comptent pas
+        self.record_calls(breaker, 6, True, 40.0)
+        self.record_calls(breaker, 4, False, 1.0)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.counters['failures'], 4)
+
+    def test_explicit_slow_call_threshold_still_opens(self):
+        breaker = CircuitBreaker(window=10, min_calls=5, failure_ratio=0.5, slow_call=30.0)
+        self.record_calls(breaker, 5, True, 40.0)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_from_env_disables_slow_call_unless_set(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('CIRCUIT_SLOW_CALL', None)
+            self.assertIsNone(CircuitBreaker.from_env().slow_call)
+        with mock.patch.dict(os.environ, {'CIRCUIT_SLOW_CALL': '60'}):
+            self.assertEqual(CircuitBreaker.from_env().slow_call, 60.0)
+
+
+if __name__ == '__main__':
+    unittest.main()